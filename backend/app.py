@@ -1,11 +1,11 @@
 import os
-from flask import Flask
+from flask import Flask, Response, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
-from database import db
+from database import db, init_db, pool_status
 
 # Load environment variables
 load_dotenv()
@@ -18,9 +18,62 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///portfolio.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['QUERY_INSPECTOR'] = os.getenv('QUERY_INSPECTOR', '1' if os.getenv('FLASK_ENV') == 'development' else '0') in ('1', 'true', 'yes')
+    app.config['QUERY_SLOW_MS'] = float(os.getenv('QUERY_SLOW_MS', '100'))
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['DATABASE_REPLICA_URL'] = os.getenv('DATABASE_REPLICA_URL')
+    app.config['DB_READ_YOUR_WRITES_SECONDS'] = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', '5'))
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', '5'))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    app.config['DB_POOL_PRE_PING'] = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    app.config['DB_STATEMENT_TIMEOUT_MS'] = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    app.config['VIEW_FLUSH_INTERVAL'] = float(os.getenv('VIEW_FLUSH_INTERVAL', '5'))
+    app.config['VIEW_FLUSH_THRESHOLD'] = int(os.getenv('VIEW_FLUSH_THRESHOLD', '100'))
+    app.config['CACHE_BACKEND'] = os.getenv('CACHE_BACKEND', 'memory')
+    app.config['CACHE_TTL'] = int(os.getenv('CACHE_TTL', '300'))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', '512'))
+    app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    app.config['RATE_LIMIT_BACKEND'] = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    app.config['RATE_LIMIT_REDIS_URL'] = os.getenv('RATE_LIMIT_REDIS_URL', app.config['CACHE_REDIS_URL'])
+    app.config['RATE_LIMIT_TRUSTED_PROXIES'] = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '0'))
+    app.config['RATE_LIMIT_CONTACT'] = os.getenv('RATE_LIMIT_CONTACT', '5/minute')
+    app.config['RATE_LIMIT_FAVORITES'] = os.getenv('RATE_LIMIT_FAVORITES', '10/minute')
+    app.config['RATE_LIMIT_LOGIN'] = os.getenv('RATE_LIMIT_LOGIN', '10/minute')
+    app.config['CONTACT_DUPLICATE_WINDOW'] = int(os.getenv('CONTACT_DUPLICATE_WINDOW', '600'))
+    app.config['HTTP_CACHE_MAX_AGE'] = int(os.getenv('HTTP_CACHE_MAX_AGE', '0'))
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '500'))
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', '6'))
+    app.config['UPLOAD_MAX_WORKERS'] = int(os.getenv('UPLOAD_MAX_WORKERS', '4'))
+    app.config['UPLOAD_TIMEOUT'] = float(os.getenv('UPLOAD_TIMEOUT', '120'))
+    app.config['UPLOAD_CHUNK_SIZE'] = int(os.getenv('UPLOAD_CHUNK_SIZE', str(6 * 1024 * 1024)))
+    app.config['UPLOAD_STREAM_MAX_SIZE'] = int(os.getenv('UPLOAD_STREAM_MAX_SIZE', str(500 * 1024 * 1024)))
+    app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, os.getenv('UPLOAD_FOLDER', 'uploads'))
+    app.config['MEDIA_BASE_URL'] = os.getenv('MEDIA_BASE_URL', '')
+    app.config['JOBS_WORKERS'] = int(os.getenv('JOBS_WORKERS', '2'))
+    app.config['JOBS_MAX_ATTEMPTS'] = int(os.getenv('JOBS_MAX_ATTEMPTS', '5'))
+    app.config['JOBS_POLL_INTERVAL'] = float(os.getenv('JOBS_POLL_INTERVAL', '1'))
+    app.config['JOBS_LOCK_TIMEOUT'] = int(os.getenv('JOBS_LOCK_TIMEOUT', '600'))
+    # Not under UPLOAD_FOLDER, which /api/media serves publicly
+    app.config['JOBS_SPOOL_FOLDER'] = os.path.join(app.root_path, os.getenv('JOBS_SPOOL_FOLDER', 'instance/spool'))
     
-    # Initialize extensions with app
-    db.init_app(app)
+    # Request latency and per-request query metrics (first, so its timer wraps the other hooks)
+    from utils import metrics as request_metrics
+    request_metrics.init_app(app)
+    
+    # Development/CI: log repeated (N+1) and slow queries per request
+    from utils import query_inspector
+    query_inspector.init_app(app)
+    
+    # Initialize extensions with app (pool sizing, timeouts and SQLite pragmas from DB_*)
+    init_db(app)
+    
+    # Fast JSON encoding and gzip/brotli response compression
+    from utils import responses
+    responses.init_app(app)
     
     # Configure CORS for development
     frontend_urls = [
@@ -32,7 +85,8 @@ def create_app():
         'http://localhost:3004',
         'http://localhost:3005'
     ]
-    CORS(app, origins=frontend_urls, supports_credentials=True)
+    CORS(app, origins=frontend_urls, supports_credentials=True,
+         expose_headers=['Link', 'X-Next-Cursor', 'Retry-After'])
     
     # Configure Cloudinary
     cloudinary.config(
@@ -44,6 +98,14 @@ def create_app():
     # Import models (after db is initialized)
     import models
     
+    # Batch project view increments instead of writing on every read
+    from utils.view_counter import view_counter
+    view_counter.init_app(app)
+    
+    # Cache public read responses until an admin write invalidates them
+    from utils.cache import response_cache
+    response_cache.init_app(app)
+    
     # Import and register blueprints
     from routes.public import public_bp
     from routes.projects import projects_bp
@@ -55,6 +117,10 @@ def create_app():
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(favorites_bp, url_prefix='/api/favorites')
     
+    # Token bucket limits on public writes (RATE_LIMIT_*)
+    from utils.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -67,14 +133,35 @@ def create_app():
     # Health check route
     @app.route('/api/health')
     def health_check():
-        return {'status': 'healthy', 'message': 'Portfolio API is running'}
+        return {'status': 'healthy', 'message': 'Portfolio API is running', 'database': pool_status()}
+    
+    # Prometheus scrape endpoint
+    @app.route('/api/metrics')
+    def prometheus_metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return {'error': 'Unauthorized'}, 401
+        return Response(request_metrics.metrics.render(), mimetype='text/plain; version=0.0.4')
     
-    # Create database tables
+    # Schema changes run out-of-band (python migrate.py); workers only compare versions
+    from utils.schema import check_schema
     with app.app_context():
-        db.create_all()
+        check_schema()
+    
+    # Full-text search index (FTS5 on SQLite, GIN tsvector on Postgres)
+    from utils.search_index import init_search_index
+    init_search_index(app)
+    
+    # Background workers for media uploads and deletions
+    from utils.jobs import job_queue
+    import utils.media_jobs
+    job_queue.init_app(app)
     
     return app
 
 if __name__ == '__main__':
+    # The development server migrates itself; deployments run migrate.py before the workers
+    from migrate import upgrade_database
+    upgrade_database()
     app = create_app()
     app.run(debug=os.getenv('FLASK_ENV') == 'development', port=5000)
\ No newline at end of file
@@ -0,0 +1,340 @@
+"""
+Benchmark the API endpoints in-process and over a real socket.
+
+Seeds a fresh SQLite database, drives every endpoint through the Flask test
+client (sequential) and/or a threaded HTTP server with a concurrent load
+generator, and writes throughput and p50/p95/p99 latency to JSON.
+
+Usage:
+    python benchmarks/bench_api.py run --projects 2000 --output before.json
+    python benchmarks/bench_api.py run --mode socket --concurrency 16 --output after.json
+    python benchmarks/bench_api.py compare before.json after.json [--threshold 10]
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TAGS = [f'tag-{i}' for i in range(60)]
+TECHNOLOGIES = ['python', 'flask', 'react', 'nextjs', 'postgres', 'docker', 'pytorch', 'spark']
+TIERS = ['S-Tier', 'A-Tier', 'B-Tier', 'C-Tier']
+FAVORITE_CATEGORIES = ['film', 'athlete', 'book', 'music']
+SKILL_CATEGORIES = ['Languages', 'Frameworks', 'Data', 'Tools']
+
+# (name, path, needs admin token)
+ENDPOINTS = [
+    ('projects', '/api/projects/', False),
+    ('projects_by_views', '/api/projects/?sort_by=views', False),
+    ('projects_page', '/api/projects/?limit=12', False),
+    ('projects_fields', '/api/projects/?fields=id,title,image', False),
+    ('project_detail', '/api/projects/project-{slug}', False),
+    ('related', '/api/projects/related/project-{slug}', False),
+    ('search', '/api/search?q=tag', False),
+    ('skills', '/api/skills', False),
+    ('favorites', '/api/favorites/', False),
+    ('admin_contacts', '/api/admin/contacts', True),
+    ('admin_contact_counts', '/api/admin/contacts/counts', True),
+]
+
+def seed(db, models, projects, favorites, skills, contacts):
+    """Bulk insert synthetic rows (deterministic for a given set of counts)"""
+    from utils.inbox import recount_statuses
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    db.session.execute(db.insert(models.Project), [{
+        'title': f'Project {i}',
+        'slug': f'project-{i}',
+        'short_description': f'Synthetic project {i} about {rng.choice(TAGS)}',
+        'full_description': 'Synthetic body text. ' * 20,
+        'blocks': [{'id': '1', 'type': 'text', 'content': 'Synthetic body text.'}],
+        'tags': rng.sample(TAGS, rng.randint(1, 5)),
+        'technologies': rng.sample(TECHNOLOGIES, rng.randint(1, 4)),
+        'media': [],
+        'links': {},
+        'featured': i % 10 == 0,
+        'status': 'completed' if i % 5 else 'in-progress',
+        'order': rng.randint(0, 5),
+        'views': rng.randint(0, 5000),
+        'created_at': now - timedelta(hours=i),
+        'updated_at': now - timedelta(hours=i)
+    } for i in range(projects)])
+
+    if favorites:
+        db.session.execute(db.insert(models.Favorite), [{
+            'title': f'Favorite {i}',
+            'category': rng.choice(FAVORITE_CATEGORIES),
+            'tier': rng.choice(TIERS),
+            'order': i
+        } for i in range(favorites)])
+
+    if skills:
+        db.session.execute(db.insert(models.Skill), [{
+            'name': f'Skill {i}',
+            'category': rng.choice(SKILL_CATEGORIES),
+            'proficiency': rng.randint(30, 100)
+        } for i in range(skills)])
+
+    if contacts:
+        db.session.execute(db.insert(models.Contact), [{
+            'name': f'Visitor {i}',
+            'email': f'visitor{i}@example.com',
+            'subject': 'Hello',
+            'message': 'Synthetic message',
+            'status': rng.choice(['unread', 'read', 'replied']),
+            'created_at': now - timedelta(minutes=i)
+        } for i in range(contacts)])
+        # Bulk inserts bypass the counters the inbox maintains
+        recount_statuses()
+
+    db.session.commit()
+
+    # Bulk inserts bypass the ORM events that maintain the search index
+    from utils.search_index import rebuild_search_index
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.begin() as connection:
+            if connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_fts'"
+            ).first():
+                rebuild_search_index(connection)
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        'requests': total,
+        'errors': errors,
+        'throughput_rps': round(total / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3)
+    }
+
+def expand(path, rng, projects):
+    return path.format(slug=rng.randrange(max(projects, 1)))
+
+def run_inprocess(app, headers, args):
+    """Sequential requests through the Flask test client (no network, no concurrency)"""
+    client = app.test_client()
+    results = {}
+    for name, path, admin in ENDPOINTS:
+        rng = random.Random(name)
+        for _ in range(args.warmup):
+            client.get(expand(path, rng, args.projects), headers=headers if admin else None)
+
+        latencies, errors = [], 0
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            url = expand(path, rng, args.projects)
+            t0 = time.perf_counter()
+            response = client.get(url, headers=headers if admin else None)
+            elapsed = time.perf_counter() - t0
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(elapsed)
+        results[name] = summarize(latencies, errors, time.perf_counter() - start)
+        print(f"  in-process  {name:<20} {results[name]['throughput_rps']:>9} rps  "
+              f"p95 {results[name]['p95_ms']} ms")
+    return results
+
+def serve(app):
+    """Start a threaded WSGI server on a free port; returns (server, port)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+    # Per-request access logs would dominate the output (and the timings)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, name='bench-server', daemon=True).start()
+    return server, server.server_port
+
+def run_socket(app, headers, args):
+    """Concurrent keep-alive HTTP clients against a real server socket"""
+    server, port = serve(app)
+    local = threading.local()
+
+    def fetch(url, admin):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        t0 = time.perf_counter()
+        try:
+            connection.request('GET', url, headers={**(headers if admin else {}), 'Accept-Encoding': 'gzip'})
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            local.connection = None
+            ok = False
+        return ok, time.perf_counter() - t0
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix='bench-client') as pool:
+            for name, path, admin in ENDPOINTS:
+                rng = random.Random(name)
+                urls = [expand(path, rng, args.projects) for _ in range(args.requests)]
+                list(pool.map(lambda url: fetch(url, admin), urls[:args.warmup]))
+
+                start = time.perf_counter()
+                outcomes = list(pool.map(lambda url: fetch(url, admin), urls))
+                elapsed = time.perf_counter() - start
+
+                latencies = [t for ok, t in outcomes if ok]
+                results[name] = summarize(latencies, len(outcomes) - len(latencies), elapsed)
+                print(f"  socket x{args.concurrency:<3} {name:<20} {results[name]['throughput_rps']:>9} rps  "
+                      f"p95 {results[name]['p95_ms']} ms")
+    finally:
+        server.shutdown()
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ['CACHE_BACKEND'] = args.cache
+    os.environ['JOBS_WORKERS'] = '0'
+    os.environ['QUERY_INSPECTOR'] = '0'
+
+    from migrate import upgrade_database
+    from app import create_app
+    from database import db
+    from utils.auth import generate_token
+    import models
+
+    upgrade_database(log=None)
+    app = create_app()
+    with app.app_context():
+        seed(db, models, args.projects, args.favorites, args.skills, args.contacts)
+        token = generate_token({'id': 1, 'username': 'bench'})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f"Seeded {args.projects} projects, {args.favorites} favorites, "
+          f"{args.skills} skills, {args.contacts} contacts (cache: {args.cache})")
+
+    results = {}
+    if args.mode in ('inprocess', 'both'):
+        results['inprocess'] = run_inprocess(app, headers, args)
+    if args.mode in ('socket', 'both'):
+        results['socket'] = run_socket(app, headers, args)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'seed': {'projects': args.projects, 'favorites': args.favorites,
+                     'skills': args.skills, 'contacts': args.contacts},
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'cache': args.cache
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+def compare(args):
+    """Print per-endpoint changes and exit 1 if any metric regressed past the threshold"""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    if baseline['meta'].get('seed') != candidate['meta'].get('seed'):
+        print('warning: runs used different seed sizes; comparison may be meaningless')
+
+    regressions = 0
+    for mode, endpoints in candidate['results'].items():
+        for name, new in endpoints.items():
+            old = baseline['results'].get(mode, {}).get(name)
+            if not old:
+                continue
+
+            changes = []
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+                if old[metric] and (new[metric] - old[metric]) / old[metric] * 100 > args.threshold:
+                    changes.append(f"{metric} {old[metric]} -> {new[metric]}")
+            if old['throughput_rps'] and \
+                    (old['throughput_rps'] - new['throughput_rps']) / old['throughput_rps'] * 100 > args.threshold:
+                changes.append(f"throughput {old['throughput_rps']} -> {new['throughput_rps']} rps")
+            if new['errors'] > old['errors']:
+                changes.append(f"errors {old['errors']} -> {new['errors']}")
+
+            if changes:
+                regressions += 1
+                print(f"REGRESSION  {mode:<9} {name:<20} " + '; '.join(changes))
+            else:
+                delta = (new['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0.0
+                print(f"ok          {mode:<9} {name:<20} p95 {old['p95_ms']} -> {new['p95_ms']} ms ({delta:+.1f}%)")
+
+    print(f"{regressions} regressions (threshold {args.threshold}%)")
+    sys.exit(1 if regressions else 0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='seed a database and benchmark every endpoint')
+    run_parser.add_argument('--projects', type=int, default=1000)
+    run_parser.add_argument('--favorites', type=int, default=200)
+    run_parser.add_argument('--skills', type=int, default=50)
+    run_parser.add_argument('--contacts', type=int, default=1000)
+    run_parser.add_argument('--mode', choices=['inprocess', 'socket', 'both'], default='both')
+    run_parser.add_argument('--requests', type=int, default=200, help='measured requests per endpoint')
+    run_parser.add_argument('--warmup', type=int, default=10, help='unmeasured requests per endpoint')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='socket mode client threads')
+    run_parser.add_argument('--cache', choices=['memory', 'none'], default='memory',
+                            help="response cache backend ('none' measures the database path)")
+    run_parser.add_argument('--output', default='bench_api.json')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions between two runs')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=10.0,
+                                help='percent change counted as a regression')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        compare(args)
+
+if __name__ == '__main__':
+    main()
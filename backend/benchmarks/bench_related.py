@@ -0,0 +1,102 @@
+"""
+Benchmark related-project lookups: full table scan vs the inverted index.
+
+Usage: python benchmarks/bench_related.py [--projects 10000] [--lookups 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TAGS = [f'tag-{i}' for i in range(300)]
+TECHNOLOGIES = [f'tech-{i}' for i in range(150)]
+
+def seed(db, Project, count):
+    """Insert synthetic projects with a few random tags and technologies each"""
+    rng = random.Random(42)
+    rows = [{
+        'title': f'Project {i}',
+        'slug': f'project-{i}',
+        'short_description': 'Synthetic project',
+        'tags': rng.sample(TAGS, rng.randint(1, 5)),
+        'technologies': rng.sample(TECHNOLOGIES, rng.randint(1, 4)),
+        'media': [],
+        'status': 'completed',
+        'views': 0
+    } for i in range(count)]
+    db.session.execute(db.insert(Project), rows)
+    db.session.commit()
+
+def related_by_scan(Project, slug):
+    """The original per-request algorithm: score every other project in Python"""
+    current_project = Project.query.filter_by(slug=slug).first()
+    related_projects = []
+    for project in Project.query.filter(Project.slug != slug).all():
+        score = 0
+        if current_project.tags and project.tags:
+            score += len(set(current_project.tags) & set(project.tags)) * 2
+        if current_project.technologies and project.technologies:
+            score += len(set(current_project.technologies) & set(project.technologies))
+        if score > 0:
+            related_projects.append((project, score))
+    related_projects.sort(key=lambda x: x[1], reverse=True)
+    return [(p.id, score) for p, score in related_projects[:3]]
+
+def timed(fn, slugs):
+    start = time.perf_counter()
+    results = [fn(slug) for slug in slugs]
+    return (time.perf_counter() - start) / len(slugs), results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--projects', type=int, default=10000)
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--scan-lookups', type=int, default=20,
+                        help='lookups for the (slow) scan baseline')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+    from migrate import upgrade_database
+    from app import create_app
+    from database import db
+    from models import Project
+    from utils.related_index import RelatedIndex
+
+    upgrade_database(log=None)
+    app = create_app()
+    with app.app_context():
+        seed(db, Project, args.projects)
+
+        rng = random.Random(7)
+        slugs = [f'project-{rng.randrange(args.projects)}' for _ in range(args.lookups)]
+
+        scan_time, scan_results = timed(lambda slug: related_by_scan(Project, slug),
+                                        slugs[:args.scan_lookups])
+
+        index = RelatedIndex()
+        start = time.perf_counter()
+        index.build()
+        build_time = time.perf_counter() - start
+        index_time, index_results = timed(lambda slug: index.related(slug), slugs)
+
+        # Same scores as the scan (ids may differ between equal-score ties)
+        mismatches = sum(
+            1 for a, b in zip(scan_results, index_results)
+            if [score for _, score in a] != [score for _, score in b]
+        )
+
+    print(f'projects:          {args.projects}')
+    print(f'scan per lookup:   {scan_time * 1000:.2f} ms ({args.scan_lookups} lookups)')
+    print(f'index build:       {build_time * 1000:.2f} ms (once)')
+    print(f'index per lookup:  {index_time * 1000:.3f} ms ({args.lookups} lookups)')
+    print(f'speedup:           {scan_time / index_time:.0f}x')
+    print(f'score mismatches:  {mismatches}')
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,202 @@
+import time
+from flask import g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import CompoundSelect, Select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from utils.metrics import metrics
+
+# Blueprints whose GET requests may read from DATABASE_REPLICA_URL
+REPLICA_BLUEPRINTS = {'public', 'projects', 'favorites'}
+
+# Clients that just wrote carry this cookie so their reads stay on the primary
+READ_YOUR_WRITES_COOKIE = 'db_primary_until'
+
+# Until this time.time() every read in this process goes to the primary, so
+# caches rebuilt right after a write never store a lagging replica's data
+_primary_until = 0.0
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica in read-only requests and uses the primary otherwise.
+
+    Only SELECT statements can go to the replica; text() and anything else
+    whose effect cannot be told from the statement stays on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None
+                and not self._flushing
+                and isinstance(clause, (Select, CompoundSelect))
+                and not self.info.get('wrote')
+                and has_request_context()
+                and g.get('db_replica')
+                and 'replica' in self._db.engines):
+            return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flushed(session, flush_context):
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _committed(session):
+    global _primary_until
+    if session.info.pop('wrote', False):
+        _primary_until = max(_primary_until, time.time() + session.info.get('read_your_writes', 0))
+        if has_request_context():
+            g.db_wrote = True
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _rolled_back(session):
+    session.info.pop('wrote', None)
 
 # Initialize the database instance
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+POOL_CHECKOUT_WAIT = metrics.histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled database connection'
+)
+POOL_CHECKOUT_TIMEOUTS = metrics.counter(
+    'db_pool_checkout_timeouts_total', 'Checkouts that gave up after DB_POOL_TIMEOUT'
+)
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (including connects)"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+def _pool_gauge(method):
+    def read():
+        pool = db.engine.pool
+        return getattr(pool, method)() if isinstance(pool, QueuePool) else None
+    return read
+
+metrics.gauge('db_pool_checked_out', 'Connections currently checked out of the pool', _pool_gauge('checkedout'))
+metrics.gauge('db_pool_overflow', 'Connections open beyond pool_size (negative while below it)', _pool_gauge('overflow'))
+
+def _is_sqlite(uri):
+    return uri.startswith('sqlite')
+
+def _is_sqlite_memory(uri):
+    return _is_sqlite(uri) and (uri in ('sqlite://', 'sqlite:///') or ':memory:' in uri or 'mode=memory' in uri)
+
+def engine_options(uri, config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the database URI from DB_* settings"""
+    if _is_sqlite_memory(uri):
+        # Flask-SQLAlchemy shares one connection for in-memory databases
+        return {}
+
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30)
+    }
+    if _is_sqlite(uri):
+        return options
+
+    options['pool_pre_ping'] = config.get('DB_POOL_PRE_PING', True)
+    options['pool_recycle'] = config.get('DB_POOL_RECYCLE', 1800)
+
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 30000)
+    if statement_timeout and uri.startswith('postgres'):
+        options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout)}'}
+    return options
+
+def _sqlite_pragmas(config):
+    busy_timeout = int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    mmap_size = int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # WAL lets readers run alongside the view-count and job writers
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute(f'PRAGMA busy_timeout={busy_timeout}')
+            cursor.execute(f'PRAGMA mmap_size={mmap_size}')
+        finally:
+            cursor.close()
+    return on_connect
+
+def init_db(app):
+    """Initialize db for the app with tuned engine options, per-connection settings and replica routing"""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri, app.config))
+
+    replica_uri = app.config.get('DATABASE_REPLICA_URL')
+    if replica_uri:
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds['replica'] = dict(engine_options(replica_uri, app.config), url=replica_uri)
+
+    db.init_app(app)
+
+    with app.app_context():
+        for key, engine_uri in ((None, uri), ('replica', replica_uri)):
+            if engine_uri and _is_sqlite(engine_uri) and not _is_sqlite_memory(engine_uri):
+                event.listen(db.engines[key], 'connect', _sqlite_pragmas(app.config))
+
+    if replica_uri:
+        init_replica_routing(app)
+
+def init_replica_routing(app):
+    """Route public GET requests to the replica except right after a write"""
+    window = app.config.get('DB_READ_YOUR_WRITES_SECONDS', 5)
+
+    @app.before_request
+    def choose_database():
+        db.session.info['read_your_writes'] = window
+        now = time.time()
+        try:
+            client_until = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+        except ValueError:
+            client_until = 0.0
+        g.db_replica = (
+            request.method in ('GET', 'HEAD')
+            and request.blueprint in REPLICA_BLUEPRINTS
+            and now >= _primary_until
+            and now >= client_until
+        )
+
+    @app.after_request
+    def remember_write(response):
+        if g.get('db_wrote'):
+            response.set_cookie(READ_YOUR_WRITES_COOKIE, f'{time.time() + window:.3f}',
+                                max_age=max(int(window), 1), httponly=True, samesite='Lax')
+        return response
+
+def pool_status():
+    """Pool occupancy and checkout wait statistics for the current app's engine"""
+    pool = db.engine.pool
+    status = {'class': type(pool).__name__, 'replica': 'replica' in db.engines}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        })
+    wait = POOL_CHECKOUT_WAIT.snapshot()
+    status['checkout_wait'] = {
+        'count': wait['count'],
+        'avg_ms': round(wait['avg'] * 1000, 3),
+        'max_ms': round(wait['max'] * 1000, 3)
+    }
+    status['checkout_timeouts'] = POOL_CHECKOUT_TIMEOUTS.snapshot()['count']
+    return status
@@ -0,0 +1,176 @@
+"""
+Query-plan audit: run every public and admin read route, capture the SQL it
+issues and EXPLAIN each statement. Exits non-zero if any query falls back to
+a full table scan that is not explicitly allowed below.
+
+Usage:
+    python explain_queries.py                 # fresh seeded SQLite database
+    DATABASE_URL=postgresql://... python explain_queries.py --no-seed
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+# Routes to audit (admin routes get a bearer token)
+ROUTES = [
+    '/api/projects/',
+    '/api/projects/?sort_by=date',
+    '/api/projects/?sort_by=views',
+    '/api/projects/?featured=1',
+    '/api/projects/?tag=audit',
+    '/api/projects/?technology=python',
+    '/api/projects/?limit=2',
+    '/api/projects/?limit=2&cursor={cursor}',
+    '/api/projects/?fields=id,title,image',
+    '/api/projects/audit-project-1',
+    '/api/projects/related/audit-project-1',
+    '/api/search?q=audit',
+    '/api/skills',
+    '/api/favorites/',
+    '/api/admin/contacts',
+    '/api/admin/contacts?status=unread',
+    '/api/admin/contacts?q=ann',
+    '/api/admin/contacts/counts',
+]
+
+# Statements that read every row by design: (pattern on the SQL, reason)
+ALLOWED_SCANS = [
+    (r'^SELECT projects\.id AS projects_id, .+\s+FROM projects\s+WHERE projects\.status = \S+ '
+     r'AND \(projects\.(?:tags|technologies) LIKE ',
+     'tag/technology filter matches inside a JSON list, which a b-tree index cannot'),
+    (r'^SELECT (?:count\(\*\) AS count_1\s+FROM \(SELECT )?projects\.id AS projects_id, .+\s+FROM projects\s+'
+     r'WHERE \(projects\.title LIKE .+ OR \(projects\.technologies LIKE ',
+     'substring search fallback when the full-text index is unavailable'),
+    (r'^SELECT contacts\.id AS contacts_id, .+\s+FROM contacts\s+WHERE (?:contacts\.status = \S+ AND \()?'
+     r'(?:lower\(contacts\.name\) LIKE lower|contacts\.name ILIKE )',
+     'admin inbox %q% search over name/email/subject (admin only)'),
+    (r'^SELECT projects\.id AS projects_id, projects\.slug AS projects_slug, projects\.tags AS projects_tags, '
+     r'projects\.technologies AS projects_technologies\s+FROM projects\s*$',
+     'related-project index build reads every project once'),
+    (r'^SELECT favorites\.id AS favorites_id, .*\s+FROM favorites\s*$',
+     'favorites snapshot build reads every favorite once'),
+    (r'FROM contact_status_counts\s*$', 'one row per contact status'),
+]
+
+def seed(db, models):
+    """Insert a few rows of everything so every route has work to do"""
+    from datetime import datetime, timedelta
+    now = datetime.utcnow()
+    for i in range(5):
+        db.session.add(models.Project(
+            title=f'Audit project {i}', slug=f'audit-project-{i}', short_description='audit',
+            full_description='audit text', tags=['audit', f't{i}'], technologies=['python'],
+            media=[], links={}, status='completed', order=i % 2, views=0,
+            created_at=now - timedelta(days=i)
+        ))
+        db.session.add(models.Skill(name=f'Skill {i}', category='Languages', proficiency=50 + i))
+        db.session.add(models.Favorite(title=f'Film {i}', category='film', tier='S-Tier', order=i))
+        db.session.add(models.Contact(name='A', email='a@example.com', subject='Hi', message='Hello'))
+    db.session.commit()
+
+def capture(app, db, routes, headers):
+    """Run each route and record the SELECTs it executes"""
+    from sqlalchemy import event
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            captured.append((current_route[0], statement, parameters))
+
+    current_route = [None]
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+
+    client = app.test_client()
+    cursor = None
+    try:
+        for route in routes:
+            if '{cursor}' in route:
+                if not cursor:
+                    continue
+                route = route.format(cursor=cursor)
+            current_route[0] = route
+            response = client.get(route, headers=headers)
+            if response.status_code >= 400:
+                print(f'!! {route} returned {response.status_code}')
+            cursor = response.headers.get('X-Next-Cursor') or cursor
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return captured
+
+def full_scans(db, statement, parameters):
+    """EXPLAIN a statement and return the plan lines that are full table scans"""
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == 'sqlite':
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            plan = [row[-1] for row in rows]
+            # "SCAN t" is a table scan; "SCAN t USING [COVERING] INDEX" walks an index
+            return plan, [line for line in plan
+                          if re.match(r'SCAN \w+$', line) and 'VIRTUAL TABLE' not in line]
+
+        # Make the planner prefer any usable index even on tiny tables
+        conn.exec_driver_sql('SET enable_seqscan = off')
+        rows = conn.exec_driver_sql(f'EXPLAIN {statement}', parameters).all()
+        plan = [row[0] for row in rows]
+        return plan, [line for line in plan if 'Seq Scan' in line]
+
+def allowed(statement):
+    for pattern, reason in ALLOWED_SCANS:
+        if re.search(pattern, statement, re.IGNORECASE | re.DOTALL):
+            return reason
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN every route query and fail on full scans')
+    parser.add_argument('--no-seed', action='store_true', help='use DATABASE_URL as is')
+    parser.add_argument('--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'audit.db')}"
+    # Every request must reach the database
+    os.environ['CACHE_BACKEND'] = 'none'
+    os.environ['JOBS_WORKERS'] = '0'
+
+    from migrate import upgrade_database
+    from app import create_app
+    from database import db
+    from utils.auth import generate_token
+    import models
+
+    if not args.no_seed:
+        upgrade_database(log=None)
+    app = create_app()
+    if not args.no_seed:
+        with app.app_context():
+            seed(db, models)
+
+    headers = {'Authorization': f"Bearer {generate_token({'id': 1, 'username': 'admin'})}"}
+    captured = capture(app, db, ROUTES, headers)
+
+    failures = 0
+    seen = set()
+    with app.app_context():
+        for route, statement, parameters in captured:
+            if statement in seen:
+                continue
+            seen.add(statement)
+
+            plan, scans = full_scans(db, statement, parameters)
+            reason = allowed(statement) if scans else None
+            if scans and not reason:
+                failures += 1
+                print(f'FULL SCAN  {route}\n  {" ".join(statement.split())}\n  ' + '\n  '.join(plan))
+            elif args.verbose:
+                status = f'allowed: {reason}' if reason else 'ok'
+                print(f'{status}  {route}\n  {" ".join(statement.split())}\n  ' + '\n  '.join(plan))
+
+    print(f'{len(seen)} distinct queries checked, {failures} full scans')
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""
+Backfill responsive variants (thumb/card/hero), dimensions and blur
+placeholders for media uploaded before the media pipeline existed.
+"""
+from app import create_app
+from database import db
+from models import Project
+from utils.media_pipeline import add_variants
+
+app = create_app()
+
+with app.app_context():
+    updated = 0
+    for project in Project.query.all():
+        if not project.media:
+            continue
+        media = [add_variants(dict(item)) if not item.get('variants') else item for item in project.media]
+        if media != project.media:
+            project.media = media
+            updated += 1
+    db.session.commit()
+    print(f'Added variants to {updated} projects')
@@ -0,0 +1,56 @@
+"""
+Apply database schema migrations. Run once per deploy, before starting the
+app workers (they only check the schema version and refuse to start if the
+database is behind).
+
+Usage:
+    python migrate.py               # upgrade to the latest version
+    python migrate.py --to 3        # upgrade up to version 3
+    python migrate.py status        # list applied and pending migrations
+"""
+import argparse
+import os
+from dotenv import load_dotenv
+from flask import Flask
+from database import db, init_db
+
+load_dotenv()
+
+def create_migration_app():
+    """Bare app bound to DATABASE_URL: no blueprints, workers or schema check"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///portfolio.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    init_db(app)
+    return app
+
+def upgrade_database(target=None, log=print):
+    """Apply pending migrations; returns the names applied"""
+    from utils.schema import upgrade
+
+    app = create_migration_app()
+    with app.app_context():
+        applied = upgrade(db.engine, target=target, log=log)
+        db.engine.dispose()
+    return applied
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply database schema migrations')
+    parser.add_argument('command', nargs='?', default='upgrade', choices=['upgrade', 'status'])
+    parser.add_argument('--to', type=int, help='stop after this version')
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        from utils.schema import status
+
+        app = create_migration_app()
+        with app.app_context():
+            for version, name, applied in status(db.engine):
+                print(f"{'applied' if applied else 'pending'}  {name}")
+        return
+
+    applied = upgrade_database(target=args.to)
+    print(f"Applied {len(applied)} migrations" if applied else 'Database schema is up to date')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""Create missing tables from the models (baseline for databases made by db.create_all())"""
+from database import db
+import models  # registers every table on db.metadata
+
+def upgrade(connection):
+    db.metadata.create_all(connection)
@@ -0,0 +1,20 @@
+"""Add projects.blocks and fill it from full_description (block JSON or legacy text)"""
+from sqlalchemy import select, update
+from models import Project
+from utils.blocks import content_to_blocks
+from utils.schema import add_column
+
+def upgrade(connection):
+    projects = Project.__table__
+    add_column(connection, projects.c.blocks)
+
+    rows = connection.execute(
+        select(projects.c.id, projects.c.full_description).where(projects.c.blocks.is_(None))
+    ).all()
+    for project_id, content in rows:
+        connection.execute(
+            update(projects)
+            .where(projects.c.id == project_id)
+            # Same content, so keep updated_at unchanged
+            .values(blocks=content_to_blocks(content), updated_at=projects.c.updated_at)
+        )
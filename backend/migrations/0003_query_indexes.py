@@ -0,0 +1,11 @@
+"""Create the query indexes declared in models.py on databases that predate them"""
+from database import db
+from utils.schema import create_index
+
+# Postgres builds them CONCURRENTLY
+transactional = False
+
+def upgrade(connection):
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            create_index(connection, index)
@@ -0,0 +1,11 @@
+"""Create the full-text search index (FTS5 table on SQLite, GIN tsvector index on Postgres)"""
+from utils.search_index import create_search_index, rebuild_search_index
+
+# Postgres builds the GIN index CONCURRENTLY
+transactional = False
+
+def upgrade(connection):
+    if create_search_index(connection) == 'fts5':
+        # Fill the new table in one transaction rather than row-by-row autocommits
+        with connection.engine.begin() as fill:
+            rebuild_search_index(fill)
@@ -0,0 +1,13 @@
+"""Add favorites.updated_at, backfilled from created_at"""
+from sqlalchemy import update
+from models import Favorite
+from utils.schema import add_column
+
+def upgrade(connection):
+    favorites = Favorite.__table__
+    add_column(connection, favorites.c.updated_at)
+    connection.execute(
+        update(favorites)
+        .where(favorites.c.updated_at.is_(None))
+        .values(updated_at=favorites.c.created_at)
+    )
@@ -0,0 +1,8 @@
+"""Contact status counters, filled by counting the existing messages once"""
+from models import ContactStatusCount
+from utils.inbox import recount_statuses
+
+def upgrade(connection):
+    ContactStatusCount.__table__.create(connection, checkfirst=True)
+    # From here on writes keep the counters current
+    recount_statuses(connection)
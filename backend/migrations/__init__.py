@@ -0,0 +1,12 @@
+"""
+Versioned schema migrations, applied by `python migrate.py`.
+
+Each module is named NNNN_description.py and defines upgrade(connection).
+Set `transactional = False` in a module whose statements cannot run inside a
+transaction (CREATE INDEX CONCURRENTLY); it then runs in autocommit mode.
+
+0001 builds fresh databases straight from models.py, so later migrations must
+check before adding a table, column or index (see the helpers in utils.schema).
+Keep every migration backwards compatible with the previous release: workers
+running the old code keep serving while the new schema is applied.
+"""
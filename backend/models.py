@@ -1,15 +1,22 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Index, func, literal_column
 from datetime import datetime
 from database import db
 
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        # GET /api/projects/ per sort_by, all filtered on status (sort_by=order is below)
+        Index('ix_projects_status_created_at', 'status', 'created_at', 'id'),
+        Index('ix_projects_status_views', 'status', 'views', 'id'),
+        Index('ix_projects_featured_status', 'featured', 'status'),
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(String(200), nullable=False)
     slug = Column(String(200), unique=True, nullable=False)
     short_description = Column(Text)
     full_description = Column(Text)
+    blocks = Column(JSON)  # [{id, type, content}] - parsed content blocks
     media = Column(JSON)  # [{type, url, caption}]
     tags = Column(JSON)  # ["React", "Node.js", etc.]
     technologies = Column(JSON)
@@ -21,6 +28,10 @@ class Project(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# Matches ORDER BY coalesce(order, 0), created_at DESC, id DESC in GET /api/projects/
+Index('ix_projects_status_order', Project.status, func.coalesce(Project.order, literal_column('0')),
+      Project.created_at.desc(), Project.id.desc())
+
 class Skill(db.Model):
     __tablename__ = 'skills'
     
@@ -32,8 +43,16 @@ class Skill(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# Matches ORDER BY category, proficiency DESC in GET /api/skills
+Index('ix_skills_category_proficiency', Skill.category, Skill.proficiency.desc())
+
 class Contact(db.Model):
     __tablename__ = 'contacts'
+    __table_args__ = (
+        # Inbox pages, newest first (keyset on created_at, id), optionally per status
+        Index('ix_contacts_status_created_at_id', 'status', 'created_at', 'id'),
+        Index('ix_contacts_created_at_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100))
@@ -43,8 +62,19 @@ class Contact(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String(50), default='unread')
 
+class ContactStatusCount(db.Model):
+    """Number of contact messages per status, kept up to date by utils.inbox"""
+    __tablename__ = 'contact_status_counts'
+    
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
 class Favorite(db.Model):
     __tablename__ = 'favorites'
+    __table_args__ = (
+        Index('ix_favorites_tier_order', 'tier', 'order', 'created_at'),
+        Index('ix_favorites_category_tier_order', 'category', 'tier', 'order'),
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(String(200), nullable=False)
@@ -55,4 +85,45 @@ class Favorite(db.Model):
     achievement = Column(String(200))  # for athletes
     poster_or_photo = Column(String(500))  # image URL
     created_at = Column(DateTime, default=datetime.utcnow)
-    order = Column(Integer, default=0)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    order = Column(Integer, default=0)
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+    
+    id = Column(String(32), primary_key=True)  # also the X-Unique-Upload-Id sent to Cloudinary
+    filename = Column(String(255), nullable=False)
+    folder = Column(String(200), default='portfolio')
+    storage = Column(String(20), nullable=False)  # 'cloudinary' or 'local'
+    size = Column(Integer, nullable=False)
+    received = Column(Integer, default=0)
+    status = Column(String(20), default='uploading')  # uploading, complete, failed
+    result = Column(JSON)  # media dict once complete
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)  # handler name, e.g. 'upload_media'
+    payload = Column(JSON)
+    status = Column(String(20), default='queued')  # queued, running, done, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    run_at = Column(DateTime, default=datetime.utcnow)  # not picked up before this time
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    result = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ContentVersion(db.Model):
+    """Write counter per content table; ETags are built from it (see utils.http_cache)"""
+    __tablename__ = 'content_versions'
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
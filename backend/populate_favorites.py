@@ -1,6 +1,10 @@
 """
 Script to populate the favorites database with sample data from the existing favorites page
+
+Sends every item in one NDJSON request to the admin bulk import endpoint
+(set ADMIN_PASSWORD if it differs from the development default).
 """
+import os
 import requests
 import json
 
@@ -78,17 +82,29 @@ favorites_data = [
 
 # Function to populate database
 def populate_favorites():
-    base_url = 'http://127.0.0.1:5000/api/favorites/'
+    api_url = os.getenv('API_URL', 'http://127.0.0.1:5000/api')
     
-    for favorite in favorites_data:
-        try:
-            response = requests.post(base_url, json=favorite)
-            if response.status_code == 201:
-                print(f"Added: {favorite['title']}")
-            else:
-                print(f"Failed to add {favorite['title']}: {response.text}")
-        except Exception as e:
-            print(f"Error adding {favorite['title']}: {str(e)}")
+    try:
+        login = requests.post(f'{api_url}/admin/login', json={'password': os.getenv('ADMIN_PASSWORD', 'admin123')})
+        login.raise_for_status()
+        
+        body = '\n'.join(json.dumps(favorite) for favorite in favorites_data)
+        response = requests.post(
+            f'{api_url}/admin/import/favorites',
+            data=body.encode(),
+            headers={
+                'Authorization': f"Bearer {login.json()['token']}",
+                'Content-Type': 'application/x-ndjson'
+            }
+        )
+        response.raise_for_status()
+        summary = response.json()
+        
+        print(f"Added {summary['inserted']} favorites")
+        for error in summary['errors']:
+            print(f"Failed line {error['line']}: {error['error']}")
+    except Exception as e:
+        print(f"Error importing favorites: {str(e)}")
 
 if __name__ == '__main__':
-    populate_favorites()
\ No newline at end of file
+    populate_favorites()
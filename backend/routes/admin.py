@@ -1,23 +1,41 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, url_for, stream_with_context
 from datetime import datetime
+from urllib.parse import urlencode
+from sqlalchemy import func, or_
+from werkzeug.http import parse_content_range_header
 from database import db
-from models import Project, Skill, Contact
+from models import Project, Skill, Contact, Favorite, UploadSession, Job
 from utils.auth import token_required, verify_admin_password, generate_token
-from utils.cloudinary_upload import upload_to_cloudinary, delete_from_cloudinary, upload_multiple_files
-import re
+from utils.slugs import escape_like, save_with_unique_slug, slugify
+from utils.cloudinary_upload import upload_to_cloudinary, upload_multiple_files
+from utils.jobs import job_status
+from utils.media_jobs import enqueue_upload, enqueue_media_deletes
+from utils.chunked_upload import start_upload, receive_chunks, upload_progress, UploadFailedError, UploadOffsetError
+from utils.view_counter import view_counter
+from utils.related_index import related_index
+from utils.events import publish
+from utils.blocks import content_to_blocks
+from utils.bulk import RESOURCES, import_ndjson, export_ndjson
+from utils.favorites_snapshot import favorites_snapshot
+from utils.ordering import reorder
+from utils.validation import check_favorite, parse_ids
+from utils.rate_limit import rate_limit
+from utils.inbox import CONTACT_STATUSES, set_status, status_counts
+from utils.pagination import encode_cursor, decode_cursor, keyset_filter, order_by_keys
+import json
 
 admin_bp = Blueprint('admin', __name__)
 
-def generate_slug(title):
-    """Generate URL-friendly slug from title"""
-    slug = title.lower()
-    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
-    slug = re.sub(r'[\s-]+', '-', slug)
-    return slug.strip('-')
+# Inbox order, newest first: (column, descending)
+CONTACT_KEYS = [(Contact.created_at, True), (Contact.id, True)]
+CONTACT_PREVIEW_LENGTH = 200
+MAX_BULK_CONTACTS = 1000
+
+# Favorite columns an update may set
+FAVORITE_FIELDS = ('title', 'category', 'tier', 'year', 'genre_or_sport', 'achievement', 'poster_or_photo', 'order')
 
 @admin_bp.route('/login', methods=['POST'])
+@rate_limit('RATE_LIMIT_LOGIN')
 def admin_login():
     """Admin login endpoint"""
     try:
@@ -64,13 +82,8 @@ def create_project(current_user):
         if not data.get('title'):
             return jsonify({'error': 'Title is required'}), 400
         
-        # Generate slug if not provided
-        slug = data.get('slug') or generate_slug(data['title'])
-        
-        # Check if slug already exists
-        existing = Project.query.filter_by(slug=slug).first()
-        if existing:
-            slug = f"{slug}-{int(datetime.now().timestamp())}"
+        # Generate slug if not provided (made unique when saving)
+        slug = data.get('slug') or slugify(data['title'])
         
         # Handle technologies - support both array and string formats
         tech_data = data.get('technologies', [])
@@ -82,7 +95,6 @@ def create_project(current_user):
         # Create project
         project = Project(
             title=data['title'],
-            slug=slug,
             short_description=data.get('short_description', ''),
             full_description=data.get('full_description', ''),
             media=data.get('media', []),
@@ -94,10 +106,12 @@ def create_project(current_user):
             order=data.get('order', 0)
         )
         
-        # Handle blocks field (store as JSON in full_description for now)
+        # Blocks are stored parsed; full_description keeps the JSON for clients reading content
         if data.get('blocks'):
-            import json
+            project.blocks = data['blocks']
             project.full_description = json.dumps(data['blocks'])
+        else:
+            project.blocks = content_to_blocks(project.full_description)
         
         # Handle image_url field for backward compatibility
         if data.get('image_url'):
@@ -118,8 +132,9 @@ def create_project(current_user):
                     'caption': 'Thumbnail'
                 })
         
-        db.session.add(project)
-        db.session.commit()
+        save_with_unique_slug(project, slug)
+        related_index.update(project)
+        publish('projects', project_id=project.id)
         
         return jsonify({
             'message': 'Project created successfully',
@@ -157,6 +172,7 @@ def update_project(current_user, id):
             project.short_description = data['short_description']
         if 'full_description' in data:
             project.full_description = data['full_description']
+            project.blocks = content_to_blocks(data['full_description'])
         if 'media' in data:
             project.media = data['media']
         if 'tags' in data:
@@ -177,9 +193,9 @@ def update_project(current_user, id):
         if 'order' in data:
             project.order = data['order']
             
-        # Handle blocks field (store as JSON in full_description)
+        # Blocks are stored parsed; full_description keeps the JSON for clients reading content
         if 'blocks' in data:
-            import json
+            project.blocks = data['blocks']
             project.full_description = json.dumps(data['blocks'])
         
         # Handle image_url field for backward compatibility
@@ -208,6 +224,8 @@ def update_project(current_user, id):
         
         project.updated_at = datetime.utcnow()
         db.session.commit()
+        related_index.update(project)
+        publish('projects', project_id=project.id)
         
         return jsonify({
             'message': 'Project updated successfully',
@@ -227,25 +245,46 @@ def delete_project(current_user, id):
         if not project:
             return jsonify({'error': 'Project not found'}), 404
         
-        # Delete associated media from Cloudinary
-        if project.media:
-            for media_item in project.media:
-                if media_item.get('public_id'):
-                    delete_from_cloudinary(media_item['public_id'])
+        media = project.media
         
         db.session.delete(project)
         db.session.commit()
         
+        # Delete associated media in the background, only once the row is gone
+        enqueue_media_deletes(media)
+        view_counter.forget(id)
+        related_index.remove(id)
+        publish('projects', project_id=id)
+        
         return jsonify({'message': 'Project deleted successfully'})
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/projects/reorder', methods=['POST'])
+@token_required
+def reorder_projects(current_user):
+    """Apply a new project ordering ({"ids": [...]} in display order) in one statement"""
+    try:
+        ids = parse_ids(request.get_json(silent=True))
+        reorder(Project, ids)
+        db.session.commit()
+        publish('projects', reordered=len(ids))
+        
+        return jsonify({'message': 'Projects reordered successfully', 'count': len(ids)})
+        
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/upload', methods=['POST'])
 @token_required
 def upload_media(current_user):
-    """Upload media files to Cloudinary"""
+    """Upload media files to Cloudinary (queued; pass sync=1 to wait for the result)"""
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
@@ -253,6 +292,15 @@ def upload_media(current_user):
         file = request.files['file']
         folder = request.form.get('folder', 'portfolio')
         
+        if request.values.get('sync') not in ('1', 'true'):
+            # Hand the upload to a background worker and answer right away
+            job = enqueue_upload(file, folder)
+            return jsonify({
+                'message': 'File queued for upload',
+                'job_id': job.id,
+                'status_url': url_for('admin.get_job', id=job.id)
+            }), 202
+        
         # Upload to Cloudinary
         result = upload_to_cloudinary(file, folder)
         
@@ -277,8 +325,18 @@ def upload_multiple_media(current_user):
         
         folder = request.form.get('folder', 'portfolio')
         
-        # Upload files
-        uploaded, errors = upload_multiple_files(files, folder)
+        # Per-request concurrency, capped by the server setting
+        max_workers = current_app.config.get('UPLOAD_MAX_WORKERS', 4)
+        concurrency = request.form.get('concurrency', type=int)
+        if concurrency:
+            max_workers = max(1, min(concurrency, max_workers))
+        
+        # Upload files in parallel
+        uploaded, errors = upload_multiple_files(
+            files, folder,
+            max_workers=max_workers,
+            timeout=current_app.config.get('UPLOAD_TIMEOUT')
+        )
         
         return jsonify({
             'message': f'{len(uploaded)} files uploaded successfully',
@@ -286,51 +344,186 @@ def upload_multiple_media(current_user):
             'errors': errors
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/upload-stream', methods=['POST'])
+@token_required
+def start_stream_upload(current_user):
+    """Start a resumable chunked upload for a large file"""
+    try:
+        data = request.get_json()
+        
+        session = start_upload(data.get('filename'), data.get('size'), data.get('folder', 'portfolio'))
+        
+        return jsonify(dict(upload_progress(session),
+                            chunk_size=current_app.config.get('UPLOAD_CHUNK_SIZE'))), 201
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/upload-stream/<upload_id>', methods=['PUT'])
+@token_required
+def stream_upload_chunks(current_user, upload_id):
+    """Stream (part of) the file body; Content-Range gives the starting byte"""
+    try:
+        session = UploadSession.query.get(upload_id)
+        if not session:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        start = 0
+        content_range = parse_content_range_header(request.headers.get('Content-Range'))
+        if content_range is not None:
+            start = content_range.start
+        
+        session = receive_chunks(session, request.stream, start)
+        
+        return jsonify(upload_progress(session))
+        
+    except UploadOffsetError as e:
+        return jsonify({'error': str(e), 'received': e.received}), 409
+    except UploadFailedError as e:
+        return jsonify({'error': str(e), 'status': 'failed'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/upload-stream/<upload_id>', methods=['GET'])
+@token_required
+def get_stream_upload(current_user, upload_id):
+    """Get progress of a chunked upload (where to resume from)"""
+    try:
+        session = UploadSession.query.get(upload_id)
+        if not session:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        return jsonify(upload_progress(session))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/jobs/<int:id>', methods=['GET'])
+@token_required
+def get_job(current_user, id):
+    """Get status of a background job (e.g. a queued upload)"""
+    try:
+        job = Job.query.get(id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify(job_status(job))
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/contacts', methods=['GET'])
 @token_required
 def get_contacts(current_user):
-    """Get all contact messages"""
+    """Get contact messages newest first, one page at a time (status and sender/subject filters)"""
     try:
         status = request.args.get('status')
-        
-        query = Contact.query
+        q = request.args.get('q', '').strip()
+        cursor = request.args.get('cursor')
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        
+        # Bodies stay in the database; the list only needs a preview
+        query = db.session.query(
+            Contact.id, Contact.name, Contact.email, Contact.subject, Contact.status, Contact.created_at,
+            func.substr(Contact.message, 1, CONTACT_PREVIEW_LENGTH).label('preview')
+        )
         if status:
-            query = query.filter_by(status=status)
-        
-        contacts = query.order_by(Contact.created_at.desc()).all()
-        
-        return jsonify([{
+            query = query.filter(Contact.status == status)
+        if q:
+            pattern = f'%{escape_like(q)}%'
+            query = query.filter(or_(
+                Contact.name.ilike(pattern, escape='\\'),
+                Contact.email.ilike(pattern, escape='\\'),
+                Contact.subject.ilike(pattern, escape='\\')
+            ))
+        if cursor:
+            try:
+                query = query.filter(keyset_filter(CONTACT_KEYS, decode_cursor(cursor)))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        contacts = query.order_by(*order_by_keys(CONTACT_KEYS)).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(contacts) > limit:
+            contacts = contacts[:limit]
+            next_cursor = encode_cursor([contacts[-1].created_at, contacts[-1].id])
+        
+        response = jsonify([{
             'id': c.id,
             'name': c.name,
             'email': c.email,
             'subject': c.subject,
-            'message': c.message,
+            'preview': c.preview,
             'status': c.status,
             'created_at': c.created_at.isoformat() if c.created_at else None
         } for c in contacts])
         
+        if next_cursor:
+            args = request.args.to_dict()
+            args['cursor'] = next_cursor
+            args['limit'] = limit
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+        
+        return response
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@admin_bp.route('/contacts/<int:id>/status', methods=['PUT'])
+@admin_bp.route('/contacts/<int:id>', methods=['GET'])
 @token_required
-def update_contact_status(current_user, id):
-    """Update contact message status"""
+def get_contact(current_user, id):
+    """Get one contact message with its full body"""
     try:
         contact = Contact.query.get(id)
         if not contact:
             return jsonify({'error': 'Contact not found'}), 404
         
+        return jsonify({
+            'id': contact.id,
+            'name': contact.name,
+            'email': contact.email,
+            'subject': contact.subject,
+            'message': contact.message,
+            'status': contact.status,
+            'created_at': contact.created_at.isoformat() if contact.created_at else None
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/contacts/counts', methods=['GET'])
+@token_required
+def get_contact_counts(current_user):
+    """Get the number of unread, read and replied messages"""
+    try:
+        return jsonify(status_counts())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/contacts/<int:id>/status', methods=['PUT'])
+@token_required
+def update_contact_status(current_user, id):
+    """Update contact message status"""
+    try:
         data = request.get_json()
         status = data.get('status')
         
-        if status not in ['unread', 'read', 'replied']:
+        if status not in CONTACT_STATUSES:
             return jsonify({'error': 'Invalid status'}), 400
         
-        contact.status = status
+        if not set_status([id], status) and not db.session.query(Contact.id).filter_by(id=id).first():
+            return jsonify({'error': 'Contact not found'}), 404
         db.session.commit()
         
         return jsonify({'message': 'Status updated successfully'})
@@ -339,6 +532,32 @@ def update_contact_status(current_user, id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/contacts/status', methods=['PUT'])
+@token_required
+def update_contact_statuses(current_user):
+    """Set the status of many contact messages at once ({"ids": [...], "status": ...})"""
+    try:
+        data = request.get_json(silent=True)
+        ids = parse_ids(data)
+        status = data.get('status')
+        
+        if status not in CONTACT_STATUSES:
+            return jsonify({'error': 'Invalid status'}), 400
+        if len(ids) > MAX_BULK_CONTACTS:
+            return jsonify({'error': f'At most {MAX_BULK_CONTACTS} ids per request'}), 400
+        
+        updated = set_status(ids, status)
+        db.session.commit()
+        
+        return jsonify({'message': 'Status updated successfully', 'updated': updated})
+        
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/skills', methods=['POST'])
 @token_required
 def create_skill(current_user):
@@ -355,6 +574,7 @@ def create_skill(current_user):
         
         db.session.add(skill)
         db.session.commit()
+        publish('skills', skill_id=skill.id)
         
         return jsonify({
             'message': 'Skill created successfully',
@@ -376,9 +596,110 @@ def delete_skill(current_user, id):
         
         db.session.delete(skill)
         db.session.commit()
+        publish('skills', skill_id=id)
         
         return jsonify({'message': 'Skill deleted successfully'})
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/favorites/<int:id>', methods=['PUT'])
+@token_required
+def update_favorite(current_user, id):
+    """Update existing favorite"""
+    try:
+        favorite = Favorite.query.get(id)
+        if not favorite:
+            return jsonify({'error': 'Favorite not found'}), 404
+        
+        try:
+            data = check_favorite(request.get_json(silent=True), partial=True)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        for field in FAVORITE_FIELDS:
+            if field in data:
+                setattr(favorite, field, data[field])
+        
+        favorite.updated_at = datetime.utcnow()
+        db.session.commit()
+        favorites_snapshot.update(favorite)
+        publish('favorites', favorite_id=favorite.id)
+        
+        return jsonify({'message': 'Favorite updated successfully', 'id': favorite.id})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/favorites/<int:id>', methods=['DELETE'])
+@token_required
+def delete_favorite(current_user, id):
+    """Delete favorite"""
+    try:
+        favorite = Favorite.query.get(id)
+        if not favorite:
+            return jsonify({'error': 'Favorite not found'}), 404
+        
+        db.session.delete(favorite)
+        db.session.commit()
+        favorites_snapshot.remove(id)
+        publish('favorites', favorite_id=id)
+        
+        return jsonify({'message': 'Favorite deleted successfully'})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/favorites/reorder', methods=['POST'])
+@token_required
+def reorder_favorites(current_user):
+    """Apply a new favorites ordering ({"ids": [...]} in display order) in one statement"""
+    try:
+        ids = parse_ids(request.get_json(silent=True))
+        reorder(Favorite, ids)
+        db.session.commit()
+        # Sort keys moved in several tiers at once
+        favorites_snapshot.invalidate()
+        publish('favorites', reordered=len(ids))
+        
+        return jsonify({'message': 'Favorites reordered successfully', 'count': len(ids)})
+        
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/import/<resource>', methods=['POST'])
+@token_required
+def bulk_import(current_user, resource):
+    """Import projects, favorites or skills from an NDJSON body (one JSON object per line)"""
+    if resource not in RESOURCES:
+        return jsonify({'error': f"Unknown resource: {resource}"}), 404
+    
+    try:
+        batch_size = min(max(request.args.get('batch_size', 500, type=int), 1), 5000)
+        # Read the body line by line; it is never held in memory as a whole
+        summary = import_ndjson(resource, request.stream, batch_size=batch_size)
+        return jsonify(summary)
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/export/<resource>', methods=['GET'])
+@token_required
+def bulk_export(current_user, resource):
+    """Stream every project, favorite or skill as NDJSON (importable as-is)"""
+    if resource not in RESOURCES:
+        return jsonify({'error': f"Unknown resource: {resource}"}), 404
+    
+    return Response(
+        stream_with_context(export_ndjson(resource)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename={resource}.ndjson'}
+    )
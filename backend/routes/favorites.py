@@ -1,56 +1,80 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import Blueprint, Response, g, jsonify, request
 from models import Favorite
 from database import db
+from utils.cache import cached
+from utils.http_cache import conditional
+from utils.events import publish
+from utils.favorites_snapshot import CATEGORIES, favorites_snapshot
+from utils.pagination import encode_cursor, decode_cursor
+from utils.rate_limit import rate_limit
+from utils.validation import check_favorite
 
 favorites_bp = Blueprint('favorites', __name__)
 
+# Model category values accepted in place of the response keys
+CATEGORY_ALIASES = {'film': 'films', 'athlete': 'athletes'}
+
 @favorites_bp.route('/', methods=['GET'])
+@conditional('favorites')
+@cached('favorites')
 def get_favorites():
-    """Get all favorites grouped by category and tier"""
+    """Get favorites grouped by category and tier, optionally one category/tier and paginated"""
     try:
-        favorites = Favorite.query.order_by(Favorite.tier, Favorite.order, Favorite.created_at).all()
+        category = request.args.get('category')
+        tier = request.args.get('tier')
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        
+        if category is not None:
+            category = CATEGORY_ALIASES.get(category, category)
+            if category not in CATEGORIES:
+                return jsonify({'error': f"Unknown category: {category}"}), 400
+        
+        paginate = cursor is not None or limit is not None
+        if paginate and not (category and tier):
+            return jsonify({'error': 'Pagination requires both category and tier'}), 400
+        
+        favorites_snapshot.ensure_current(g.get('content_version'))
+        
+        next_cursor = None
+        if paginate:
+            limit = min(max(limit or 20, 1), 100)
+            after = None
+            if cursor:
+                try:
+                    after = decode_cursor(cursor)
+                    if len(after) != 3 or not isinstance(after[1], datetime) or not all(isinstance(v, int) for v in after[::2]):
+                        raise ValueError('Invalid cursor')
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+            body, next_key = favorites_snapshot.page(category, tier, after, limit)
+            if next_key:
+                next_cursor = encode_cursor(next_key)
+        else:
+            body = favorites_snapshot.payload(category, tier)
         
-        result = {
-            'films': {},
-            'athletes': {}
-        }
+        response = Response(body, mimetype='application/json')
         
-        for favorite in favorites:
-            category = 'films' if favorite.category == 'film' else 'athletes'
-            tier = favorite.tier
-            
-            if tier not in result[category]:
-                result[category][tier] = []
-            
-            item_data = {
-                'id': favorite.id,
-                'title': favorite.title,
-                'year': favorite.year,
-                'poster': favorite.poster_or_photo
-            }
-            
-            if favorite.category == 'film':
-                item_data['genre'] = favorite.genre_or_sport
-            else:
-                item_data['name'] = favorite.title
-                item_data['sport'] = favorite.genre_or_sport
-                item_data['achievement'] = favorite.achievement
-                item_data['photo'] = favorite.poster_or_photo
-                # Remove title for athletes as they use 'name'
-                del item_data['title']
-            
-            result[category][tier].append(item_data)
+        if next_cursor:
+            args = request.args.to_dict()
+            args['cursor'] = next_cursor
+            args['limit'] = limit
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
         
-        return jsonify(result)
+        return response
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @favorites_bp.route('/', methods=['POST'])
+@rate_limit('RATE_LIMIT_FAVORITES')
 def create_favorite():
     """Create a new favorite item"""
     try:
-        data = request.get_json()
+        data = check_favorite(request.get_json(silent=True))
         
         favorite = Favorite(
             title=data.get('title'),
@@ -65,9 +89,13 @@ def create_favorite():
         
         db.session.add(favorite)
         db.session.commit()
+        favorites_snapshot.update(favorite)
+        publish('favorites', favorite_id=favorite.id)
         
         return jsonify({'message': 'Favorite created successfully', 'id': favorite.id}), 201
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
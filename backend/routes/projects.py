@@ -1,14 +1,68 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import load_only
+from urllib.parse import urlencode
 from database import db
 from models import Project
 from utils.auth import token_required
-import re
+from utils.view_counter import view_counter
+from utils.related_index import related_index
+from utils.cache import cached
+from utils.http_cache import conditional
+from utils.events import publish
+from utils.blocks import content_to_blocks
+from utils.media_pipeline import responsive_image
+from utils.pagination import encode_cursor, decode_cursor, keyset_filter, order_by_keys
+from utils.slugs import has_slug_base, save_with_unique_slug, slugify
 
 projects_bp = Blueprint('projects', __name__)
 
+def get_blocks(project):
+    """Get project content as blocks (rows not yet migrated are converted on the fly)"""
+    if project.blocks is not None:
+        return project.blocks
+    return content_to_blocks(project.full_description)
+
+# Listing fields -> (columns to load, serializer)
+PROJECT_LIST_FIELDS = {
+    'id': ([Project.id], lambda p: p.id),
+    'title': ([Project.title], lambda p: p.title),
+    'description': ([Project.short_description], lambda p: p.short_description),
+    'content': ([Project.full_description], lambda p: p.full_description),
+    'blocks': ([Project.blocks], get_blocks),
+    'technologies': ([Project.technologies], lambda p: ','.join(p.technologies) if p.technologies else ''),
+    'demo_url': ([Project.links], lambda p: p.links.get('demo', '') if p.links else ''),
+    'github_url': ([Project.links], lambda p: p.links.get('github', '') if p.links else ''),
+    'image_url': ([Project.media], lambda p: p.media[0]['url'] if p.media and len(p.media) > 0 else ''),
+    'image': ([Project.media], lambda p: responsive_image(p.media[0]) if p.media else None),
+    'status': ([Project.status], lambda p: p.status),
+    'media': ([Project.media], lambda p: p.media),
+    'created_at': ([Project.created_at], lambda p: p.created_at.isoformat() if p.created_at else None)
+}
+
+# Keyset per sort: [(sort expression, descending, value getter)]
+PROJECT_SORT_KEYS = {
+    'order': [
+        # Literal 0 (not a bound parameter) so the expression index matches
+        (func.coalesce(Project.order, literal_column('0')), False, lambda p: p.order or 0),
+        (Project.created_at, True, lambda p: p.created_at),
+        (Project.id, True, lambda p: p.id)
+    ],
+    'date': [
+        (Project.created_at, True, lambda p: p.created_at),
+        (Project.id, True, lambda p: p.id)
+    ],
+    'views': [
+        (Project.views, True, lambda p: p.views),
+        (Project.id, True, lambda p: p.id)
+    ]
+}
+
 @projects_bp.route('/', methods=['GET'])
+@conditional('projects')
+@cached('projects')
 def get_projects():
-    """Get all projects with optional filtering"""
+    """Get projects with optional filtering, field selection and cursor pagination"""
     try:
         # Get query parameters
         featured = request.args.get('featured', type=bool)
@@ -16,9 +70,27 @@ def get_projects():
         technology = request.args.get('technology')
         status = request.args.get('status', 'completed')
         sort_by = request.args.get('sort_by', 'order')
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        fields = request.args.get('fields')
+        
+        # Only the requested fields are serialized and loaded from the database
+        if fields:
+            fields = [f.strip() for f in fields.split(',') if f.strip()]
+            unknown = [f for f in fields if f not in PROJECT_LIST_FIELDS]
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        else:
+            fields = list(PROJECT_LIST_FIELDS)
+        
+        sort_keys = PROJECT_SORT_KEYS.get(sort_by, PROJECT_SORT_KEYS['order'])
+        keys = [(column, descending) for column, descending, _ in sort_keys]
         
         # Build query
-        query = Project.query
+        columns = {Project.id, Project.order, Project.created_at, Project.views}
+        for field in fields:
+            columns.update(PROJECT_LIST_FIELDS[field][0])
+        query = Project.query.options(load_only(*columns))
         
         if featured is not None:
             query = query.filter_by(featured=featured)
@@ -30,40 +102,40 @@ def get_projects():
             query = query.filter(Project.technologies.contains(technology))
         
         # Sort
-        if sort_by == 'date':
-            query = query.order_by(Project.created_at.desc())
-        elif sort_by == 'views':
-            query = query.order_by(Project.views.desc())
+        query = query.order_by(*order_by_keys(keys))
+        
+        # Keyset pagination only when asked for, so the plain listing stays unchanged
+        paginate = cursor is not None or limit is not None
+        if paginate:
+            limit = min(max(limit or 20, 1), 100)
+            if cursor:
+                try:
+                    query = query.filter(keyset_filter(keys, decode_cursor(cursor)))
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+            projects = query.limit(limit + 1).all()
         else:
-            query = query.order_by(Project.order, Project.created_at.desc())
+            projects = query.all()
         
-        projects = query.all()
+        next_cursor = None
+        if paginate and len(projects) > limit:
+            projects = projects[:limit]
+            last = projects[-1]
+            next_cursor = encode_cursor([value(last) for _, _, value in sort_keys])
         
-        def get_blocks(project):
-            try:
-                import json
-                if project.full_description and project.full_description.startswith('['):
-                    return json.loads(project.full_description)
-                else:
-                    # Legacy content - convert to block format
-                    return [{'id': '1', 'type': 'text', 'content': project.full_description or ''}]
-            except:
-                return [{'id': '1', 'type': 'text', 'content': project.full_description or ''}]
-
-        return jsonify([{
-            'id': p.id,
-            'title': p.title,
-            'description': p.short_description,
-            'content': p.full_description,
-            'blocks': get_blocks(p),
-            'technologies': ','.join(p.technologies) if p.technologies else '',
-            'demo_url': p.links.get('demo', '') if p.links else '',
-            'github_url': p.links.get('github', '') if p.links else '',
-            'image_url': p.media[0]['url'] if p.media and len(p.media) > 0 else '',
-            'status': p.status,
-            'media': p.media,
-            'created_at': p.created_at.isoformat() if p.created_at else None
-        } for p in projects])
+        response = jsonify([
+            {field: PROJECT_LIST_FIELDS[field][1](p) for field in fields}
+            for p in projects
+        ])
+        
+        if next_cursor:
+            args = request.args.to_dict()
+            args['cursor'] = next_cursor
+            args['limit'] = limit
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+        
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -77,9 +149,8 @@ def get_project(slug):
         if not project:
             return jsonify({'error': 'Project not found'}), 404
         
-        # Increment view count
-        project.views += 1
-        db.session.commit()
+        # Count the view in memory; it is written back in batches
+        views = view_counter.increment(project.id, project.views)
         
         return jsonify({
             'id': project.id,
@@ -93,7 +164,7 @@ def get_project(slug):
             'links': project.links,
             'featured': project.featured,
             'status': project.status,
-            'views': project.views,
+            'views': views,
             'created_at': project.created_at.isoformat() if project.created_at else None,
             'updated_at': project.updated_at.isoformat() if project.updated_at else None
         })
@@ -102,37 +173,29 @@ def get_project(slug):
         return jsonify({'error': str(e)}), 500
 
 @projects_bp.route('/related/<slug>', methods=['GET'])
+@conditional('projects')
 def get_related_projects(slug):
     """Get related projects based on tags and technologies"""
     try:
-        current_project = Project.query.filter_by(slug=slug).first()
-        
-        if not current_project:
-            return jsonify({'error': 'Project not found'}), 404
-        
-        # Find projects with similar tags or technologies
-        related_projects = []
-        all_projects = Project.query.filter(Project.slug != slug).all()
-        
-        for project in all_projects:
-            score = 0
-            
-            # Check tag overlap
-            if current_project.tags and project.tags:
-                common_tags = set(current_project.tags) & set(project.tags)
-                score += len(common_tags) * 2
-            
-            # Check technology overlap
-            if current_project.technologies and project.technologies:
-                common_tech = set(current_project.technologies) & set(project.technologies)
-                score += len(common_tech)
-            
-            if score > 0:
-                related_projects.append((project, score))
-        
-        # Sort by score and get top 3
-        related_projects.sort(key=lambda x: x[1], reverse=True)
-        top_related = related_projects[:3]
+        # Pick up edits served by other workers
+        related_index.ensure_current(g.get('content_version'))
+        top_related = related_index.related(slug)
+        
+        if top_related is None:
+            # Not indexed yet (e.g. created by another worker) - index it now
+            current_project = Project.query.filter_by(slug=slug).first()
+            if not current_project:
+                return jsonify({'error': 'Project not found'}), 404
+            related_index.update(current_project)
+            top_related = related_index.related(slug) or []
+        
+        # Load only the winning projects
+        projects = {}
+        if top_related:
+            ids = [project_id for project_id, _ in top_related]
+            projects = {p.id: p for p in Project.query.filter(Project.id.in_(ids)).all()}
+        top_related = [(projects[project_id], score) for project_id, score in top_related
+                       if project_id in projects]
         
         return jsonify([{
             'id': p[0].id,
@@ -147,12 +210,6 @@ def get_related_projects(slug):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def generate_slug(title):
-    """Generate URL-friendly slug from title"""
-    slug = re.sub(r'[^\w\s-]', '', title.lower())
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug.strip('-')
-
 @projects_bp.route('/', methods=['POST'])
 @token_required
 def create_project(current_user):
@@ -163,26 +220,15 @@ def create_project(current_user):
         if not data.get('title'):
             return jsonify({'error': 'Title is required'}), 400
         
-        # Generate slug from title
-        slug = generate_slug(data['title'])
-        
-        # Check if slug already exists
-        existing = Project.query.filter_by(slug=slug).first()
-        if existing:
-            # Add number to make unique
-            counter = 1
-            while existing:
-                new_slug = f"{slug}-{counter}"
-                existing = Project.query.filter_by(slug=new_slug).first()
-                counter += 1
-            slug = new_slug
+        # Generate slug from title (made unique when saving)
+        slug = slugify(data['title'])
         
         # Prepare data for the model
         project_data = {
             'title': data.get('title'),
-            'slug': slug,
             'short_description': data.get('description', ''),
             'full_description': data.get('content', ''),
+            'blocks': content_to_blocks(data.get('content', '')),
             'technologies': data.get('technologies', '').split(',') if data.get('technologies') else [],
             'status': data.get('status', 'published'),
             'featured': False,
@@ -209,8 +255,9 @@ def create_project(current_user):
         
         # Create project
         project = Project(**project_data)
-        db.session.add(project)
-        db.session.commit()
+        save_with_unique_slug(project, slug)
+        related_index.update(project)
+        publish('projects', project_id=project.id)
         
         return jsonify({
             'id': project.id,
@@ -238,18 +285,21 @@ def update_project(current_user, project_id):
             return jsonify({'error': 'Project not found'}), 404
         
         data = request.get_json()
+        slug = None
         
         # Update basic fields
         if 'title' in data:
             project.title = data['title']
-            # Regenerate slug if title changed
-            project.slug = generate_slug(data['title'])
+            # Regenerate slug if title changed (made unique when saving)
+            if not has_slug_base(project.slug, slugify(data['title'])):
+                slug = slugify(data['title'])
         
         if 'description' in data:
             project.short_description = data['description']
         
         if 'content' in data:
             project.full_description = data['content']
+            project.blocks = content_to_blocks(data['content'])
         
         if 'status' in data:
             project.status = data['status']
@@ -292,7 +342,12 @@ def update_project(current_user, project_id):
                 media = []
             project.media = media
         
-        db.session.commit()
+        if slug is not None:
+            save_with_unique_slug(project, slug)
+        else:
+            db.session.commit()
+        related_index.update(project)
+        publish('projects', project_id=project.id)
         
         return jsonify({
             'id': project.id,
@@ -321,6 +376,9 @@ def delete_project(current_user, project_id):
         
         db.session.delete(project)
         db.session.commit()
+        view_counter.forget(project_id)
+        related_index.remove(project_id)
+        publish('projects', project_id=project_id)
         
         return jsonify({'message': 'Project deleted successfully'})
         
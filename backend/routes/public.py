@@ -1,11 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, send_from_directory
 from sqlalchemy import or_
 from database import db
 from models import Project, Skill, Contact
+from utils.search_index import search_projects
+from utils.cache import cached
+from utils.http_cache import conditional
+from utils.rate_limit import rate_limit, rate_limiter
+from utils.inbox import add_contact
 
 public_bp = Blueprint('public', __name__)
 
 @public_bp.route('/skills', methods=['GET'])
+@conditional('skills')
+@cached('skills')
 def get_skills():
     """Get all skills"""
     try:
@@ -21,8 +28,10 @@ def get_skills():
         return jsonify({'error': str(e)}), 500
 
 @public_bp.route('/contact', methods=['POST'])
+@rate_limit('RATE_LIMIT_CONTACT')
 def submit_contact():
     """Submit contact form"""
+    claimed = None  # duplicate-check entry to release if the message is not stored
     try:
         data = request.get_json()
         
@@ -32,6 +41,12 @@ def submit_contact():
             if not data.get(field):
                 return jsonify({'error': f'{field} is required'}), 400
         
+        # Resubmits and bots replaying the same message skip the insert
+        submission = (data['email'], data['subject'], data['message'])
+        if rate_limiter.is_duplicate(*submission, window=current_app.config.get('CONTACT_DUPLICATE_WINDOW', 0)):
+            return jsonify({'message': 'Contact form already submitted', 'duplicate': True})
+        claimed = submission
+        
         # Create new contact
         contact = Contact(
             name=data['name'],
@@ -40,8 +55,9 @@ def submit_contact():
             message=data['message']
         )
         
-        db.session.add(contact)
+        add_contact(contact)
         db.session.commit()
+        claimed = None
         
         # TODO: Send email notification
         
@@ -52,27 +68,44 @@ def submit_contact():
         
     except Exception as e:
         db.session.rollback()
+        if claimed:
+            # Not stored, so the user's retry must not count as a duplicate
+            rate_limiter.forget_submission(*claimed)
         return jsonify({'error': str(e)}), 500
 
 @public_bp.route('/search', methods=['GET'])
+@conditional('projects')
+@cached('projects')
 def search():
-    """Search projects"""
+    """Search projects (ranked full-text match with limit/offset)"""
     try:
         query = request.args.get('q', '')
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        offset = max(request.args.get('offset', 0, type=int), 0)
         
         if not query:
-            return jsonify({'results': []})
+            return jsonify({'results': [], 'count': 0, 'total': 0, 'limit': limit, 'offset': offset})
+        
+        ranked = search_projects(query, limit, offset)
         
-        # Search in title, description, tags, and technologies
-        projects = Project.query.filter(
-            or_(
-                Project.title.contains(query),
-                Project.short_description.contains(query),
-                Project.full_description.contains(query),
-                Project.tags.contains(query),
-                Project.technologies.contains(query)
+        if ranked is not None:
+            # Full-text index gives ranked ids; load just that page
+            ids, total = ranked
+            by_id = {p.id: p for p in Project.query.filter(Project.id.in_(ids)).all()} if ids else {}
+            projects = [by_id[project_id] for project_id in ids if project_id in by_id]
+        else:
+            # No full-text backend: search in title, description, tags, and technologies
+            matches = Project.query.filter(
+                or_(
+                    Project.title.contains(query),
+                    Project.short_description.contains(query),
+                    Project.full_description.contains(query),
+                    Project.tags.contains(query),
+                    Project.technologies.contains(query)
+                )
             )
-        ).all()
+            total = matches.count()
+            projects = matches.order_by(Project.id).limit(limit).offset(offset).all()
         
         results = [{
             'id': p.id,
@@ -84,7 +117,18 @@ def search():
             'featured': p.featured
         } for p in projects]
         
-        return jsonify({'results': results, 'count': len(results)})
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'total': total,
+            'limit': limit,
+            'offset': offset
+        })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/media/<path:filename>', methods=['GET'])
+def get_media(filename):
+    """Serve media stored locally (when Cloudinary is not configured)"""
+    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename, max_age=31536000)
@@ -0,0 +1,139 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+
+@pytest.fixture(scope='session')
+def app():
+    """App on a fresh migrated SQLite database; no response cache so every request hits the DB"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+    os.environ['UPLOAD_FOLDER'] = tempfile.mkdtemp()
+    os.environ['JOBS_SPOOL_FOLDER'] = tempfile.mkdtemp()
+    os.environ['JWT_SECRET_KEY'] = 'test-jwt-secret-long-enough-for-hs256'
+    os.environ['CACHE_BACKEND'] = 'none'
+    os.environ['JOBS_WORKERS'] = '0'
+    os.environ['QUERY_INSPECTOR'] = '0'
+    # Tests post freely; test_rate_limit turns limits on per test
+    for limit in ('RATE_LIMIT_CONTACT', 'RATE_LIMIT_FAVORITES', 'RATE_LIMIT_LOGIN'):
+        os.environ[limit] = 'none'
+    os.environ['CONTACT_DUPLICATE_WINDOW'] = '0'
+
+    from migrate import upgrade_database
+    from app import create_app
+
+    upgrade_database(log=None)
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        seed()
+    return app
+
+def seed():
+    from database import db
+    from models import Contact, Favorite, Project, Skill
+    from utils.inbox import recount_statuses
+
+    now = datetime.utcnow()
+    for i in range(5):
+        db.session.add(Project(
+            title=f'Project {i}', slug=f'project-{i}', short_description='Seed project',
+            full_description='Seed text', tags=['seed', f'tag-{i % 2}'], technologies=['python'],
+            media=[], links={}, status='completed', order=i % 2, views=0,
+            created_at=now - timedelta(days=i)
+        ))
+        db.session.add(Skill(name=f'Skill {i}', category='Languages', proficiency=50 + i))
+        db.session.add(Favorite(title=f'Film {i}', category='film', tier='S-Tier', order=i))
+        db.session.add(Contact(name='Ann', email='ann@example.com', subject='Hi', message='Hello'))
+    db.session.commit()
+    recount_statuses()
+    db.session.commit()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin_headers(app):
+    from utils.auth import generate_token
+
+    with app.app_context():
+        token = generate_token({'id': 1, 'username': 'admin'})
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail when a block issues more than max_queries statements or repeats one.
+
+        with query_budget(2):
+            client.get('/api/projects/')
+    """
+    from utils.query_inspector import QueryRecorder
+
+    @contextmanager
+    def budget(max_queries, allow_duplicates=False):
+        with QueryRecorder() as recorder:
+            yield recorder
+        assert recorder.count <= max_queries, (
+            f"Query budget exceeded ({recorder.count} > {max_queries})\n{recorder.report()}"
+        )
+        if not allow_duplicates:
+            assert not recorder.duplicates(), f"Repeated statements (N+1?)\n{recorder.report()}"
+
+    return budget
+
+class FakeRedis:
+    """In-memory stand-in for the parts of redis.Redis the cache and rate limiter use"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.now = 0.0
+
+    def _live(self, key):
+        if key in self.expires and self.expires[key] <= self.now:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        return self.data[key] if self._live(key) else None
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._live(key):
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        self.expires.pop(key, None)
+        if ex:
+            self.expires[key] = self.now + ex
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+    def sadd(self, key, *members):
+        self._live(key)
+        self.data.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        return set(self.data[key]) if self._live(key) else set()
+
+    def ttl(self, key):
+        if not self._live(key):
+            return -2
+        return int(self.expires[key] - self.now) if key in self.expires else -1
+
+    def expire(self, key, seconds):
+        if self._live(key):
+            self.expires[key] = self.now + seconds
+
+    def scan_iter(self, match='*', count=None):
+        prefix = match.rstrip('*')
+        return [key for key in list(self.data) if key.startswith(prefix) and self._live(key)]
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
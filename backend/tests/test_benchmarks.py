@@ -0,0 +1,37 @@
+import json
+from argparse import Namespace
+import pytest
+from benchmarks.bench_api import compare, percentile, run_inprocess, summarize
+
+def report(p95_ms, throughput_rps=100.0, errors=0):
+    endpoint = {'requests': 10, 'errors': errors, 'throughput_rps': throughput_rps, 'mean_ms': 1.0,
+                'p50_ms': 1.0, 'p95_ms': p95_ms, 'p99_ms': p95_ms}
+    return {'meta': {'seed': {'projects': 5}}, 'results': {'inprocess': {'projects': endpoint}}}
+
+def run_compare(tmp_path, baseline, candidate):
+    paths = []
+    for name, data in (('base.json', baseline), ('new.json', candidate)):
+        path = tmp_path / name
+        path.write_text(json.dumps(data))
+        paths.append(str(path))
+    with pytest.raises(SystemExit) as exit_info:
+        compare(Namespace(baseline=paths[0], candidate=paths[1], threshold=10.0))
+    return exit_info.value.code
+
+def test_nearest_rank_percentiles():
+    values = [i / 1000 for i in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (0.05, 0.095, 0.099)
+    assert percentile([], 95) == 0.0
+
+    summary = summarize([0.002, 0.001], errors=1, elapsed=0.5)
+    assert (summary['requests'], summary['throughput_rps'], summary['p50_ms']) == (3, 6.0, 1.0)
+
+def test_compare_fails_only_past_the_threshold(tmp_path):
+    assert run_compare(tmp_path, report(10.0), report(10.5)) == 0
+    assert run_compare(tmp_path, report(10.0), report(12.0)) == 1
+    assert run_compare(tmp_path, report(10.0), report(10.0, throughput_rps=80.0)) == 1
+    assert run_compare(tmp_path, report(10.0), report(10.0, errors=1)) == 1
+
+def test_every_endpoint_answers(app, admin_headers):
+    results = run_inprocess(app, admin_headers, Namespace(warmup=0, requests=2, projects=5))
+    assert {name: result['errors'] for name, result in results.items() if result['errors']} == {}
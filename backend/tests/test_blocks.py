@@ -0,0 +1,43 @@
+import json
+from database import db
+from models import Project
+from utils.blocks import content_to_blocks
+
+BLOCKS = [{'id': '1', 'type': 'text', 'content': 'Hello'}, {'id': '2', 'type': 'code', 'content': 'x = 1'}]
+
+def listed_blocks(client, project_id):
+    projects = client.get('/api/projects/?sort_by=date&fields=id,blocks&limit=100').get_json()
+    return next(p['blocks'] for p in projects if p['id'] == project_id)
+
+def test_content_to_blocks():
+    assert content_to_blocks(json.dumps(BLOCKS)) == BLOCKS
+    assert content_to_blocks('Plain text') == [{'id': '1', 'type': 'text', 'content': 'Plain text'}]
+    assert content_to_blocks('[not json') == [{'id': '1', 'type': 'text', 'content': '[not json'}]
+    assert content_to_blocks(None) == [{'id': '1', 'type': 'text', 'content': ''}]
+
+def test_blocks_are_parsed_when_saved(app, client, admin_headers):
+    response = client.post('/api/admin/projects', headers=admin_headers,
+                           json={'title': 'Blocks', 'slug': 'blocks', 'status': 'completed', 'blocks': BLOCKS})
+    assert response.status_code == 201
+    project_id = response.get_json()['project']['id']
+
+    with app.app_context():
+        project = db.session.get(Project, project_id)
+        assert project.blocks == BLOCKS
+        # Clients reading content still get the JSON text
+        assert json.loads(project.full_description) == BLOCKS
+    assert listed_blocks(client, project_id) == BLOCKS
+
+    response = client.put(f'/api/admin/projects/{project_id}', headers=admin_headers,
+                          json={'full_description': 'Rewritten'})
+    assert response.status_code == 200
+    assert listed_blocks(client, project_id) == [{'id': '1', 'type': 'text', 'content': 'Rewritten'}]
+
+def test_rows_without_blocks_are_converted_on_read(app, client):
+    with app.app_context():
+        project = Project(title='Legacy', slug='legacy-blocks', status='completed',
+                          full_description=json.dumps(BLOCKS))
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+    assert listed_blocks(client, project_id) == BLOCKS
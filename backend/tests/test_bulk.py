@@ -0,0 +1,47 @@
+import json
+
+def ndjson(rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows).encode()
+
+def test_import_reports_bad_rows_and_inserts_the_rest(client, admin_headers):
+    body = ndjson([
+        {'title': 'Imported film', 'category': 'film', 'tier': 'A-Tier', 'year': 1999},
+        {'title': 'Missing tier', 'category': 'film'},
+        '{not json',
+        {'title': 'Bad year', 'category': 'film', 'tier': 'B-Tier', 'year': 'nineteen'},
+        '',
+        {'title': 'Imported athlete', 'category': 'athlete', 'tier': 'S-Tier', 'unknown': 1},
+        {'title': 'Second film', 'category': 'film', 'tier': 'A-Tier'},
+    ])
+    response = client.post('/api/admin/import/favorites?batch_size=2', data=body,
+                           headers={**admin_headers, 'Content-Type': 'application/x-ndjson'})
+    summary = response.get_json()
+
+    assert response.status_code == 200
+    assert summary['inserted'] == 2
+    assert [error['line'] for error in summary['errors']] == [2, 3, 4, 6]
+
+def test_project_import_allocates_slugs_and_indexes_search(client, admin_headers, query_budget):
+    rows = [{'title': 'Bulk Project', 'short_description': 'zebrafish', 'status': 'completed'}] * 30
+    with query_budget(20, allow_duplicates=True):
+        response = client.post('/api/admin/import/projects?batch_size=10', data=ndjson(rows),
+                               headers={**admin_headers, 'Content-Type': 'application/x-ndjson'})
+    assert response.get_json()['inserted'] == 30
+
+    assert client.get('/api/projects/bulk-project-29').status_code == 200
+    assert client.get('/api/search?q=zebrafish').get_json()['total'] == 30
+
+def test_export_round_trips_through_import(client, admin_headers):
+    response = client.get('/api/admin/export/skills', headers=admin_headers)
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data().splitlines()
+    exported = [json.loads(line) for line in lines]
+    assert exported and all('name' in row for row in exported)
+
+    response = client.post('/api/admin/import/skills', data=b'\n'.join(lines),
+                           headers={**admin_headers, 'Content-Type': 'application/x-ndjson'})
+    assert response.get_json() == {'inserted': len(exported), 'failed': 0, 'errors': []}
+
+def test_unknown_resource(client, admin_headers):
+    assert client.post('/api/admin/import/users', data=b'{}', headers=admin_headers).status_code == 404
+    assert client.get('/api/admin/export/users', headers=admin_headers).status_code == 404
@@ -0,0 +1,43 @@
+from utils.cache import RedisCache, ResponseCache
+
+def entry(body):
+    return {'status': 200, 'headers': {'Content-Type': 'application/json'}, 'body': body}
+
+def test_redis_backend_round_trips_entries(fake_redis):
+    cache = RedisCache(fake_redis, ttl=60)
+    cache.set('projects?', entry(b'[1]'), tags=['projects'])
+
+    stored = cache.get('projects?')
+    assert stored['body'] == b'[1]' and stored['headers'] == {'Content-Type': 'application/json'}
+    assert cache.get('missing') is None
+
+    fake_redis.now += 61
+    assert cache.get('projects?') is None
+
+def test_invalidation_drops_only_tagged_entries(app, fake_redis):
+    responses = ResponseCache(RedisCache(fake_redis, ttl=60))
+    responses.backend.set('projects?', entry(b'[1]'), tags=['projects'])
+    responses.backend.set('skills?', entry(b'[2]'), tags=['skills'])
+
+    with app.app_context():
+        responses.invalidate('projects')
+    assert responses.backend.get('projects?') is None
+    assert responses.backend.get('skills?')['body'] == b'[2]'
+
+def test_tag_sets_expire_with_their_entries(fake_redis):
+    cache = RedisCache(fake_redis, ttl=60)
+    cache.set('a', entry(b'a'), tags=['projects'], ttl=120)
+    cache.set('b', entry(b'b'), tags=['projects'], ttl=30)
+
+    # Kept as long as the longest-lived entry, then gone
+    assert fake_redis.ttl('portfolio:cache:tag:projects') == 120
+    fake_redis.now += 121
+    assert fake_redis.smembers('portfolio:cache:tag:projects') == set()
+
+def test_clear_only_touches_the_cache_prefix(fake_redis):
+    cache = RedisCache(fake_redis, ttl=60)
+    cache.set('a', entry(b'a'), tags=['projects'])
+    fake_redis.set('portfolio:ratelimit:x', '1')
+
+    cache.clear()
+    assert list(fake_redis.data) == ['portfolio:ratelimit:x']
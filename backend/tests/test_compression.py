@@ -0,0 +1,40 @@
+import gzip
+import pytest
+
+LARGE = '/api/projects/'
+SMALL = '/api/projects/?limit=1&fields=id'
+
+def test_gzip_body_and_etag(client):
+    plain = client.get(LARGE)
+    response = client.get(LARGE, headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+
+    revalidated = client.get(LARGE, headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == response.headers['ETag']
+
+def test_small_bodies_stay_uncompressed_with_a_matching_304(client):
+    response = client.get(SMALL, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert not response.headers['ETag'].endswith('-gzip"')
+
+    revalidated = client.get(SMALL, headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == response.headers['ETag']
+
+def test_identity_when_nothing_is_accepted(client):
+    response = client.get(LARGE, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+
+def test_brotli_preferred_when_available(client):
+    from utils import responses
+    response = client.get(LARGE, headers={'Accept-Encoding': 'gzip, br'})
+    if responses.brotli is None:
+        assert response.headers['Content-Encoding'] == 'gzip'
+        pytest.skip('brotli is not installed')
+    assert response.headers['Content-Encoding'] == 'br'
+    assert responses.brotli.decompress(response.data) == client.get(LARGE).data
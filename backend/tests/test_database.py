@@ -0,0 +1,26 @@
+from database import TimedQueuePool, db, engine_options
+
+CONFIG = {'DB_POOL_SIZE': 3, 'DB_MAX_OVERFLOW': 2, 'DB_POOL_TIMEOUT': 5,
+          'DB_POOL_RECYCLE': 600, 'DB_STATEMENT_TIMEOUT_MS': 1000}
+
+def test_engine_options_per_database():
+    assert engine_options('sqlite:///:memory:', CONFIG) == {}
+
+    sqlite = engine_options('sqlite:///portfolio.db', CONFIG)
+    assert sqlite == {'poolclass': TimedQueuePool, 'pool_size': 3, 'max_overflow': 2, 'pool_timeout': 5}
+
+    postgres = engine_options('postgresql://db/portfolio', CONFIG)
+    assert postgres['pool_pre_ping'] is True and postgres['pool_recycle'] == 600
+    assert postgres['connect_args'] == {'options': '-c statement_timeout=1000'}
+    assert 'connect_args' not in engine_options('mysql://db/portfolio', CONFIG)
+
+def test_sqlite_connections_use_wal(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+
+def test_health_reports_the_pool(client):
+    database = client.get('/api/health').get_json()['database']
+    assert database['class'] == 'TimedQueuePool'
+    assert database['checkout_wait']['count'] > 0 and database['checkout_timeouts'] == 0
@@ -0,0 +1,16 @@
+from database import db
+from explain_queries import ROUTES, allowed, capture, full_scans
+
+def test_read_routes_do_not_scan_whole_tables(app, admin_headers):
+    # The audit seeds audit-project-N; the test database has project-N
+    routes = [route.replace('audit-project-', 'project-') for route in ROUTES]
+    captured = capture(app, db, routes, admin_headers)
+    assert {route for route, _, _ in captured} >= {'/api/projects/', '/api/skills', '/api/favorites/'}
+
+    unexpected = []
+    with app.app_context():
+        for route, statement, parameters in captured:
+            plan, scans = full_scans(db, statement, parameters)
+            if scans and not allowed(statement):
+                unexpected.append((route, ' '.join(statement.split()), plan))
+    assert unexpected == []
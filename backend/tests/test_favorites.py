@@ -0,0 +1,108 @@
+from database import db
+from models import Favorite
+
+def create(client, title, tier, category='film', order=0):
+    response = client.post('/api/favorites/', json={
+        'title': title, 'category': category, 'tier': tier, 'order': order
+    })
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+def test_grouped_payload_keeps_its_shape(client):
+    create(client, 'Shape athlete', 'Shape-Tier', category='athlete')
+    data = client.get('/api/favorites/').get_json()
+
+    assert set(data) == {'films', 'athletes'}
+    assert [f['title'] for f in data['films']['S-Tier'][:2]] == ['Film 0', 'Film 1']
+    athlete = data['athletes']['Shape-Tier'][0]
+    assert athlete['name'] == 'Shape athlete' and 'title' not in athlete
+
+def test_category_and_tier_filters(client):
+    create(client, 'Filter film', 'Filter-Tier')
+
+    films = client.get('/api/favorites/?category=films').get_json()
+    assert 'Filter-Tier' in films and 'films' not in films
+    assert client.get('/api/favorites/?category=film').get_json() == films
+
+    tier = client.get('/api/favorites/?category=films&tier=Filter-Tier').get_json()
+    assert [f['title'] for f in tier] == ['Filter film']
+
+    by_tier = client.get('/api/favorites/?tier=Filter-Tier').get_json()
+    assert by_tier == {'films': {'Filter-Tier': tier}, 'athletes': {'Filter-Tier': []}}
+
+    assert client.get('/api/favorites/?category=books').status_code == 400
+
+def test_tier_pages_follow_the_cursor(client):
+    for i in range(5):
+        create(client, f'Paged {i}', 'Paged-Tier', order=4 - i)
+
+    titles, url = [], '/api/favorites/?category=films&tier=Paged-Tier&limit=2'
+    while url:
+        response = client.get(url)
+        titles += [f['title'] for f in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'/api/favorites/?category=films&tier=Paged-Tier&limit=2&cursor={cursor}' if cursor else None
+
+    assert titles == [f'Paged {i}' for i in range(4, -1, -1)]
+    assert client.get('/api/favorites/?limit=2').status_code == 400
+    assert client.get('/api/favorites/?category=films&tier=Paged-Tier&cursor=bogus').status_code == 400
+
+def test_created_favorite_is_patched_in_without_a_rebuild(client, query_budget):
+    client.get('/api/favorites/')
+    favorite_id = create(client, 'Incremental film', 'Incremental-Tier')
+
+    # Only the content-version query; the snapshot already holds the new row
+    with query_budget(1):
+        data = client.get('/api/favorites/?category=films&tier=Incremental-Tier').get_json()
+    assert [f['id'] for f in data] == [favorite_id]
+
+def test_writes_outside_this_process_trigger_a_rebuild(app, client):
+    client.get('/api/favorites/')
+    with app.app_context():
+        # Bypasses the snapshot, like a write from another worker
+        db.session.add(Favorite(title='Elsewhere', category='film', tier='Elsewhere-Tier'))
+        db.session.commit()
+
+    data = client.get('/api/favorites/?category=films&tier=Elsewhere-Tier').get_json()
+    assert [f['title'] for f in data] == ['Elsewhere']
+
+def test_create_rejects_fields_of_the_wrong_type(client):
+    for body in ({'title': 'Bad order', 'category': 'film', 'tier': 'Bad-Tier', 'order': 'zzz'},
+                 {'title': 'Bad tier', 'category': 'film', 'tier': ''},
+                 {'title': 'Bad tier', 'category': 'film', 'tier': 3},
+                 {'category': 'film', 'tier': 'Bad-Tier'},
+                 ['not', 'an', 'object']):
+        assert client.post('/api/favorites/', json=body).status_code == 400
+
+    assert client.get('/api/favorites/?category=films&tier=Bad-Tier').get_json() == []
+
+def test_rows_with_bad_values_do_not_break_the_listing(app, client):
+    with app.app_context():
+        # Written before the fields were validated
+        db.session.add(Favorite(title='Legacy film', category='film', tier='Legacy-Tier', order='zzz'))
+        db.session.add(Favorite(title='Legacy film 2', category='film', tier='Legacy-Tier', order=1))
+        db.session.commit()
+
+    response = client.get('/api/favorites/')
+    assert response.status_code == 200
+    assert [f['title'] for f in response.get_json()['films']['Legacy-Tier']] == ['Legacy film', 'Legacy film 2']
+
+def test_update_without_a_json_body_is_rejected(client, admin_headers):
+    favorite_id = create(client, 'Body film', 'Body-Tier')
+    url = f'/api/admin/favorites/{favorite_id}'
+
+    assert client.put(url, data='not json', headers=admin_headers).status_code == 400
+    assert client.put(url, json=['title'], headers=admin_headers).status_code == 400
+    assert client.put(url, json={'title': 'Renamed film'}, headers=admin_headers).status_code == 200
+
+def test_update_rejects_fields_of_the_wrong_type(client, admin_headers):
+    favorite_id = create(client, 'Typed film', 'Typed-Tier')
+    url = f'/api/admin/favorites/{favorite_id}'
+
+    for body in ({'order': 'first'}, {'order': True}, {'tier': ''}, {'category': None}, {'year': '1999'},
+                 {'title': ['a']}, {'poster_or_photo': 5}):
+        assert client.put(url, json=body, headers=admin_headers).status_code == 400
+
+    response = client.get('/api/favorites/?category=films&tier=Typed-Tier')
+    assert response.status_code == 200 and [f['title'] for f in response.get_json()] == ['Typed film']
+    assert client.put(url, json={'order': 3, 'year': None}, headers=admin_headers).status_code == 200
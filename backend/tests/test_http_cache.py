@@ -0,0 +1,51 @@
+from database import db
+from models import Project, Skill
+from utils.cache import MemoryCache, response_cache
+from utils.view_counter import view_counter
+
+def test_matching_etag_gets_304_until_a_write(app, client, admin_headers):
+    response = client.get('/api/projects/?limit=2')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and 'Last-Modified' not in response.headers
+
+    revalidated = client.get('/api/projects/?limit=2', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304 and revalidated.headers['ETag'] == etag
+    # Another query is another representation
+    assert client.get('/api/projects/?limit=3', headers={'If-None-Match': etag}).status_code == 200
+
+    with app.app_context():
+        project = Project(title='Short-lived', slug='short-lived', status='completed')
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+    response = client.get('/api/projects/?limit=2', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    # Deletes move the version too (max(updated_at) would not)
+    assert client.delete(f'/api/admin/projects/{project_id}', headers=admin_headers).status_code == 200
+    assert client.get('/api/projects/?limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+def test_if_modified_since_alone_never_gets_304(client):
+    response = client.get('/api/projects/', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+    assert response.status_code == 200
+
+def test_view_counts_do_not_change_the_etag(client):
+    etag = client.get('/api/projects/').headers['ETag']
+    client.get('/api/projects/project-1')
+    view_counter.flush()
+    assert client.get('/api/projects/', headers={'If-None-Match': etag}).status_code == 304
+
+def test_cached_responses_follow_writes_the_cache_never_heard_of(app, client, monkeypatch):
+    monkeypatch.setattr(response_cache, 'backend', MemoryCache())
+    client.get('/api/skills')
+    assert client.get('/api/skills').headers['X-Cache'] == 'HIT'
+
+    with app.app_context():
+        # No invalidation event, like a write from another worker
+        db.session.add(Skill(name='Unannounced', category='Tools', proficiency=50))
+        db.session.commit()
+
+    response = client.get('/api/skills')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert 'Unannounced' in [skill['name'] for skill in response.get_json()]
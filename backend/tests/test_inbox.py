@@ -0,0 +1,73 @@
+from sqlalchemy import func
+from database import db
+from models import Contact
+from utils.inbox import status_counts
+
+def submit(client, name, subject='Hello', message='A message'):
+    response = client.post('/api/contact', json={
+        'name': name, 'email': f'{name.lower()}@example.com', 'subject': subject, 'message': message
+    })
+    assert response.status_code == 201
+    return response.get_json()['contact_id']
+
+def assert_counts_match(app):
+    with app.app_context():
+        actual = dict(db.session.query(Contact.status, func.count()).group_by(Contact.status))
+        counts = status_counts()
+    assert {status: counts[status] for status in actual} == actual
+    assert counts['total'] == sum(actual.values())
+
+def test_inbox_pages_newest_first(client, admin_headers):
+    ids = [submit(client, f'Pager{i}', subject='Paging') for i in range(5)]
+
+    seen, url = [], '/api/admin/contacts?q=Paging&limit=2'
+    while url:
+        response = client.get(url, headers=admin_headers)
+        seen += [c['id'] for c in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'/api/admin/contacts?q=Paging&limit=2&cursor={cursor}' if cursor else None
+
+    assert seen == ids[::-1]
+    assert client.get('/api/admin/contacts?cursor=bogus', headers=admin_headers).status_code == 400
+
+def test_list_carries_a_preview_and_detail_the_full_message(client, admin_headers):
+    contact_id = submit(client, 'Verbose', message='x' * 500)
+    listed = client.get('/api/admin/contacts?q=verbose', headers=admin_headers).get_json()
+    assert [c['id'] for c in listed] == [contact_id]
+    assert len(listed[0]['preview']) == 200 and 'message' not in listed[0]
+
+    detail = client.get(f'/api/admin/contacts/{contact_id}', headers=admin_headers).get_json()
+    assert detail['message'] == 'x' * 500
+
+def test_search_matches_sender_and_subject_literally(client, admin_headers):
+    submit(client, 'Wildcard', subject='100% off_sale')
+    submit(client, 'Other', subject='100 percent off')
+
+    found = client.get('/api/admin/contacts?q=100%25%20off_', headers=admin_headers).get_json()
+    assert [c['subject'] for c in found] == ['100% off_sale']
+    assert [c['name'] for c in client.get('/api/admin/contacts?q=WILDCARD@', headers=admin_headers).get_json()] == ['Wildcard']
+
+def test_status_changes_keep_counters_exact(app, client, admin_headers):
+    ids = [submit(client, f'Counted{i}') for i in range(4)]
+    assert_counts_match(app)
+
+    response = client.put(f'/api/admin/contacts/{ids[0]}/status', json={'status': 'replied'}, headers=admin_headers)
+    assert response.status_code == 200
+    # Setting the same status again changes nothing
+    client.put(f'/api/admin/contacts/{ids[0]}/status', json={'status': 'replied'}, headers=admin_headers)
+    assert_counts_match(app)
+
+    response = client.put('/api/admin/contacts/status', json={'ids': ids, 'status': 'read'}, headers=admin_headers)
+    assert response.get_json()['updated'] == 4
+    assert_counts_match(app)
+
+    filtered = client.get('/api/admin/contacts?status=read&q=Counted', headers=admin_headers).get_json()
+    assert sorted(c['id'] for c in filtered) == sorted(ids)
+
+def test_status_update_validation(client, admin_headers):
+    assert client.put('/api/admin/contacts/999999/status', json={'status': 'read'},
+                      headers=admin_headers).status_code == 404
+    assert client.put('/api/admin/contacts/status', json={'ids': [1], 'status': 'spam'},
+                      headers=admin_headers).status_code == 400
+    assert client.put('/api/admin/contacts/status', json={'ids': [], 'status': 'read'},
+                      headers=admin_headers).status_code == 400
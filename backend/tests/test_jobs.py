@@ -0,0 +1,94 @@
+import io
+import os
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from database import db
+from models import Job
+from utils.jobs import job_handler, job_failed, job_queue
+
+failures = {'left': 0}
+cleaned = []
+
+@job_handler('test_flaky')
+def flaky(payload):
+    if failures['left']:
+        failures['left'] -= 1
+        raise RuntimeError('temporary failure')
+    return {'ok': True}
+
+@job_failed('test_flaky')
+def flaky_failed(payload):
+    cleaned.append(payload['name'])
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        # Run anything other tests left due, so only our jobs are claimed
+        while job_queue.run_one():
+            pass
+        yield
+
+def make_due(job_id):
+    db.session.get(Job, job_id).run_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+def test_failed_attempts_back_off_then_succeed(ctx):
+    failures['left'] = 2
+    job_id = job_queue.enqueue('test_flaky', {'name': 'retry'}, max_attempts=3).id
+
+    for attempt in (1, 2):
+        job = job_queue.run_one()
+        assert (job.id, job.status, job.attempts) == (job_id, 'queued', attempt)
+        assert job.last_error == 'temporary failure'
+        # 2s, then 4s, each with +-20% jitter
+        delay = (job.run_at - datetime.utcnow()).total_seconds()
+        assert 2 ** attempt * 0.8 - 1 < delay <= 2 ** attempt * 1.2
+        assert job_queue.run_one() is None
+        make_due(job_id)
+
+    job = job_queue.run_one()
+    assert (job.status, job.attempts, job.result, job.last_error) == ('done', 3, {'ok': True}, None)
+
+def test_last_failed_attempt_runs_the_cleanup(ctx):
+    failures['left'] = 5
+    job_queue.enqueue('test_flaky', {'name': 'give-up'}, max_attempts=1)
+
+    job = job_queue.run_one()
+    assert job.status == 'failed' and cleaned == ['give-up']
+
+def test_stale_jobs_are_requeued_without_writes_while_idle(app, ctx):
+    failures['left'] = 0
+    job = job_queue.enqueue('test_flaky', {'name': 'stale'})
+    job.status, job.locked_at = 'running', datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+
+    job_queue._next_requeue = 0
+    assert job_queue.run_one().id == job.id
+
+    # Nothing stale and nothing due: reads only, no commit taking the write lock
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    job_queue._next_requeue = 0
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        assert job_queue.run_one() is None
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert statements and len(statements) <= 2
+    assert not any(statement.lstrip().upper().startswith('UPDATE') for statement in statements)
+
+def test_queued_local_upload_runs_outside_the_request(ctx, app, client, admin_headers):
+    response = client.post('/api/admin/upload', headers=admin_headers, content_type='multipart/form-data',
+                           data={'file': (io.BytesIO(b'data'), 'queued.png'), 'folder': 'portfolio'})
+    assert response.status_code == 202
+
+    job = job_queue.run_one()
+    assert (job.id, job.status, job.attempts) == (response.get_json()['job_id'], 'done', 1)
+    assert not os.path.exists(job.payload['path'])
+
+    # Stored with the host of the request that queued it
+    relative = job.result['public_id'][len('local:'):]
+    assert job.result['url'] == f'http://localhost/api/media/{relative}'
+    assert os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], relative))
@@ -0,0 +1,45 @@
+import io
+import os
+import pytest
+from utils.media_pipeline import add_variants, responsive_image
+
+CLOUDINARY_URL = 'https://res.cloudinary.com/demo/image/upload/v1/portfolio/photo.jpg'
+
+def test_cloudinary_variants_are_derived_from_the_url():
+    media = add_variants({'type': 'image', 'public_id': 'portfolio/photo', 'url': CLOUDINARY_URL,
+                          'width': 2000, 'height': 1000})
+
+    assert media['variants']['thumb'] == {
+        'url': 'https://res.cloudinary.com/demo/image/upload/w_320,c_limit,q_auto,f_auto/v1/portfolio/photo.jpg',
+        'width': 320, 'height': 160
+    }
+    assert media['variants']['hero']['width'] == 1600
+    assert '/upload/w_16,e_blur:200' in media['placeholder']
+
+def test_videos_get_no_variants():
+    media = {'type': 'video', 'public_id': 'portfolio/clip', 'url': CLOUDINARY_URL.replace('.jpg', '.mp4')}
+    assert 'variants' not in add_variants(dict(media))
+
+def test_responsive_image_builds_a_srcset():
+    image = responsive_image({'type': 'image', 'url': CLOUDINARY_URL, 'width': 800, 'height': 400})
+
+    widths = [int(entry.rsplit(' ', 1)[1][:-1]) for entry in image['srcset'].split(', ')]
+    assert widths == [320, 640, 800]
+    assert image['src'].startswith('https://res.cloudinary.com/demo/image/upload/w_640,')
+    assert responsive_image({'type': 'image'}) is None
+
+def test_local_uploads_get_webp_variants(app, client, admin_headers):
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    Image.new('RGB', (1000, 500), 'white').save(buffer, 'PNG')
+    buffer.seek(0)
+
+    response = client.post('/api/admin/upload', headers=admin_headers, content_type='multipart/form-data',
+                           data={'file': (buffer, 'wide.png'), 'sync': '1'})
+    media = response.get_json()['media']
+
+    assert (media['width'], media['height']) == (1000, 500)
+    assert media['placeholder'].startswith('data:image/jpeg;base64,')
+    assert media['variants']['thumb']['width'] == 320 and media['variants']['hero']['width'] == 1000
+    stem = os.path.splitext(media['public_id'][len('local:'):])[0]
+    assert os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], f'{stem}_card.webp'))
@@ -0,0 +1,36 @@
+from utils.metrics import REQUEST_DB_QUERIES, REQUESTS, Registry
+
+def test_histograms_render_in_the_exposition_format():
+    registry = Registry()
+    latency = registry.histogram('test_latency_seconds', 'Test latency', buckets=(0.1, 1.0))
+    latency.observe(0.05, endpoint='a')
+    latency.observe(0.5, endpoint='a')
+    registry.counter('test_total', 'Test count').inc(endpoint='a', status=200)
+
+    lines = registry.render().splitlines()
+    assert '# TYPE test_latency_seconds histogram' in lines
+    assert 'test_latency_seconds_bucket{endpoint="a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{endpoint="a",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{endpoint="a",le="+Inf"} 2' in lines
+    assert 'test_latency_seconds_count{endpoint="a"} 2' in lines
+    assert 'test_total{endpoint="a",status="200"} 1' in lines
+
+def test_requests_are_timed_per_endpoint(client):
+    before = REQUEST_DB_QUERIES.snapshot(endpoint='public.get_skills')['count']
+    assert client.get('/api/skills').status_code == 200
+    assert REQUEST_DB_QUERIES.snapshot(endpoint='public.get_skills')['count'] == before + 1
+
+    body = client.get('/api/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_bucket{endpoint="public.get_skills",method="GET",le="+Inf"}' in body
+    # Unknown URLs share one label
+    client.get('/no/such/page')
+    assert REQUESTS.snapshot(endpoint='unmatched', method='GET', status=404)['count'] >= 1
+
+def test_metrics_token_is_required_when_set(app, client):
+    app.config['METRICS_TOKEN'] = 'scrape-token'
+    try:
+        assert client.get('/api/metrics').status_code == 401
+        response = client.get('/api/metrics', headers={'Authorization': 'Bearer scrape-token'})
+        assert response.status_code == 200 and response.mimetype == 'text/plain'
+    finally:
+        app.config['METRICS_TOKEN'] = None
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import pytest
+from sqlalchemy import create_engine, inspect
+from utils.schema import SchemaOutOfDate, check_schema, head_version, status, upgrade
+
+@pytest.fixture
+def engine(app):
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'legacy.db')}")
+    yield engine
+    engine.dispose()
+
+def test_startup_refuses_a_database_that_is_behind(engine):
+    with pytest.raises(SchemaOutOfDate):
+        check_schema(engine)
+
+    assert len(upgrade(engine)) == head_version()
+    assert check_schema(engine) == head_version()
+    assert all(applied for _, _, applied in status(engine))
+    # Nothing left to apply
+    assert upgrade(engine) == []
+
+def test_upgrade_brings_a_create_all_database_up_to_date(engine):
+    # The schema db.create_all() used to make: no blocks column, no indexes
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            'CREATE TABLE projects (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, '
+            'slug VARCHAR(200) NOT NULL UNIQUE, short_description TEXT, full_description TEXT, '
+            'media JSON, tags JSON, technologies JSON, links JSON, featured BOOLEAN, status VARCHAR(50), '
+            '"order" INTEGER, views INTEGER, created_at DATETIME, updated_at DATETIME)'
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO projects (title, slug, full_description, updated_at) "
+            "VALUES ('Old', 'old', 'Legacy text', '2020-01-01 00:00:00')"
+        )
+
+    upgrade(engine)
+
+    assert 'blocks' in [column['name'] for column in inspect(engine).get_columns('projects')]
+    with engine.connect() as connection:
+        indexes = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'projects'"
+        ).scalars().all()
+        blocks, updated_at = connection.exec_driver_sql('SELECT blocks, updated_at FROM projects').one()
+    assert blocks == '[{"id": "1", "type": "text", "content": "Legacy text"}]'
+    assert updated_at.startswith('2020-01-01 00:00:00')
+    assert {'ix_projects_status_created_at', 'ix_projects_status_order'} <= set(indexes)
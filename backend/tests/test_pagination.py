@@ -0,0 +1,33 @@
+import pytest
+
+def walk(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        ids += [p['id'] for p in response.get_json()]
+        url = None
+        if 'X-Next-Cursor' in response.headers:
+            # The Link header carries the same query plus the cursor
+            url = response.headers['Link'].split('>')[0].lstrip('<')
+    return ids
+
+@pytest.mark.parametrize('sort_by', ['order', 'date', 'views'])
+def test_cursor_pages_match_the_full_listing(client, sort_by):
+    everything = [p['id'] for p in client.get(f'/api/projects/?sort_by={sort_by}').get_json()]
+    assert len(everything) > 2
+    assert walk(client, f'/api/projects/?sort_by={sort_by}&limit=2') == everything
+
+def test_last_page_has_no_cursor(client):
+    response = client.get('/api/projects/?limit=100')
+    assert 'X-Next-Cursor' not in response.headers and 'Link' not in response.headers
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'WzFd'])
+def test_bad_cursor_is_rejected(client, cursor):
+    response = client.get(f'/api/projects/?limit=2&cursor={cursor}')
+    assert response.status_code == 400
+
+def test_field_selection(client):
+    projects = client.get('/api/projects/?fields=id,title').get_json()
+    assert projects and all(set(p) == {'id', 'title'} for p in projects)
+    assert client.get('/api/projects/?fields=id,secret').status_code == 400
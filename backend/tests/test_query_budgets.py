@@ -0,0 +1,36 @@
+import pytest
+
+# Most statements each read endpoint may issue, including the ETag version check
+READ_BUDGETS = [
+    ('/api/projects/', 2),
+    ('/api/projects/?sort_by=views', 2),
+    ('/api/projects/?limit=2', 2),
+    ('/api/projects/?fields=id,title,image', 2),
+    ('/api/projects/project-1', 1),
+    # First call also builds the related-project index
+    ('/api/projects/related/project-1', 3),
+    ('/api/search?q=seed', 4),
+    ('/api/skills', 2),
+    ('/api/favorites/', 2),
+]
+
+@pytest.mark.parametrize('url,max_queries', READ_BUDGETS)
+def test_read_endpoint_query_budget(client, query_budget, url, max_queries):
+    with query_budget(max_queries):
+        response = client.get(url)
+    assert response.status_code == 200
+
+@pytest.mark.parametrize('url', ['/api/admin/contacts', '/api/admin/contacts?status=unread&q=ann&limit=2',
+                                 '/api/admin/contacts/counts'])
+def test_admin_contacts_query_budget(client, admin_headers, query_budget, url):
+    with query_budget(1):
+        response = client.get(url, headers=admin_headers)
+    assert response.status_code == 200
+
+def test_create_project_does_not_repeat_slug_queries(client, admin_headers, query_budget):
+    payload = {'title': 'Project 1', 'short_description': 'Duplicate title', 'status': 'completed'}
+    client.post('/api/projects/', json=payload, headers=admin_headers)
+
+    with query_budget(10):
+        response = client.post('/api/projects/', json=payload, headers=admin_headers)
+    assert response.status_code == 201
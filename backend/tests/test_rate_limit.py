@@ -0,0 +1,108 @@
+import pytest
+from database import db
+from utils.rate_limit import MemoryBackend, parse_limit, rate_limiter
+
+@pytest.fixture
+def limits(app, monkeypatch):
+    """Fresh buckets, with limits set per test: limits(RATE_LIMIT_FAVORITES='2/minute')"""
+    monkeypatch.setattr(rate_limiter, 'backend', MemoryBackend())
+
+    def configure(**config):
+        for key, value in config.items():
+            monkeypatch.setitem(app.config, key, value)
+    return configure
+
+def favorite(title='Limited'):
+    return {'title': title, 'category': 'film', 'tier': 'Limited-Tier'}
+
+def contact(message='Hello there'):
+    return {'name': 'Bo', 'email': 'bo@example.com', 'subject': 'Hi', 'message': message}
+
+def test_bucket_rejects_with_retry_after(client, limits):
+    limits(RATE_LIMIT_FAVORITES='2/minute')
+    statuses = [client.post('/api/favorites/', json=favorite()).status_code for _ in range(3)]
+    assert statuses == [201, 201, 429]
+
+    response = client.post('/api/favorites/', json=favorite())
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= 30
+
+def test_buckets_are_per_client_and_per_route(client, limits):
+    limits(RATE_LIMIT_FAVORITES='1/minute', RATE_LIMIT_CONTACT='1/minute', RATE_LIMIT_TRUSTED_PROXIES=1)
+    assert client.post('/api/favorites/', json=favorite()).status_code == 201
+    assert client.post('/api/favorites/', json=favorite()).status_code == 429
+    assert client.post('/api/contact', json=contact('per route')).status_code == 201
+
+    other = {'X-Forwarded-For': '203.0.113.7'}
+    assert client.post('/api/favorites/', json=favorite(), headers=other).status_code == 201
+    assert client.post('/api/favorites/', json=favorite(), headers=other).status_code == 429
+
+def test_forwarded_header_is_ignored_without_trusted_proxies(client, limits):
+    limits(RATE_LIMIT_FAVORITES='1/minute')
+    assert client.post('/api/favorites/', json=favorite(), headers={'X-Forwarded-For': '1.1.1.1'}).status_code == 201
+    assert client.post('/api/favorites/', json=favorite(), headers={'X-Forwarded-For': '2.2.2.2'}).status_code == 429
+
+def test_duplicate_contact_messages_are_not_stored(app, client, limits):
+    from models import Contact
+
+    limits(CONTACT_DUPLICATE_WINDOW=600)
+    first = client.post('/api/contact', json=contact('Same   message'))
+    again = client.post('/api/contact', json=contact('same message'))
+    different = client.post('/api/contact', json=contact('Another message'))
+
+    assert first.status_code == 201 and different.status_code == 201
+    assert again.status_code == 200 and again.get_json()['duplicate'] is True
+    with app.app_context():
+        assert Contact.query.filter(Contact.message.in_(['Same   message', 'same message'])).count() == 1
+
+def test_failed_contact_insert_does_not_block_the_retry(client, limits, monkeypatch):
+    limits(CONTACT_DUPLICATE_WINDOW=600)
+
+    commit, failures = db.session.commit, [RuntimeError('database is locked')]
+
+    def flaky_commit():
+        if failures:
+            raise failures.pop()
+        commit()
+    monkeypatch.setattr(db.session, 'commit', flaky_commit)
+    assert client.post('/api/contact', json=contact('Retried message')).status_code == 500
+
+    assert client.post('/api/contact', json=contact('Retried message')).status_code == 201
+    assert client.post('/api/contact', json=contact('Retried message')).get_json()['duplicate'] is True
+
+class DownBackend:
+    """A shared backend that has gone away"""
+
+    def take(self, key, rate, capacity, cost=1):
+        raise ConnectionError('Redis is down')
+
+    def add_once(self, key, ttl):
+        raise ConnectionError('Redis is down')
+
+    def discard(self, key):
+        raise ConnectionError('Redis is down')
+
+def test_limits_fall_back_to_this_process_when_the_backend_fails(client, limits, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'backend', DownBackend())
+    monkeypatch.setattr(rate_limiter, 'fallback', MemoryBackend())
+    limits(RATE_LIMIT_FAVORITES='1/minute', CONTACT_DUPLICATE_WINDOW=600)
+
+    assert client.post('/api/favorites/', json=favorite()).status_code == 201
+    assert client.post('/api/favorites/', json=favorite()).status_code == 429
+
+    assert client.post('/api/contact', json=contact('While Redis is down')).status_code == 201
+    assert client.post('/api/contact', json=contact('While Redis is down')).get_json()['duplicate'] is True
+
+def test_unreachable_redis_falls_back_at_startup(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_BACKEND', 'redis')
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_REDIS_URL', 'redis://127.0.0.1:1/0')
+    monkeypatch.setattr(rate_limiter, 'backend', rate_limiter.backend)
+    rate_limiter.init_app(app)
+    assert isinstance(rate_limiter.backend, MemoryBackend)
+
+def test_parse_limit():
+    assert parse_limit('30/minute') == (0.5, 30)
+    assert parse_limit('2/seconds') == (2, 2)
+    assert parse_limit('none') is None
+    with pytest.raises(ValueError):
+        parse_limit('fast')
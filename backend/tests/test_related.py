@@ -0,0 +1,62 @@
+from database import db
+from models import Project
+
+def create(client, admin_headers, title, **fields):
+    response = client.post('/api/admin/projects', headers=admin_headers,
+                           json=dict(fields, title=title, status='completed'))
+    assert response.status_code == 201
+    return response.get_json()['project']
+
+def related_slugs(client, slug):
+    response = client.get(f'/api/projects/related/{slug}')
+    assert response.status_code == 200
+    return [p['slug'] for p in response.get_json()]
+
+def test_shared_tags_outrank_shared_technologies(client, admin_headers):
+    base = create(client, admin_headers, 'Rank base', tags=['rank-tag'], technologies=['rank-tech'])
+    create(client, admin_headers, 'Rank tech', technologies=['rank-tech'])
+    create(client, admin_headers, 'Rank tag', tags=['rank-tag'])
+    create(client, admin_headers, 'Rank none', tags=['rank-other'])
+
+    assert related_slugs(client, base['slug']) == ['rank-tag', 'rank-tech']
+    assert client.get('/api/projects/related/no-such-project').status_code == 404
+
+def test_admin_edits_and_deletes_reach_the_index(client, admin_headers):
+    first = create(client, admin_headers, 'Edited a', tags=['edited-only'])
+    second = create(client, admin_headers, 'Edited b', tags=['edited-only'])
+    third = create(client, admin_headers, 'Edited c', tags=['edited-only'])
+    assert related_slugs(client, first['slug']) == [second['slug'], third['slug']]
+
+    response = client.put(f"/api/admin/projects/{second['id']}", headers=admin_headers, json={'tags': ['unrelated']})
+    assert response.status_code == 200
+    assert related_slugs(client, first['slug']) == [third['slug']]
+
+    assert client.delete(f"/api/admin/projects/{third['id']}", headers=admin_headers).status_code == 200
+    assert related_slugs(client, first['slug']) == []
+
+def test_edits_from_another_worker_reach_the_index(app, client):
+    with app.app_context():
+        for slug in ('related-a', 'related-b'):
+            db.session.add(Project(title=slug, slug=slug, status='completed', tags=['related-only']))
+        db.session.commit()
+    assert related_slugs(client, 'related-a') == ['related-b']
+
+    with app.app_context():
+        # Bypasses the index, like an edit served by another worker
+        project = Project.query.filter_by(slug='related-b').one()
+        project.tags = ['unrelated']
+        db.session.commit()
+    assert related_slugs(client, 'related-a') == []
+
+def test_admin_edits_keep_the_index_without_a_rebuild(client, admin_headers, query_budget):
+    client.get('/api/projects/related/project-1')
+    response = client.post('/api/admin/projects', headers=admin_headers, json={
+        'title': 'Related c', 'tags': ['seed'], 'status': 'completed'
+    })
+    assert response.status_code == 201
+    slug = response.get_json()['project']['slug']
+
+    # Version lookup plus the related rows; no rebuild query
+    with query_budget(2):
+        response = client.get(f'/api/projects/related/{slug}')
+    assert len(response.get_json()) == 3
@@ -0,0 +1,65 @@
+from database import db
+from models import Favorite, Project
+
+def test_project_reorder_is_one_statement(app, client, admin_headers, query_budget):
+    with app.app_context():
+        ids = [p.id for p in Project.query.filter(Project.slug.like('project-%')).order_by(Project.id)]
+        edited = dict(db.session.query(Project.id, Project.updated_at).filter(Project.id.in_(ids)))
+    etag = client.get('/api/projects/').headers['ETag']
+
+    # The reorder UPDATE plus the projects content-version bump
+    with query_budget(2):
+        response = client.post('/api/admin/projects/reorder', json={'ids': ids[::-1]}, headers=admin_headers)
+    assert response.status_code == 200
+
+    with app.app_context():
+        orders = dict(db.session.query(Project.id, Project.order).filter(Project.id.in_(ids)))
+        assert [orders[i] for i in ids[::-1]] == list(range(len(ids)))
+        # Moving a project is not an edit, but cached listings must still change
+        assert dict(db.session.query(Project.id, Project.updated_at).filter(Project.id.in_(ids))) == edited
+    assert client.get('/api/projects/', headers={'If-None-Match': etag}).status_code == 200
+
+def test_reorder_with_unknown_ids_changes_nothing(app, client, admin_headers):
+    with app.app_context():
+        favorite_id = Favorite.query.first().id
+        before = db.session.get(Favorite, favorite_id).order
+
+    response = client.post('/api/admin/favorites/reorder', json={'ids': [favorite_id, 999999]},
+                           headers=admin_headers)
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert db.session.get(Favorite, favorite_id).order == before
+
+    for body in ({'ids': []}, {'ids': [1, 1]}, {'ids': ['1']}, None):
+        assert client.post('/api/admin/favorites/reorder', json=body, headers=admin_headers).status_code == 400
+
+def test_favorite_reorder_moves_items_in_the_listing(client, admin_headers):
+    ids = [client.post('/api/favorites/', json={'title': f'Ranked {i}', 'category': 'film', 'tier': 'Ranked-Tier'})
+           .get_json()['id'] for i in range(3)]
+    listing = '/api/favorites/?category=films&tier=Ranked-Tier'
+    assert [f['id'] for f in client.get(listing).get_json()] == ids
+
+    new_order = [ids[2], ids[0], ids[1]]
+    assert client.post('/api/admin/favorites/reorder', json={'ids': new_order}, headers=admin_headers).status_code == 200
+    assert [f['id'] for f in client.get(listing).get_json()] == new_order
+
+def test_favorite_update_and_delete(client, admin_headers):
+    favorite_id = client.post('/api/favorites/', json={
+        'title': 'Draft', 'category': 'film', 'tier': 'Edit-Tier'
+    }).get_json()['id']
+    etag = client.get('/api/favorites/').headers['ETag']
+
+    response = client.put(f'/api/admin/favorites/{favorite_id}', json={'title': 'Final', 'tier': 'Moved-Tier'},
+                          headers=admin_headers)
+    assert response.status_code == 200
+
+    data = client.get('/api/favorites/?category=films').get_json()
+    assert 'Edit-Tier' not in data
+    assert [f['title'] for f in data['Moved-Tier']] == ['Final']
+    # Edits move the content version even though no row was added
+    assert client.get('/api/favorites/', headers={'If-None-Match': etag}).status_code == 200
+
+    assert client.delete(f'/api/admin/favorites/{favorite_id}', headers=admin_headers).status_code == 200
+    assert 'Moved-Tier' not in client.get('/api/favorites/?category=films').get_json()
+    assert client.delete(f'/api/admin/favorites/{favorite_id}', headers=admin_headers).status_code == 404
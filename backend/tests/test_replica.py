@@ -0,0 +1,115 @@
+import os
+import tempfile
+import pytest
+from flask import Blueprint, Flask, jsonify
+from sqlalchemy import text
+import database
+from database import db, init_db, READ_YOUR_WRITES_COOKIE
+from models import Project, Skill
+from routes.public import public_bp
+from utils import search_index
+from utils.cache import NullCache, response_cache
+
+@pytest.fixture
+def replica_app(monkeypatch):
+    """Minimal app on two SQLite files holding different rows, so each read shows where it went"""
+    folder = tempfile.mkdtemp()
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(folder, 'primary.db')}",
+        DATABASE_REPLICA_URL=f"sqlite:///{os.path.join(folder, 'replica.db')}",
+        DB_READ_YOUR_WRITES_SECONDS=60
+    )
+    # Blueprint named like one whose GETs may use the replica
+    bp = Blueprint('public', __name__)
+
+    @bp.route('/skills')
+    def read():
+        return jsonify(sorted(name for (name,) in db.session.query(Skill.name)))
+
+    @bp.route('/bump')
+    def raw_write():
+        db.session.execute(text('UPDATE skills SET proficiency = proficiency + 1'))
+        db.session.commit()
+        return jsonify(ok=True)
+
+    @bp.route('/skills', methods=['POST'])
+    def write():
+        db.session.add(Skill(name='added', category='Test', proficiency=1))
+        db.session.commit()
+        return jsonify(ok=True)
+
+    app.register_blueprint(bp)
+    init_db(app)
+
+    with app.app_context():
+        for key, name in ((None, 'on-primary'), ('replica', 'on-replica')):
+            db.metadata.create_all(db.engines[key])
+            with db.engines[key].begin() as conn:
+                conn.execute(Skill.__table__.insert(), {'name': name, 'category': 'Test', 'proficiency': 1})
+
+    monkeypatch.setattr(database, '_primary_until', 0.0)
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def proficiencies(app):
+    with app.app_context():
+        return [db.engines[key].connect().execute(text('SELECT proficiency FROM skills')).scalar()
+                for key in (None, 'replica')]
+
+def test_get_reads_use_the_replica_and_writes_the_primary(replica_app):
+    client = replica_app.test_client()
+    assert client.get('/skills').get_json() == ['on-replica']
+
+    # A raw UPDATE in a GET handler is not a SELECT, so it runs on the primary
+    assert client.get('/bump').status_code == 200
+    assert proficiencies(replica_app) == [2, 1]
+
+def test_reads_stay_on_the_primary_after_a_write(replica_app):
+    client = replica_app.test_client()
+    response = client.post('/skills')
+    assert READ_YOUR_WRITES_COOKIE in response.headers.get('Set-Cookie', '')
+    assert client.get('/skills').get_json() == ['added', 'on-primary']
+
+    # Once the window passes (process-wide and per client) reads return to the replica
+    database._primary_until = 0.0
+    client.delete_cookie(READ_YOUR_WRITES_COOKIE)
+    assert client.get('/skills').get_json() == ['on-replica']
+
+@pytest.fixture
+def search_app(monkeypatch):
+    """The real /api/search on a primary with two matching projects and a replica that has one"""
+    folder = tempfile.mkdtemp()
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(folder, 'primary.db')}",
+        DATABASE_REPLICA_URL=f"sqlite:///{os.path.join(folder, 'replica.db')}"
+    )
+    app.register_blueprint(public_bp, url_prefix='/api')
+    init_db(app)
+
+    with app.app_context():
+        for key, count in ((None, 2), ('replica', 1)):
+            db.metadata.create_all(db.engines[key])
+            with db.engines[key].begin() as conn:
+                if search_index.create_search_index(conn) != 'fts5':
+                    pytest.skip('SQLite without FTS5')
+                conn.execute(Project.__table__.insert(), [
+                    {'title': f'Needle {i}', 'slug': f'needle-{i}', 'status': 'completed'} for i in range(count)
+                ])
+                search_index.rebuild_search_index(conn)
+
+    monkeypatch.setattr(search_index, '_backend', 'fts5')
+    monkeypatch.setattr(response_cache, 'backend', NullCache())
+    monkeypatch.setattr(database, '_primary_until', 0.0)
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def test_search_matches_and_loads_projects_from_the_same_database(search_app):
+    body = search_app.test_client().get('/api/search?q=needle').get_json()
+    # The lagging replica answers both the ranking and the page
+    assert (body['total'], [project['slug'] for project in body['results']]) == (1, ['needle-0'])
@@ -0,0 +1,32 @@
+def search(client, q):
+    return client.get(f'/api/search?q={q}').get_json()
+
+def test_search_ranks_title_matches_first(client, admin_headers):
+    for title, description in (('Plain tool', 'Built for quokkas'), ('Quokka tracker', 'Field notes')):
+        response = client.post('/api/admin/projects', json={
+            'title': title, 'short_description': description, 'status': 'completed'
+        }, headers=admin_headers)
+        assert response.status_code == 201
+
+    data = search(client, 'quokka')
+    assert data['total'] == 2
+    assert [r['title'] for r in data['results']] == ['Quokka tracker', 'Plain tool']
+
+    page = client.get('/api/search?q=quokka&limit=1&offset=1').get_json()
+    assert [r['title'] for r in page['results']] == ['Plain tool'] and page['total'] == 2
+
+def test_index_follows_updates_and_deletes(client, admin_headers):
+    project = client.post('/api/admin/projects', json={
+        'title': 'Axolotl viewer', 'status': 'completed'
+    }, headers=admin_headers).get_json()['project']
+    assert search(client, 'axolotl')['total'] == 1
+
+    client.put(f"/api/admin/projects/{project['id']}", json={'title': 'Narwhal viewer'}, headers=admin_headers)
+    assert search(client, 'axolotl')['total'] == 0
+    assert [r['id'] for r in search(client, 'narwhal')['results']] == [project['id']]
+
+    client.delete(f"/api/admin/projects/{project['id']}", headers=admin_headers)
+    assert search(client, 'narwhal')['total'] == 0
+
+def test_empty_query_returns_nothing(client):
+    assert search(client, '')['results'] == []
@@ -0,0 +1,68 @@
+from database import db
+from models import Project
+from utils.slugs import SlugAllocator, next_free_slug, save_with_unique_slug, slugify
+
+def test_colliding_titles_get_numbered_suffixes(client, admin_headers):
+    slugs = []
+    for _ in range(3):
+        response = client.post('/api/admin/projects', json={'title': 'Portfolio'}, headers=admin_headers)
+        assert response.status_code == 201
+        slugs.append(response.get_json()['project']['slug'])
+    assert slugs == ['portfolio', 'portfolio-1', 'portfolio-2']
+
+def test_allocator_fills_gaps_and_ignores_other_suffixes(app):
+    with app.app_context():
+        for slug in ('gap', 'gap-2', 'gap-final'):
+            save_with_unique_slug(Project(title=slug, status='completed'), slug)
+        assert next_free_slug('gap') == 'gap-1'
+
+        allocator = SlugAllocator()
+        assert [allocator.allocate('gap') for _ in range(3)] == ['gap-1', 'gap-3', 'gap-4']
+
+def test_like_wildcards_in_base_are_escaped(app):
+    with app.app_context():
+        save_with_unique_slug(Project(title='a', status='completed'), 'a_b-1')
+        assert next_free_slug('a%b') == 'a%b'
+        assert next_free_slug('a_b') == 'a_b'
+
+def test_allocation_uses_one_query_per_base(app, query_budget):
+    with app.app_context():
+        allocator = SlugAllocator()
+        with query_budget(1):
+            for _ in range(50):
+                allocator.allocate('bulk-import')
+
+def test_save_retries_when_a_concurrent_insert_takes_the_slug(app, monkeypatch):
+    with app.app_context():
+        save_with_unique_slug(Project(title='Race', status='completed'), 'race')
+
+        # Simulate a stale lookup: the first load misses the row committed "concurrently"
+        loads = []
+        original = SlugAllocator._load
+        def stale_load(self, base):
+            loads.append(base)
+            return set() if len(loads) == 1 else original(self, base)
+        monkeypatch.setattr(SlugAllocator, '_load', stale_load)
+
+        project = save_with_unique_slug(Project(title='Race', status='completed'), 'race')
+        assert project.slug == 'race-1'
+        assert len(loads) == 2
+
+def test_renamed_projects_get_a_free_slug(client, admin_headers):
+    def create(title):
+        response = client.post('/api/projects/', json={'title': title}, headers=admin_headers)
+        assert response.status_code == 201
+        return response.get_json()['id']
+
+    def rename(project_id, title):
+        response = client.put(f'/api/projects/{project_id}', json={'title': title}, headers=admin_headers)
+        assert response.status_code == 200
+        with client.application.app_context():
+            return db.session.get(Project, project_id).slug
+
+    create('Renamed target')
+    project_id = create('Rename me')
+    assert rename(project_id, 'Renamed target') == 'renamed-target-1'
+    # Same title again keeps the slug it has
+    assert rename(project_id, 'Renamed Target') == 'renamed-target-1'
+    assert rename(project_id, 'Café Ünïcode') == slugify('Café Ünïcode') == 'caf-ncode'
@@ -0,0 +1,169 @@
+import io
+import os
+import threading
+import time
+from werkzeug.datastructures import FileStorage
+from database import db
+from models import UploadSession
+from utils import chunked_upload, cloudinary_upload
+from utils.cloudinary_upload import delete_from_cloudinary, store_locally, upload_multiple_files
+
+def upload(name, data=b'data'):
+    return FileStorage(io.BytesIO(data), filename=name)
+
+class FakeUploader:
+    """Stands in for Cloudinary; files named slow_* block until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+        self.deleted = []
+        self.finished = threading.Event()
+
+    def upload(self, file, folder):
+        self.calls.append(file.filename)
+        if file.filename.startswith('slow'):
+            self.started.set()
+            self.release.wait(5)
+        if file.filename.startswith('broken'):
+            raise RuntimeError('upload failed')
+        return {'public_id': f'{folder}/{file.filename}', 'url': f'https://cdn.test/{file.filename}'}
+
+    def delete(self, public_id):
+        self.deleted.append(public_id)
+        self.finished.set()
+        return True
+
+def test_results_keep_input_order_and_fail_per_file(app):
+    fake = FakeUploader()
+    files = [upload('a.png'), upload('notes.txt'), upload('broken.png'), upload('b.jpg')]
+    with app.test_request_context():
+        uploaded, errors = upload_multiple_files(files, 'tests', uploader=fake.upload, deleter=fake.delete)
+
+    assert [media['public_id'] for media in uploaded] == ['tests/a.png', 'tests/b.jpg']
+    assert errors == ['Invalid file: notes.txt', 'Error uploading broken.png: upload failed']
+    assert fake.deleted == []
+
+def test_timed_out_uploads_are_cancelled_or_cleaned_up(app):
+    fake = FakeUploader()
+    # One worker: slow.png is running at the timeout, queued.png never starts
+    files = [upload('slow.png'), upload('queued.png')]
+    with app.test_request_context():
+        uploaded, errors = upload_multiple_files(files, 'tests', max_workers=1, timeout=0.2,
+                                                 uploader=fake.upload, deleter=fake.delete)
+
+    assert uploaded == [] and len(errors) == 2
+    assert all('timed out' in error for error in errors)
+    assert fake.started.is_set()
+
+    # The running upload finishes after the request gave up on it
+    fake.release.set()
+    assert fake.finished.wait(5)
+    assert fake.deleted == ['tests/slow.png']
+    assert fake.calls == ['slow.png']
+
+def test_parallel_uploads_through_the_endpoint_read_their_own_files(client, admin_headers, monkeypatch):
+    first = {}
+
+    def store(file, folder='portfolio', base_url=None):
+        if file.filename == 'first.png':
+            first['file'] = file
+        else:
+            # Read only once the other worker is completely done with its file
+            deadline = time.time() + 5
+            while not (first and first['file'].stream.closed) and time.time() < deadline:
+                time.sleep(0.01)
+        return store_locally(file, folder, base_url)
+
+    monkeypatch.setattr(cloudinary_upload, 'store_locally', store)
+    response = client.post('/api/admin/upload-multiple', headers=admin_headers,
+                           content_type='multipart/form-data',
+                           data={'files': [(io.BytesIO(b'first'), 'first.png'), (io.BytesIO(b'second'), 'second.png')],
+                                 'concurrency': '2'})
+
+    body = response.get_json()
+    assert body['errors'] == []
+    assert [media['size'] for media in body['uploaded']] == [5, 6]
+    assert all(media['url'].startswith('http://localhost/api/media/portfolio/') for media in body['uploaded'])
+
+def start_stream(client, admin_headers, size, folder='portfolio'):
+    return client.post('/api/admin/upload-stream', headers=admin_headers,
+                       json={'filename': 'clip.mp4', 'size': size, 'folder': folder})
+
+def test_stream_upload_resumes_only_at_the_received_offset(client, admin_headers):
+    upload_id = start_stream(client, admin_headers, 10).get_json()['upload_id']
+    url = f'/api/admin/upload-stream/{upload_id}'
+
+    response = client.put(url, data=b'01234', headers=dict(admin_headers, **{'Content-Range': 'bytes 0-4/10'}))
+    assert response.get_json()['received'] == 5
+
+    # Resending from the wrong byte is refused and reports where to resume
+    response = client.put(url, data=b'23456789', headers=dict(admin_headers, **{'Content-Range': 'bytes 2-9/10'}))
+    assert response.status_code == 409 and response.get_json()['received'] == 5
+
+    response = client.put(url, data=b'56789', headers=dict(admin_headers, **{'Content-Range': 'bytes 5-9/10'}))
+    body = response.get_json()
+    assert body['status'] == 'complete' and body['media']['public_id'].startswith('local:portfolio/')
+
+def test_finished_cloudinary_streams_return_their_media(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(chunked_upload, 'cloudinary_configured', lambda: True)
+    monkeypatch.setattr(chunked_upload, '_write_cloudinary', lambda session, chunk, start: {
+        'secure_url': 'https://res.cloudinary.com/demo/video/upload/clip.mp4', 'public_id': 'portfolio/clip',
+        'resource_type': 'video', 'format': 'mp4', 'bytes': session.size
+    })
+    failures = ['variants unavailable']
+    def add_variants(media):
+        if failures:
+            raise RuntimeError(failures.pop())
+        return media
+    monkeypatch.setattr(chunked_upload, 'add_variants', add_variants)
+
+    upload_id = start_stream(client, admin_headers, 4).get_json()['upload_id']
+    url = f'/api/admin/upload-stream/{upload_id}'
+    headers = dict(admin_headers, **{'Content-Range': 'bytes 0-3/4'})
+
+    # Finishing failed after the last part was sent, so the part counts as not received
+    assert client.put(url, data=b'0123', headers=headers).status_code == 500
+    assert client.get(url, headers=admin_headers).get_json()['received'] == 0
+
+    first = client.put(url, data=b'0123', headers=headers).get_json()
+    assert first['status'] == 'complete' and first['media']['public_id'] == 'portfolio/clip'
+    # A retried last chunk (the response was lost) gets the stored media back
+    assert client.put(url, data=b'0123', headers=headers).get_json() == first
+
+def test_failed_streams_cannot_be_resumed(app, client, admin_headers):
+    upload_id = start_stream(client, admin_headers, 10).get_json()['upload_id']
+    with app.app_context():
+        db.session.get(UploadSession, upload_id).status = 'failed'
+        db.session.commit()
+
+    response = client.put(f'/api/admin/upload-stream/{upload_id}', data=b'0123456789',
+                          headers=dict(admin_headers, **{'Content-Range': 'bytes 0-9/10'}))
+    assert response.status_code == 409 and response.get_json()['status'] == 'failed'
+
+def test_upload_paths_stay_inside_the_upload_folder(app, client, admin_headers):
+    for folder in ('../outside', '/etc', 'a/../../b', ''):
+        assert start_stream(client, admin_headers, 10, folder).status_code == 400
+
+    outside = os.path.join(os.path.dirname(app.config['UPLOAD_FOLDER']), 'keep-me.txt')
+    with open(outside, 'w') as f:
+        f.write('not an upload')
+    with app.app_context():
+        assert delete_from_cloudinary(f'local:../{os.path.basename(outside)}') is False
+    assert os.path.exists(outside)
+    os.remove(outside)
+
+def test_local_uploads_reject_folders_outside_the_upload_folder(app, client, admin_headers):
+    def post(folder):
+        return client.post('/api/admin/upload', headers=admin_headers, content_type='multipart/form-data',
+                           data={'file': (io.BytesIO(b'data'), 'photo.png'), 'folder': folder, 'sync': '1'})
+
+    for folder in ('../outside', 'a/../../b', '/tmp'):
+        assert post(folder).status_code == 400
+    assert not os.path.exists(os.path.join(os.path.dirname(app.config['UPLOAD_FOLDER']), 'outside'))
+
+    media = post('portfolio/projects').get_json()['media']
+    relative = media['public_id'][len('local:'):]
+    assert relative.startswith('portfolio/projects/')
+    assert os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], relative))
@@ -0,0 +1,49 @@
+from sqlalchemy import event
+from database import db
+from models import Project
+from utils.view_counter import view_counter
+
+def test_views_are_counted_in_memory_and_flushed_in_one_batch(app, client):
+    with app.app_context():
+        project = Project(title='Viewed', slug='viewed', status='completed', views=10)
+        db.session.add(project)
+        db.session.commit()
+        project_id, updated_at = project.id, project.updated_at
+    # Start from an empty batch (other tests leave views pending)
+    view_counter.flush()
+
+    reported = [client.get('/api/projects/viewed').get_json()['views'] for _ in range(3)]
+    assert reported == [11, 12, 13]
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            view_counter.flush()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    assert len(statements) == 1 and statements[0].lstrip().upper().startswith('UPDATE')
+    assert view_counter.pending(project_id) == 0
+
+    with app.app_context():
+        project = db.session.get(Project, project_id)
+        assert project.views == 13
+        # A view is not an edit
+        assert project.updated_at == updated_at
+
+def test_failed_flush_keeps_counts_for_the_next_one(app, client, monkeypatch):
+    with app.app_context():
+        project_id = Project.query.filter_by(slug='project-3').one().id
+    client.get('/api/projects/project-3')
+
+    def broken_commit():
+        raise RuntimeError('database is locked')
+    monkeypatch.setattr(db.session, 'commit', broken_commit)
+    assert view_counter.flush() == 0
+    assert view_counter.pending(project_id) == 1
+
+    monkeypatch.undo()
+    assert view_counter.flush() >= 1
+    assert view_counter.pending(project_id) == 0
@@ -0,0 +1,13 @@
+import json
+
+def content_to_blocks(content):
+    """Convert stored content (a JSON block list or legacy text) to blocks"""
+    try:
+        if content and content.startswith('['):
+            blocks = json.loads(content)
+            if isinstance(blocks, list):
+                return blocks
+    except ValueError:
+        pass
+    # Legacy content - convert to block format
+    return [{'id': '1', 'type': 'text', 'content': content or ''}]
@@ -0,0 +1,193 @@
+import json
+from datetime import date, datetime
+from sqlalchemy import Boolean, DateTime, Integer, JSON, String, insert, select
+from database import db
+from models import Project, Favorite, Skill
+from utils.blocks import content_to_blocks
+from utils.events import publish
+from utils.favorites_snapshot import favorites_snapshot
+from utils.related_index import related_index
+from utils.search_index import index_projects
+from utils.slugs import SlugAllocator, slugify
+
+try:
+    import orjson
+except ImportError:  # stdlib json
+    orjson = None
+
+# Resource name -> model; the event topic is the table name
+RESOURCES = {
+    'projects': Project,
+    'favorites': Favorite,
+    'skills': Skill
+}
+
+# Columns that are never taken from an import (ids are assigned by the database)
+IGNORED_FIELDS = {'id'}
+
+# Rows reported back in full; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+class RowError(ValueError):
+    """A single import row is invalid"""
+
+def _check_value(column, value):
+    """Validate and convert one JSON value for a column"""
+    if value is None:
+        if not column.nullable and column.default is None:
+            raise RowError(f"{column.name} is required")
+        return None
+
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        if not isinstance(value, bool):
+            raise RowError(f"{column.name} must be a boolean")
+    elif isinstance(column_type, Integer):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise RowError(f"{column.name} must be an integer")
+    elif isinstance(column_type, DateTime):
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            raise RowError(f"{column.name} must be an ISO 8601 datetime")
+    elif isinstance(column_type, JSON):
+        if not isinstance(value, (list, dict)):
+            raise RowError(f"{column.name} must be a list or object")
+    elif isinstance(column_type, String):
+        if not isinstance(value, str):
+            raise RowError(f"{column.name} must be a string")
+        if column_type.length and len(value) > column_type.length:
+            raise RowError(f"{column.name} is longer than {column_type.length} characters")
+    return value
+
+def validate_row(model, data):
+    """Turn a decoded NDJSON object into column values for model, or raise RowError"""
+    if not isinstance(data, dict):
+        raise RowError("Each line must be a JSON object")
+
+    columns = model.__table__.columns
+    unknown = set(data) - set(columns.keys()) - IGNORED_FIELDS
+    if unknown:
+        raise RowError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    row = {}
+    for column in columns:
+        if column.name in IGNORED_FIELDS:
+            continue
+        if column.name in data:
+            row[column.name] = _check_value(column, data[column.name])
+        elif not column.nullable and column.default is None and not column.primary_key:
+            if not (model is Project and column.name == 'slug'):
+                raise RowError(f"{column.name} is required")
+    return row
+
+def _prepare_project(row, allocator):
+    """Fill in the slug and parsed blocks the way the create endpoints do"""
+    base = row.get('slug') or slugify(row['title'])
+    row['slug'] = allocator.allocate(base)
+    if row.get('blocks') is None:
+        row['blocks'] = content_to_blocks(row.get('full_description'))
+    return row
+
+def _insert_batch(model, rows):
+    """Insert rows in one statement within the current transaction"""
+    if model is Project:
+        # RETURNING the (unique) slugs maps new ids back to rows for the search index
+        # without forcing row-at-a-time inserts to preserve order
+        result = db.session.execute(insert(Project).returning(Project.id, Project.slug), rows)
+        ids = {slug: project_id for project_id, slug in result}
+        index_projects(db.session.connection(), [
+            (ids[row['slug']], row.get('title'), row.get('short_description'), row.get('full_description'),
+             row.get('tags'), row.get('technologies'))
+            for row in rows
+        ])
+    else:
+        db.session.execute(insert(model), rows)
+
+def import_ndjson(resource, lines, batch_size=500):
+    """
+    Validate and insert NDJSON rows in batched transactions.
+
+    Each batch is one multi-row INSERT and one commit. If a batch fails in
+    the database, its rows are retried one at a time so only the bad rows
+    are reported. Returns {'inserted', 'failed', 'errors': [{'line', 'error'}]}.
+    """
+    model = RESOURCES[resource]
+    allocator = SlugAllocator() if model is Project else None
+    summary = {'inserted': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    def fail(line_number, message):
+        summary['failed'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line_number, 'error': message})
+
+    def flush():
+        if not batch:
+            return
+        try:
+            _insert_batch(model, [row for _, row in batch])
+            db.session.commit()
+            summary['inserted'] += len(batch)
+        except Exception:
+            db.session.rollback()
+            for line_number, row in batch:
+                try:
+                    _insert_batch(model, [row])
+                    db.session.commit()
+                    summary['inserted'] += 1
+                except Exception as e:
+                    db.session.rollback()
+                    fail(line_number, str(getattr(e, 'orig', e)))
+        batch.clear()
+
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            continue
+
+        try:
+            data = orjson.loads(line) if orjson else json.loads(line)
+            row = validate_row(model, data)
+            if allocator:
+                row = _prepare_project(row, allocator)
+        except RowError as e:
+            fail(line_number, str(e))
+            continue
+        except ValueError as e:
+            fail(line_number, f"Invalid JSON: {str(e)}")
+            continue
+
+        batch.append((line_number, row))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    if summary['inserted']:
+        if model is Project:
+            related_index.invalidate()
+        elif model is Favorite:
+            favorites_snapshot.invalidate()
+        publish(model.__tablename__, bulk=True)
+    return summary
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _encode(row):
+    if orjson:
+        return orjson.dumps(row, default=_default) + b'\n'
+    return (json.dumps(row, default=_default) + '\n').encode()
+
+def export_ndjson(resource, batch_size=500):
+    """Yield every row as an NDJSON line, streaming from a server-side cursor"""
+    model = RESOURCES[resource]
+    table = model.__table__
+    result = db.session.execute(
+        select(table).order_by(table.c.id).execution_options(yield_per=batch_size)
+    )
+    for row in result.mappings():
+        yield _encode(dict(row))
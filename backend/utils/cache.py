@@ -0,0 +1,269 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import g, request, make_response, current_app
+from utils import events
+from utils.metrics import metrics
+from utils.responses import negotiate_encoding, compress
+
+CACHE_REQUESTS = metrics.counter('response_cache_requests_total', 'Response cache lookups by endpoint and result')
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL and tag-based invalidation"""
+
+    def __init__(self, max_entries=512, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> {key}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, tags=(), ttl=None):
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+class RedisCache:
+    """
+    Cache backed by a Redis-compatible client, shared by every worker.
+
+    The client only needs get, set(ex=), delete, sadd, smembers, ttl, expire
+    and scan_iter, so a small in-memory stub can stand in for Redis in tests.
+    """
+
+    def __init__(self, client, ttl=300, prefix='portfolio:cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        value['body'] = base64.b64decode(value['body'])
+        value['variants'] = {k: base64.b64decode(v) for k, v in value.get('variants', {}).items()}
+        return value
+
+    def set(self, key, value, tags=(), ttl=None):
+        ttl = int(ttl or self.ttl)
+        raw = json.dumps(dict(
+            value,
+            body=base64.b64encode(value['body']).decode(),
+            variants={k: base64.b64encode(v).decode() for k, v in value.get('variants', {}).items()}
+        ))
+        self.client.set(self.prefix + key, raw, ex=ttl)
+        for tag in tags:
+            tag_key = self.prefix + 'tag:' + tag
+            self.client.sadd(tag_key, key)
+            # Outlive every entry listed in the set, but do not grow forever
+            if self.client.ttl(tag_key) < ttl:
+                self.client.expire(tag_key, ttl)
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            tag_key = self.prefix + 'tag:' + tag
+            keys = [k.decode() if isinstance(k, bytes) else k for k in self.client.smembers(tag_key)]
+            if keys:
+                self.client.delete(*[self.prefix + k for k in keys])
+            self.client.delete(tag_key)
+
+    def clear(self):
+        """Delete every key under this cache's prefix (other data in the database is untouched)"""
+        batch = []
+        for key in self.client.scan_iter(match=self.prefix + '*', count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+class NullCache:
+    """Cache that never stores anything (CACHE_BACKEND=none)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, tags=(), ttl=None):
+        pass
+
+    def invalidate(self, *tags):
+        pass
+
+    def clear(self):
+        pass
+
+class ResponseCache:
+    """Caches GET responses and drops them when their tables change"""
+
+    # Response headers worth replaying from cache
+    STORED_HEADERS = ('Content-Type', 'Link', 'X-Next-Cursor')
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryCache()
+        # Bumped on every invalidation so a response computed before a write
+        # is not stored after it
+        self._generation = 0
+        # MemoryCache hands every thread the same entry dict
+        self._variants_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Pick the backend from config and subscribe to write events"""
+        kind = app.config.get('CACHE_BACKEND', 'memory')
+        ttl = app.config.get('CACHE_TTL', 300)
+
+        if kind == 'none':
+            self.backend = NullCache()
+        elif kind == 'redis':
+            try:
+                self.backend = RedisCache.from_url(app.config['CACHE_REDIS_URL'], ttl=ttl)
+            except Exception as e:
+                app.logger.warning(f"Redis cache unavailable, using in-process cache: {str(e)}")
+                self.backend = MemoryCache(app.config.get('CACHE_MAX_ENTRIES', 512), ttl)
+        else:
+            self.backend = MemoryCache(app.config.get('CACHE_MAX_ENTRIES', 512), ttl)
+
+        app.extensions['response_cache'] = self
+        events.subscribe('*', self._on_change)
+
+    def _on_change(self, topic, **payload):
+        self.invalidate(topic)
+
+    def invalidate(self, *tags):
+        self._generation += 1
+        try:
+            self.backend.invalidate(*tags)
+        except Exception as e:
+            current_app.logger.error(f"Error invalidating cache: {str(e)}")
+
+    @staticmethod
+    def make_key():
+        """
+        Endpoint plus query args in a canonical order, and the content version
+        @conditional looked up: writes that skipped our invalidation (other
+        workers, scripts) still lead to a new key instead of a stale hit.
+        """
+        args = sorted((k, v) for k, values in request.args.lists() for v in values)
+        key = f"{request.endpoint}?{urlencode(args)}"
+        version = g.get('content_version')
+        return f"{key}#{version}" if version else key
+
+    def _build_response(self, key, entry, tags, ttl, store=False):
+        """
+        Serve an entry, compressed for this client when worthwhile.
+
+        Compressed bodies are kept on the entry, so repeat hits skip both
+        JSON encoding and compression.
+        """
+        body = entry['body']
+        encoding = negotiate_encoding()
+
+        if encoding and len(body) >= current_app.config.get('COMPRESS_MIN_SIZE', 500):
+            with self._variants_lock:
+                compressed = entry['variants'].get(encoding)
+            if compressed is None:
+                compressed = compress(body, encoding, current_app.config.get('COMPRESS_LEVEL', 6))
+                with self._variants_lock:
+                    compressed = entry['variants'].setdefault(encoding, compressed)
+                store = True
+            body = compressed
+        else:
+            encoding = None
+
+        if store:
+            try:
+                self.backend.set(key, entry, tags=tags, ttl=ttl)
+            except Exception as e:
+                current_app.logger.error(f"Error writing cache: {str(e)}")
+
+        response = make_response(body, entry['status'])
+        response.headers.update(entry['headers'])
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    def cached(self, *tags, ttl=None):
+        """Decorator caching a view's 200 responses under the given table tags"""
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                key = self.make_key()
+
+                try:
+                    entry = self.backend.get(key)
+                except Exception:
+                    entry = None
+
+                if entry is not None:
+                    CACHE_REQUESTS.inc(endpoint=request.endpoint, result='hit')
+                    response = self._build_response(key, entry, tags, ttl)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                CACHE_REQUESTS.inc(endpoint=request.endpoint, result='miss')
+                generation = self._generation
+                response = make_response(f(*args, **kwargs))
+                if (response.status_code == 200 and not response.is_streamed
+                        and generation == self._generation):
+                    entry = {
+                        'status': response.status_code,
+                        'headers': {h: response.headers[h] for h in self.STORED_HEADERS if h in response.headers},
+                        'body': response.get_data(),
+                        'variants': {}
+                    }
+                    response = self._build_response(key, entry, tags, ttl, store=True)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+
+            return decorated_function
+        return decorator
+
+response_cache = ResponseCache()
+cached = response_cache.cached
@@ -0,0 +1,157 @@
+import os
+import time
+import uuid
+import cloudinary
+import cloudinary.uploader
+from flask import current_app
+from werkzeug.utils import secure_filename
+from database import db
+from models import UploadSession
+from utils.cloudinary_upload import (allowed_file, clean_folder, cloudinary_configured, media_from_result,
+                                     ALLOWED_EXTENSIONS, VIDEO_EXTENSIONS, UPLOAD_BUCKETS)
+from utils.media_pipeline import add_variants, media_url, upload_path
+from utils.metrics import metrics
+
+CHUNK_DURATION = metrics.histogram(
+    'upload_chunk_duration_seconds', 'Streaming upload chunk writes by storage', UPLOAD_BUCKETS
+)
+
+class UploadOffsetError(Exception):
+    """Chunk does not start where the upload left off"""
+
+    def __init__(self, received):
+        super().__init__(f"Upload is at byte {received}")
+        self.received = received
+
+class UploadFailedError(Exception):
+    """Upload failed earlier and cannot be resumed; the client starts a new one"""
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[1].lower()
+
+def start_upload(filename, size, folder='portfolio'):
+    """Open a resumable upload session for a file of known size"""
+    if not filename or not allowed_file(filename):
+        raise ValueError(f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}")
+    if not isinstance(size, int) or size <= 0:
+        raise ValueError('size must be a positive number of bytes')
+    if size > current_app.config.get('UPLOAD_STREAM_MAX_SIZE', 500 * 1024 * 1024):
+        raise ValueError('File is too large')
+    folder = clean_folder(folder)
+
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        filename=secure_filename(filename),
+        folder=folder,
+        storage='cloudinary' if cloudinary_configured() else 'local',
+        size=size,
+        received=0
+    )
+    db.session.add(session)
+    db.session.commit()
+    return session
+
+def read_chunks(stream, chunk_size, limit):
+    """Yield up to limit bytes from stream, at most chunk_size bytes at a time"""
+    while limit > 0:
+        buffer = bytearray()
+        while len(buffer) < min(chunk_size, limit):
+            data = stream.read(min(chunk_size, limit) - len(buffer))
+            if not data:
+                break
+            buffer.extend(data)
+        if not buffer:
+            return
+        limit -= len(buffer)
+        yield bytes(buffer)
+        if len(buffer) < chunk_size and limit > 0:
+            return  # body ended early (client disconnected or sent a partial range)
+
+def _write_cloudinary(session, chunk, start):
+    end = start + len(chunk) - 1
+    return cloudinary.uploader.upload_large_part(
+        (session.filename, chunk),
+        http_headers={
+            'Content-Range': f'bytes {start}-{end}/{session.size}',
+            'X-Unique-Upload-Id': session.id
+        },
+        folder=session.folder,
+        resource_type='video' if _extension(session.filename) in VIDEO_EXTENSIONS else 'image'
+    )
+
+def _local_path(session):
+    return upload_path(session.folder, f'{session.id}_{session.filename}')
+
+def _write_local(session, chunk, start):
+    path = _local_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(start)
+        f.write(chunk)
+    return None
+
+def _local_media(session):
+    relative = f'{session.folder}/{session.id}_{session.filename}'
+    extension = _extension(session.filename)
+    return {
+        'url': media_url(relative),
+        'public_id': f'local:{relative}',
+        'type': 'video' if extension in VIDEO_EXTENSIONS else 'image',
+        'format': extension,
+        'width': None,
+        'height': None,
+        'size': session.size
+    }
+
+def receive_chunks(session, stream, start):
+    """
+    Stream the request body to storage, one chunk at a time.
+
+    Memory per upload is bounded by UPLOAD_CHUNK_SIZE. Progress is committed
+    after every chunk, so a dropped connection resumes from session.received.
+    The last chunk is committed together with the finished media, so a
+    session that has every byte is always complete.
+    """
+    if session.status == 'complete':
+        return session
+    if session.status == 'failed':
+        raise UploadFailedError(f"Upload {session.id} failed, start a new one")
+    if start != session.received:
+        raise UploadOffsetError(session.received)
+
+    chunk_size = current_app.config.get('UPLOAD_CHUNK_SIZE', 6 * 1024 * 1024)
+    write = _write_cloudinary if session.storage == 'cloudinary' else _write_local
+
+    for chunk in read_chunks(stream, chunk_size, session.size - session.received):
+        is_last = session.received + len(chunk) == session.size
+        # Cloudinary rejects short parts except the last; the client resends them
+        if session.storage == 'cloudinary' and len(chunk) < chunk_size and not is_last:
+            break
+
+        t0 = time.perf_counter()
+        try:
+            result = write(session, chunk, session.received)
+            CHUNK_DURATION.observe(time.perf_counter() - t0, storage=session.storage)
+        except Exception as e:
+            session.status = 'failed'
+            db.session.commit()
+            raise Exception(f"Error uploading chunk: {str(e)}")
+
+        session.received += len(chunk)
+        if is_last:
+            media = media_from_result(result) if session.storage == 'cloudinary' else _local_media(session)
+            session.result = add_variants(media)
+            session.status = 'complete'
+        db.session.commit()
+
+    return session
+
+def upload_progress(session):
+    return {
+        'upload_id': session.id,
+        'filename': session.filename,
+        'size': session.size,
+        'received': session.received,
+        'status': session.status,
+        'media': session.result
+    }
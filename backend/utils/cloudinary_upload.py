@@ -1,68 +1,216 @@
 import cloudinary
 import cloudinary.uploader
+from flask import current_app
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from utils.media_pipeline import add_variants, media_base_url, media_url, upload_path, VARIANT_WIDTHS
+from utils.metrics import metrics
 import os
+import shutil
+import tempfile
+import time
+import uuid
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp4', 'webm'}
+VIDEO_EXTENSIONS = {'mp4', 'webm'}
+
+# Copies of files handed to upload workers stay in memory up to this size, then go to disk
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+UPLOAD_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+UPLOAD_DURATION = metrics.histogram(
+    'upload_duration_seconds', 'Whole-file media uploads by storage and outcome', UPLOAD_BUCKETS
+)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def upload_to_cloudinary(file, folder="portfolio"):
-    """Upload file to Cloudinary"""
+def clean_folder(folder):
+    """Validate an upload folder ('portfolio' or 'portfolio/projects'), or raise ValueError"""
+    parts = str(folder or '').split('/')
+    if not all(part and secure_filename(part) == part for part in parts):
+        raise ValueError(f"Invalid folder: {folder}")
+    return '/'.join(parts)
+
+def media_from_result(result):
+    """Build our media dict from a Cloudinary upload response"""
+    return {
+        'url': result['secure_url'],
+        'public_id': result['public_id'],
+        'type': result['resource_type'],
+        'format': result['format'],
+        'width': result.get('width'),
+        'height': result.get('height'),
+        'size': result.get('bytes')
+    }
+
+def cloudinary_configured():
+    """Check whether Cloudinary credentials are set"""
+    config = cloudinary.config()
+    return bool(config.cloud_name and config.api_key and config.api_secret)
+
+def store_locally(file, folder="portfolio", base_url=None):
+    """Save file under UPLOAD_FOLDER (used when Cloudinary is not configured)"""
+    folder = clean_folder(folder)
+    filename = f"{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+    relative = f"{folder}/{filename}"
+    path = upload_path(folder, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file.save(path)
+
+    extension = filename.rsplit('.', 1)[1].lower()
+    return {
+        'url': media_url(relative, base_url),
+        'public_id': f'local:{relative}',
+        'type': 'video' if extension in VIDEO_EXTENSIONS else 'image',
+        'format': extension,
+        'width': None,
+        'height': None,
+        'size': os.path.getsize(path)
+    }
+
+def upload_to_cloudinary(file, folder="portfolio", base_url=None):
+    """Upload file to Cloudinary, with responsive image variants (base_url: see media_url)"""
     if not file:
         return None
     
     if not allowed_file(file.filename):
         raise ValueError(f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}")
+    folder = clean_folder(folder)
     
+    storage = 'cloudinary' if cloudinary_configured() else 'local'
+    start = time.perf_counter()
     try:
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
-            file,
-            folder=folder,
-            resource_type="auto",  # Automatically detect image or video
-            transformation={
-                'quality': 'auto:good',
-                'fetch_format': 'auto'
-            }
-        )
-        
-        return {
-            'url': result['secure_url'],
-            'public_id': result['public_id'],
-            'type': result['resource_type'],
-            'format': result['format'],
-            'width': result.get('width'),
-            'height': result.get('height'),
-            'size': result.get('bytes')
-        }
-    except Exception as e:
-        raise Exception(f"Error uploading to Cloudinary: {str(e)}")
+        if storage == 'local':
+            media = add_variants(store_locally(file, folder, base_url), base_url)
+        else:
+            try:
+                # Upload to Cloudinary
+                result = cloudinary.uploader.upload(
+                    file,
+                    folder=folder,
+                    resource_type="auto",  # Automatically detect image or video
+                    transformation={
+                        'quality': 'auto:good',
+                        'fetch_format': 'auto'
+                    }
+                )
+            except Exception as e:
+                raise Exception(f"Error uploading to Cloudinary: {str(e)}")
+            media = add_variants(media_from_result(result))
+    except Exception:
+        UPLOAD_DURATION.observe(time.perf_counter() - start, storage=storage, outcome='error')
+        raise
+
+    UPLOAD_DURATION.observe(time.perf_counter() - start, storage=storage, outcome='ok')
+    return media
 
 def delete_from_cloudinary(public_id):
-    """Delete file from Cloudinary"""
+    """Delete file from Cloudinary (or local storage for 'local:' ids)"""
     try:
+        if public_id.startswith('local:'):
+            relative = public_id[len('local:'):]
+            stem = os.path.splitext(relative)[0]
+            for name in [relative] + [f'{stem}_{variant}.webp' for variant in VARIANT_WIDTHS]:
+                path = upload_path(name)
+                if os.path.exists(path):
+                    os.remove(path)
+            return True
+        
         result = cloudinary.uploader.destroy(public_id)
         return result['result'] == 'ok'
     except Exception as e:
         print(f"Error deleting from Cloudinary: {str(e)}")
         return False
 
-def upload_multiple_files(files, folder="portfolio"):
-    """Upload multiple files to Cloudinary"""
-    uploaded_files = []
-    errors = []
-    
-    for file in files:
+def spooled_copy(file):
+    """Copy an uploaded file into a temp file of our own, which stays open after the request closes its files"""
+    stream = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    file.stream.seek(0)
+    shutil.copyfileobj(file.stream, stream)
+    stream.seek(0)
+    return FileStorage(stream=stream, filename=file.filename, content_type=file.content_type)
+
+def upload_multiple_files(files, folder="portfolio", max_workers=4, timeout=None, uploader=None, deleter=None):
+    """
+    Upload multiple files to Cloudinary in parallel.
+
+    Files are uploaded on a thread pool of at most max_workers threads. Each
+    file fails on its own, results keep the input order, and files still
+    pending after timeout seconds are reported as errors: queued ones are
+    cancelled, and ones already uploading are deleted with deleter(public_id)
+    once they finish, so no asset is left that nothing references.
+    uploader(file, folder) and deleter default to upload_to_cloudinary and
+    delete_from_cloudinary and can be swapped for fakes in tests.
+
+    Workers only get an app context and their own copy of each file: the
+    request (and the files it closes when it ends) may be gone by the time a
+    late upload runs.
+    """
+    folder = clean_folder(folder)
+    uploader = uploader or partial(upload_to_cloudinary, base_url=media_base_url())
+    deleter = deleter or delete_from_cloudinary
+    app = current_app._get_current_object()
+    outcomes = [None] * len(files)
+    futures = {}
+    copies = {}
+
+    def run(file):
+        with app.app_context():
+            try:
+                return uploader(file, folder)
+            finally:
+                file.close()
+
+    def discard_late_upload(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        public_id = future.result()['public_id']
+        with app.app_context():
+            if not deleter(public_id):
+                app.logger.error(f"Could not delete timed-out upload {public_id}")
+
+    # Reject bad files up front; only valid ones take a worker
+    valid = []
+    for index, file in enumerate(files):
+        if file and allowed_file(file.filename):
+            valid.append(index)
+        else:
+            outcomes[index] = ('error', f"Invalid file: {file.filename if file else None}")
+
+    if valid:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(valid))),
+                                      thread_name_prefix='upload')
         try:
-            if file and allowed_file(file.filename):
-                result = upload_to_cloudinary(file, folder)
-                uploaded_files.append(result)
-            else:
-                errors.append(f"Invalid file: {file.filename}")
-        except Exception as e:
-            errors.append(f"Error uploading {file.filename}: {str(e)}")
-    
-    return uploaded_files, errors
\ No newline at end of file
+            for index in valid:
+                copies[index] = spooled_copy(files[index])
+                futures[executor.submit(run, copies[index])] = index
+
+            done, not_done = wait(futures, timeout=timeout)
+
+            for future in done:
+                index = futures[future]
+                try:
+                    outcomes[index] = ('ok', future.result())
+                except Exception as e:
+                    outcomes[index] = ('error', f"Error uploading {files[index].filename}: {str(e)}")
+
+            for future in not_done:
+                index = futures[future]
+                if future.cancel():
+                    copies[index].close()
+                else:
+                    # Already uploading: clean up whatever it creates
+                    future.add_done_callback(discard_late_upload)
+                outcomes[index] = ('error', f"Error uploading {files[index].filename}: timed out after {timeout}s")
+        finally:
+            # Don't hold the request for uploads that already timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    uploaded_files = [value for kind, value in outcomes if kind == 'ok']
+    errors = [value for kind, value in outcomes if kind == 'error']
+
+    return uploaded_files, errors
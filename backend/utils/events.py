@@ -0,0 +1,23 @@
+from collections import defaultdict
+
+# topic -> [handler(topic, **payload)]
+_subscribers = defaultdict(list)
+
+def subscribe(topic, handler):
+    """Call handler whenever topic is published ('*' receives every topic)"""
+    if handler not in _subscribers[topic]:
+        _subscribers[topic].append(handler)
+
+def unsubscribe(topic, handler):
+    if handler in _subscribers[topic]:
+        _subscribers[topic].remove(handler)
+
+def publish(topic, **payload):
+    """
+    Announce that content for a topic changed.
+
+    Topics are table names ('projects', 'skills', 'favorites', 'contacts');
+    write handlers publish after their commit succeeds.
+    """
+    for handler in list(_subscribers[topic]) + list(_subscribers['*']):
+        handler(topic, **payload)
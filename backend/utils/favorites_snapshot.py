@@ -0,0 +1,210 @@
+import bisect
+import json
+import threading
+from datetime import datetime
+from models import Favorite
+from utils.http_cache import advance_version, content_version
+from utils.responses import FastJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib json
+    orjson = None
+
+# Response keys, in the (sorted) order the JSON provider emits them
+CATEGORIES = ('athletes', 'films')
+
+def _dumps(obj):
+    if orjson:
+        return orjson.dumps(obj, option=FastJSONProvider.OPTIONS)
+    return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode()
+
+def category_of(favorite):
+    return 'films' if favorite.category == 'film' else 'athletes'
+
+def tier_of(favorite):
+    return str(favorite.tier or '')
+
+def sort_key(favorite):
+    """Position within a tier: order, then created_at, then id"""
+    try:
+        # Rows written before order was validated may hold anything
+        order = int(favorite.order or 0)
+    except (TypeError, ValueError):
+        order = 0
+    return (order, favorite.created_at or datetime.min, favorite.id)
+
+def serialize(favorite):
+    if favorite.category == 'film':
+        return {
+            'id': favorite.id,
+            'title': favorite.title,
+            'year': favorite.year,
+            'poster': favorite.poster_or_photo,
+            'genre': favorite.genre_or_sport
+        }
+    # Athletes use 'name' instead of 'title'
+    return {
+        'id': favorite.id,
+        'name': favorite.title,
+        'year': favorite.year,
+        'poster': favorite.poster_or_photo,
+        'sport': favorite.genre_or_sport,
+        'achievement': favorite.achievement,
+        'photo': favorite.poster_or_photo
+    }
+
+class FavoritesSnapshot:
+    """
+    The grouped favorites payload (category -> tier -> items), kept as pre-encoded JSON.
+
+    Every item is encoded once; tier lists and the full payload are joined from
+    those bytes and cached until the tier changes. A created favorite patches one
+    tier in place, a deleted one is dropped from its tier. The snapshot also
+    tracks the favorites content version (see utils.http_cache), so a write
+    made by another worker is noticed and triggers a full rebuild.
+    """
+
+    def __init__(self):
+        self._tiers = {}  # (category, tier) -> sorted [sort_key]
+        self._items = {}  # id -> (category, tier, sort_key, encoded item)
+        self._encoded = {}  # (category, tier) / category / None -> joined bytes
+        self._source_version = None
+        self._built = False
+        self.version = 0
+        self._lock = threading.RLock()
+
+    def build(self, source_version=None):
+        """Load and encode every favorite (one query, plus one for the version if not given)"""
+        if source_version is None:
+            source_version = content_version('favorites')
+        favorites = Favorite.query.all()
+
+        with self._lock:
+            self._tiers = {}
+            self._items = {}
+            for favorite in favorites:
+                self._add(favorite)
+            for entries in self._tiers.values():
+                entries.sort()
+            self._encoded = {}
+            self._source_version = source_version
+            self._built = True
+            self.version += 1
+
+    def ensure_current(self, source_version=None):
+        """Build if needed, or rebuild when the database moved past the snapshot"""
+        with self._lock:
+            current = self._built and (source_version is None or source_version == self._source_version)
+        if not current:
+            self.build(source_version)
+
+    def invalidate(self):
+        """Force a full rebuild on next use"""
+        with self._lock:
+            self._built = False
+
+    def source_version(self):
+        """The content version the snapshot was built from, formatted like content_version()"""
+        with self._lock:
+            return self._source_version
+
+    def _advance(self):
+        self._source_version = advance_version('favorites', self._source_version)
+        if self._source_version is None:
+            self._built = False
+
+    def _add(self, favorite, keep_sorted=False):
+        category, tier, key = category_of(favorite), tier_of(favorite), sort_key(favorite)
+        entries = self._tiers.setdefault((category, tier), [])
+        if keep_sorted:
+            bisect.insort(entries, key)
+        else:
+            entries.append(key)
+        self._items[favorite.id] = (category, tier, key, _dumps(serialize(favorite)))
+
+    def _remove(self, favorite_id):
+        entry = self._items.pop(favorite_id, None)
+        if entry is None:
+            return
+        category, tier, key = entry[:3]
+        entries = self._tiers[(category, tier)]
+        entries.remove(key)
+        if not entries:
+            del self._tiers[(category, tier)]
+        self._changed(category, tier)
+
+    def _changed(self, category, tier):
+        for part in ((category, tier), category, None):
+            self._encoded.pop(part, None)
+        self.version += 1
+
+    def update(self, favorite):
+        """Index a created or updated favorite"""
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(favorite.id)
+            self._add(favorite, keep_sorted=True)
+            self._changed(category_of(favorite), tier_of(favorite))
+            self._advance()
+
+    def remove(self, favorite_id):
+        """Drop a deleted favorite from the snapshot"""
+        with self._lock:
+            if self._built:
+                self._remove(favorite_id)
+                self._advance()
+
+    def _tier_bytes(self, category, tier):
+        part = (category, tier)
+        if part not in self._tiers:
+            return b'[]'
+        if part not in self._encoded:
+            items = [self._items[key[-1]][3] for key in self._tiers.get(part, ())]
+            self._encoded[part] = b'[' + b','.join(items) + b']'
+        return self._encoded[part]
+
+    def _category_bytes(self, category):
+        if category not in self._encoded:
+            tiers = sorted(tier for c, tier in self._tiers if c == category)
+            self._encoded[category] = b'{' + b','.join(
+                _dumps(tier) + b':' + self._tier_bytes(category, tier) for tier in tiers
+            ) + b'}'
+        return self._encoded[category]
+
+    def payload(self, category=None, tier=None):
+        """
+        Encoded JSON for the whole grouping, one category ({tier: [items]}),
+        or one tier's item list when both are given.
+        """
+        with self._lock:
+            if category and tier:
+                return self._tier_bytes(category, tier)
+            if category:
+                return self._category_bytes(category)
+            if tier:
+                return b'{' + b','.join(
+                    _dumps(c) + b':{' + _dumps(tier) + b':' + self._tier_bytes(c, tier) + b'}'
+                    for c in CATEGORIES
+                ) + b'}'
+            if None not in self._encoded:
+                self._encoded[None] = b'{' + b','.join(
+                    _dumps(c) + b':' + self._category_bytes(c) for c in CATEGORIES
+                ) + b'}'
+            return self._encoded[None]
+
+    def page(self, category, tier, after=None, limit=20):
+        """
+        Encoded item list for one tier starting after the sort key `after`,
+        plus the sort key of the last item when more remain (else None).
+        """
+        with self._lock:
+            entries = self._tiers.get((category, tier), [])
+            start = bisect.bisect_right(entries, tuple(after)) if after else 0
+            chunk = entries[start:start + limit]
+            items = [self._items[key[-1]][3] for key in chunk]
+            next_key = chunk[-1] if chunk and start + limit < len(entries) else None
+            return b'[' + b','.join(items) + b']', next_key
+
+favorites_snapshot = FavoritesSnapshot()
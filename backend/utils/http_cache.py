@@ -0,0 +1,156 @@
+import hashlib
+from functools import wraps
+from flask import g, request, make_response, current_app
+from sqlalchemy import event, select, update
+from flask_sqlalchemy.session import Session
+from database import db
+from models import ContentVersion
+
+# Tables whose writes bump their row in content_versions
+VERSIONED_TABLES = ('projects', 'skills', 'favorites')
+
+def format_version(table, version):
+    return f"{table}:{version or 0}"
+
+def content_version(*tables):
+    """
+    Version string for the given tables, read from their write counters
+    (one primary-key lookup, however large the tables are).
+    """
+    versions = dict(db.session.execute(
+        select(ContentVersion.table_name, ContentVersion.version)
+        .where(ContentVersion.table_name.in_(tables))
+    ).all())
+    return '|'.join(format_version(table, versions.get(table)) for table in tables)
+
+def committed_version(table):
+    """The version the last commit in this session gave table, or None if it did not write to it"""
+    return db.session.info.get('committed_versions', {}).get(table)
+
+def advance_version(table, current):
+    """
+    The version string an in-process index should hold after applying this
+    session's commit to table: current if the commit did not touch it, the
+    committed version if current was the one right before it, else None (other
+    writes landed in between and the index must be rebuilt).
+    """
+    version = committed_version(table)
+    if version is None:
+        return current
+    if current == format_version(table, version - 1):
+        return format_version(table, version)
+    return None
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_tables(session, flush_context):
+    written = session.info.setdefault('written_tables', set())
+    for obj in list(session.new) + list(session.deleted):
+        written.add(getattr(obj, '__tablename__', None))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            written.add(getattr(obj, '__tablename__', None))
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_executed_tables(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    # Writes that are not content changes (view counts) opt out
+    if not orm_execute_state.execution_options.get('content_change', True):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        orm_execute_state.session.info.setdefault('written_tables', set()).add(mapper.local_table.name)
+
+@event.listens_for(Session, 'before_commit')
+def _bump_versions(session):
+    """Bump the counters of the tables this transaction wrote, inside the same transaction"""
+    session.flush()
+    tables = sorted(session.info.pop('written_tables', set()) & set(VERSIONED_TABLES))
+    session.info['committed_versions'] = {}
+    if not tables:
+        return
+
+    bump = (
+        update(ContentVersion)
+        .where(ContentVersion.table_name.in_(tables))
+        .values(version=ContentVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if session.get_bind().dialect.update_returning:
+        versions = dict(session.execute(bump.returning(ContentVersion.table_name, ContentVersion.version)).all())
+    else:
+        session.execute(bump)
+        versions = dict(session.execute(
+            select(ContentVersion.table_name, ContentVersion.version)
+            .where(ContentVersion.table_name.in_(tables))
+        ).all())
+    missing = [table for table in tables if table not in versions]
+    if missing:
+        session.execute(ContentVersion.__table__.insert(), [{'table_name': t, 'version': 1} for t in missing])
+        versions.update(dict.fromkeys(missing, 1))
+    session.info['committed_versions'] = versions
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_written_tables(session):
+    session.info.pop('written_tables', None)
+
+def make_etag(version):
+    """Strong ETag for this representation: content version plus the exact query"""
+    args = sorted((k, v) for k, values in request.args.lists() for v in values)
+    raw = f"{version}|{request.path}|{args}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:32]
+
+def _apply_cache_headers(response, etag):
+    response.set_etag(etag)
+
+    max_age = current_app.config.get('HTTP_CACHE_MAX_AGE', 0)
+    response.cache_control.public = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        # Let browsers and CDNs store it, but revalidate every time
+        response.cache_control.no_cache = True
+    return response
+
+def _not_modified(etag):
+    # Only the ETag decides: no Last-Modified is sent, since a timestamp
+    # neither moves on deletes nor tells apart writes within one second
+    if not request.if_none_match:
+        return False
+    # Compressed variants carry a suffix on the same ETag
+    return any(
+        tag == etag or tag.startswith(etag + '-')
+        for tag in request.if_none_match.as_set()
+    ) or request.if_none_match.star_tag
+
+def conditional(*tables):
+    """
+    Decorator answering If-None-Match with 304 before the view runs, and
+    adding ETag and Cache-Control to 200s.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+
+            try:
+                version = content_version(*tables)
+            except Exception as e:
+                current_app.logger.error(f"Error computing content version: {str(e)}")
+                return f(*args, **kwargs)
+
+            # Views keeping their own snapshot compare against this instead of querying again
+            g.content_version = version
+            etag = make_etag(version)
+
+            if _not_modified(etag):
+                return _apply_cache_headers(make_response('', 304), etag)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                _apply_cache_headers(response, etag)
+            return response
+
+        return decorated_function
+    return decorator
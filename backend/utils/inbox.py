@@ -0,0 +1,77 @@
+from sqlalchemy import case, func, select, update
+from database import db
+from models import Contact, ContactStatusCount
+
+CONTACT_STATUSES = ('unread', 'read', 'replied')
+
+def adjust_counts(deltas):
+    """
+    Apply {status: delta} to the status counters in one UPDATE ... CASE statement.
+
+    Runs in the caller's transaction, so the counters commit together with the
+    contact rows they describe.
+    """
+    deltas = {status: delta for status, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    db.session.execute(
+        update(ContactStatusCount)
+        .where(ContactStatusCount.status.in_(deltas))
+        .values(count=ContactStatusCount.count + case(deltas, value=ContactStatusCount.status, else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+def status_counts():
+    """{status: count} plus 'total', read from the counters (no scan of contacts)"""
+    counts = dict.fromkeys(CONTACT_STATUSES, 0)
+    counts.update(db.session.query(ContactStatusCount.status, ContactStatusCount.count))
+    counts['total'] = sum(counts.values())
+    return counts
+
+def add_contact(contact):
+    """Stage a new contact message and count it"""
+    contact.status = contact.status or 'unread'
+    db.session.add(contact)
+    adjust_counts({contact.status: 1})
+
+def set_status(ids, status):
+    """
+    Move the given contacts to status; returns how many actually changed.
+
+    One conditional UPDATE per previous status makes each rowcount exact even
+    when another request changes the same rows concurrently, so the counters
+    never drift.
+    """
+    deltas = {}
+    for previous in CONTACT_STATUSES:
+        if previous == status:
+            continue
+        result = db.session.execute(
+            update(Contact)
+            .where(Contact.id.in_(ids), Contact.status == previous)
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            deltas[previous] = -result.rowcount
+            deltas[status] = deltas.get(status, 0) + result.rowcount
+    adjust_counts(deltas)
+    return deltas.get(status, 0)
+
+def recount_statuses(connection=None):
+    """
+    Rebuild the counters with one GROUP BY over contacts.
+
+    For migrations and scripts that insert contacts without add_contact().
+    """
+    connection = connection or db.session.connection()
+    counts = dict.fromkeys(CONTACT_STATUSES, 0)
+    counts.update(connection.execute(
+        select(Contact.status, func.count()).group_by(Contact.status)
+    ).all())
+
+    table = ContactStatusCount.__table__
+    connection.execute(table.delete())
+    connection.execute(table.insert(), [
+        {'status': status, 'count': count} for status, count in counts.items() if status is not None
+    ])
@@ -0,0 +1,195 @@
+import atexit
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from database import db
+from models import Job
+
+# kind -> handler(payload) returning a JSON-serializable result
+_handlers = {}
+# kind -> cleanup(payload) run once a job has failed for good
+_failure_handlers = {}
+
+def job_handler(kind):
+    """Register a function as the handler for a job kind"""
+    def decorator(f):
+        _handlers[kind] = f
+        return f
+    return decorator
+
+def job_failed(kind):
+    """Register a function to run when a job of this kind fails its last attempt"""
+    def decorator(f):
+        _failure_handlers[kind] = f
+        return f
+    return decorator
+
+class JobQueue:
+    """Persistent job queue stored in the jobs table and run by worker threads"""
+
+    def __init__(self):
+        self.app = None
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._next_requeue = 0.0
+        self._requeue_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Start JOBS_WORKERS worker threads for this process"""
+        self.app = app
+        app.extensions['job_queue'] = self
+
+        if not self._threads:
+            for i in range(app.config.get('JOBS_WORKERS', 2)):
+                thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self._threads:
+                atexit.register(self.shutdown)
+
+    def enqueue(self, kind, payload=None, max_attempts=None, delay=0):
+        """Persist a job and wake a worker; returns the Job"""
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(
+            kind=kind,
+            payload=payload or {},
+            status='queued',
+            attempts=0,
+            max_attempts=max_attempts or (self.app.config.get('JOBS_MAX_ATTEMPTS', 5) if self.app else 5),
+            run_at=datetime.utcnow() + timedelta(seconds=delay)
+        )
+        db.session.add(job)
+        db.session.commit()
+        self._wakeup.set()
+        return job
+
+    def _requeue_stale(self, now):
+        """
+        Requeue jobs whose worker died mid-run.
+
+        Checked at most every JOBS_LOCK_TIMEOUT / 2 seconds per process, and
+        only written when a stale job exists, so idle polling never takes the
+        write lock.
+        """
+        lock_timeout = self.app.config.get('JOBS_LOCK_TIMEOUT', 600)
+        with self._requeue_lock:
+            if time.monotonic() < self._next_requeue:
+                return
+            self._next_requeue = time.monotonic() + lock_timeout / 2
+
+        stale = now - timedelta(seconds=lock_timeout)
+        stale_ids = [job_id for (job_id,) in db.session.query(Job.id).filter(
+            Job.status == 'running', Job.locked_at < stale
+        )]
+        if not stale_ids:
+            return
+        db.session.execute(
+            update(Job)
+            .where(Job.id.in_(stale_ids), Job.status == 'running', Job.locked_at < stale)
+            .values(status='queued')
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    def _claim(self):
+        """Atomically move one due job from queued to running (safe across processes)"""
+        now = datetime.utcnow()
+        self._requeue_stale(now)
+
+        candidates = db.session.query(Job.id).filter(
+            Job.status == 'queued', Job.run_at <= now
+        ).order_by(Job.run_at, Job.id).limit(5).all()
+
+        for (job_id,) in candidates:
+            claimed = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == 'queued')
+                .values(status='running', locked_at=now, attempts=Job.attempts + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return db.session.get(Job, job_id)
+
+        return None
+
+    def _backoff(self, attempts):
+        """Exponential backoff with jitter, capped"""
+        base = self.app.config.get('JOBS_BACKOFF_BASE', 2.0)
+        delay = min(base * (2 ** (attempts - 1)), self.app.config.get('JOBS_BACKOFF_MAX', 600))
+        return delay * random.uniform(0.8, 1.2)
+
+    def run_one(self):
+        """Run the next due job, if any; returns the job or None"""
+        job = self._claim()
+        if job is None:
+            return None
+
+        try:
+            result = _handlers[job.kind](job.payload or {})
+            job.status = 'done'
+            job.result = result
+            job.last_error = None
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job.id)
+            job.last_error = str(e)
+            if job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                self._cleanup_failed(job)
+            else:
+                job.status = 'queued'
+                job.run_at = datetime.utcnow() + timedelta(seconds=self._backoff(job.attempts))
+            self.app.logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {str(e)}")
+
+        job.locked_at = None
+        db.session.commit()
+        return job
+
+    def _cleanup_failed(self, job):
+        cleanup = _failure_handlers.get(job.kind)
+        if cleanup is None:
+            return
+        try:
+            cleanup(job.payload or {})
+        except Exception as e:
+            self.app.logger.error(f"Cleanup for failed job {job.id} ({job.kind}) failed: {str(e)}")
+
+    def shutdown(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _run(self):
+        poll_interval = self.app.config.get('JOBS_POLL_INTERVAL', 1.0)
+        while not self._stopped.is_set():
+            try:
+                with self.app.app_context():
+                    job = self.run_one()
+            except Exception as e:
+                self.app.logger.error(f"Job worker error: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(poll_interval)
+                self._wakeup.clear()
+
+def job_status(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'last_error': job.last_error,
+        'result': job.result,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'updated_at': job.updated_at.isoformat() if job.updated_at else None
+    }
+
+job_queue = JobQueue()
+enqueue = job_queue.enqueue
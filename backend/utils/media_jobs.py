@@ -0,0 +1,51 @@
+import os
+from flask import current_app
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+import uuid
+from utils.jobs import job_handler, job_failed, enqueue
+from utils.media_pipeline import media_base_url
+from utils.cloudinary_upload import (upload_to_cloudinary, delete_from_cloudinary, allowed_file, clean_folder,
+                                     ALLOWED_EXTENSIONS)
+
+def enqueue_upload(file, folder='portfolio'):
+    """Spool an uploaded file to disk and queue its upload; returns the Job"""
+    if not file or not allowed_file(file.filename):
+        raise ValueError(f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}")
+    folder = clean_folder(folder)
+
+    spool = current_app.config['JOBS_SPOOL_FOLDER']
+    os.makedirs(spool, exist_ok=True)
+    filename = secure_filename(file.filename)
+    path = os.path.join(spool, f'{uuid.uuid4().hex}_{filename}')
+    file.save(path)
+
+    # Workers have no request to take the host from
+    return enqueue('upload_media', {'path': path, 'filename': filename, 'folder': folder,
+                                    'base_url': media_base_url()})
+
+def enqueue_media_deletes(media):
+    """Queue deletion of every stored asset in a media list"""
+    return [enqueue('delete_media', {'public_id': item['public_id']})
+            for item in media or [] if item.get('public_id')]
+
+@job_handler('upload_media')
+def run_upload(payload):
+    path = payload['path']
+    with open(path, 'rb') as stream:
+        result = upload_to_cloudinary(FileStorage(stream=stream, filename=payload['filename']),
+                                      payload.get('folder', 'portfolio'), payload.get('base_url'))
+    os.remove(path)
+    return result
+
+@job_failed('upload_media')
+def discard_spooled_upload(payload):
+    # No retry will read it again
+    if os.path.exists(payload['path']):
+        os.remove(payload['path'])
+
+@job_handler('delete_media')
+def run_delete(payload):
+    if not delete_from_cloudinary(payload['public_id']):
+        raise RuntimeError(f"Could not delete {payload['public_id']}")
+    return {'deleted': payload['public_id']}
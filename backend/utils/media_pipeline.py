@@ -0,0 +1,141 @@
+import base64
+import io
+import os
+from flask import current_app, request, has_request_context
+from werkzeug.utils import safe_join
+
+try:
+    from PIL import Image
+except ImportError:  # no local derivatives without Pillow
+    Image = None
+
+# Variant name -> maximum width in pixels
+VARIANT_WIDTHS = {
+    'thumb': 320,
+    'card': 640,
+    'hero': 1600
+}
+PLACEHOLDER_WIDTH = 16
+
+def upload_path(*parts):
+    """Absolute path of parts under UPLOAD_FOLDER, or raise ValueError if they point outside it"""
+    path = safe_join(current_app.config['UPLOAD_FOLDER'], *parts)
+    if path is None:
+        raise ValueError(f"Invalid upload path: {'/'.join(parts)}")
+    return path
+
+def media_base_url():
+    """Origin local media is served from: MEDIA_BASE_URL, else the current request's host ('' outside one)"""
+    base_url = current_app.config.get('MEDIA_BASE_URL')
+    if not base_url and has_request_context():
+        base_url = request.host_url
+    return (base_url or '').rstrip('/')
+
+def media_url(relative, base_url=None):
+    """URL of a file under UPLOAD_FOLDER; just the /api/media/... path when no base URL is known"""
+    path = current_app.url_map.bind('').build('public.get_media', {'filename': relative})
+    return (media_base_url() if base_url is None else base_url.rstrip('/')) + path
+
+def _scaled(width, height, max_width):
+    """Dimensions after limiting to max_width (never upscaled)"""
+    if not width or not height:
+        return (max_width, None)
+    if width <= max_width:
+        return (width, height)
+    return (max_width, round(height * max_width / width))
+
+def _cloudinary_url(url, transformation):
+    return url.replace('/upload/', f'/upload/{transformation}/', 1)
+
+def cloudinary_variants(media):
+    """Derive width-limited delivery URLs from a Cloudinary URL (no extra uploads)"""
+    url = media.get('url') or ''
+    if '/upload/' not in url:
+        return None
+
+    variants = {}
+    for name, max_width in VARIANT_WIDTHS.items():
+        width, height = _scaled(media.get('width'), media.get('height'), max_width)
+        variants[name] = {
+            'url': _cloudinary_url(url, f'w_{max_width},c_limit,q_auto,f_auto'),
+            'width': width,
+            'height': height
+        }
+    placeholder = _cloudinary_url(url, f'w_{PLACEHOLDER_WIDTH},e_blur:200,q_30,f_auto')
+    return variants, placeholder
+
+def local_variants(path, relative, base_url=None):
+    """Write resized WebP copies next to a locally stored image with Pillow"""
+    if Image is None:
+        return None
+
+    with Image.open(path) as image:
+        image.load()
+        original = image.convert('RGB')
+
+    stem = os.path.splitext(relative)[0]
+    variants = {}
+
+    for name, max_width in VARIANT_WIDTHS.items():
+        width, height = _scaled(original.width, original.height, max_width)
+        variant_relative = f'{stem}_{name}.webp'
+        resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+        resized.save(upload_path(variant_relative), 'WEBP', quality=80)
+        variants[name] = {
+            'url': media_url(variant_relative, base_url),
+            'width': width,
+            'height': height
+        }
+
+    # Tiny blurred preview inlined as a data URI
+    width, height = _scaled(original.width, original.height, PLACEHOLDER_WIDTH)
+    buffer = io.BytesIO()
+    original.resize((width, max(height or 1, 1))).save(buffer, 'JPEG', quality=40)
+    placeholder = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+    return variants, placeholder, (original.width, original.height)
+
+def add_variants(media, base_url=None):
+    """Attach responsive variants, dimensions and a placeholder to an image media dict"""
+    if not media or media.get('type') not in (None, 'image'):
+        return media
+
+    public_id = media.get('public_id') or ''
+    if public_id.startswith('local:'):
+        relative = public_id[len('local:'):]
+        try:
+            generated = local_variants(upload_path(relative), relative, base_url)
+        except Exception as e:
+            current_app.logger.warning(f"Could not generate variants for {relative}: {str(e)}")
+            generated = None
+        if generated:
+            media['variants'], media['placeholder'], (media['width'], media['height']) = generated
+        return media
+
+    derived = cloudinary_variants(media)
+    if derived:
+        media['variants'], media['placeholder'] = derived
+    return media
+
+def responsive_image(media):
+    """srcset data for a media item; Cloudinary variants are derived on the fly if not stored"""
+    if not media or not media.get('url'):
+        return None
+
+    variants = media.get('variants')
+    placeholder = media.get('placeholder')
+    if not variants and media.get('type') in (None, 'image'):
+        derived = cloudinary_variants(media)
+        if derived:
+            variants, placeholder = derived
+
+    by_width = {v['width']: v['url'] for v in (variants or {}).values() if v.get('width')}
+    srcset = ', '.join(f"{url} {width}w" for width, url in sorted(by_width.items()))
+    return {
+        'src': (variants or {}).get('card', {}).get('url', media['url']),
+        'srcset': srcset,
+        'sizes': '(max-width: 640px) 100vw, 640px',
+        'width': media.get('width'),
+        'height': media.get('height'),
+        'placeholder': placeholder
+    }
@@ -0,0 +1,254 @@
+import math
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Thread-safe monotonically increasing count, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self, **labels):
+        with self._lock:
+            return {'count': self._values.get(_label_key(labels), 0)}
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+class Gauge:
+    """Current value read from a callback when metrics are rendered"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, description, callback):
+        self.name = name
+        self.description = description
+        self.callback = callback
+
+    def snapshot(self):
+        return {'value': self.callback()}
+
+    def samples(self):
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        return [] if value is None else [(self.name, (), value)]
+
+class Histogram:
+    """Thread-safe histogram of observed values with cumulative buckets, optionally split by labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, description, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'counts': [0] * len(self.buckets), 'count': 0, 'sum': 0.0, 'max': 0.0
+                }
+            series['count'] += 1
+            series['sum'] += value
+            series['max'] = max(series['max'], value)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+
+    def _cumulative(self, series):
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, series['counts']):
+            running += count
+            cumulative[bound] = running
+        return cumulative
+
+    def snapshot(self, **labels):
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            if series is None:
+                return {'count': 0, 'sum': 0.0, 'avg': 0.0, 'max': 0.0, 'buckets': {}}
+            return {
+                'count': series['count'],
+                'sum': series['sum'],
+                'avg': series['sum'] / series['count'],
+                'max': series['max'],
+                'buckets': self._cumulative(series)
+            }
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, series in self._series.items():
+                for bound, count in self._cumulative(series).items():
+                    samples.append((f'{self.name}_bucket', key, count, (('le', _format_value(float(bound))),)))
+                samples.append((f'{self.name}_bucket', key, series['count'], (('le', '+Inf'),)))
+                samples.append((f'{self.name}_sum', key, series['sum']))
+                samples.append((f'{self.name}_count', key, series['count']))
+        return samples
+
+class Registry:
+    """Process-wide collection of named metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name, description):
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name, description, callback):
+        return self._get_or_create(Gauge, name, description, callback)
+
+    def histogram(self, name, description, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, description, buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for sample in metric.samples():
+                name, key, value = sample[:3]
+                extra = sample[3] if len(sample) > 3 else ()
+                lines.append(f'{name}{_format_labels(key, extra)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Registry()
+
+REQUEST_DURATION = metrics.histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint'
+)
+REQUESTS = metrics.counter(
+    'http_requests_total', 'Requests by endpoint, method and status'
+)
+REQUEST_DB_QUERIES = metrics.histogram(
+    'http_request_db_queries', 'Database queries issued per request by endpoint', COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = metrics.histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request by endpoint'
+)
+DB_QUERY_DURATION = metrics.histogram(
+    'db_query_duration_seconds', 'Duration of individual database statements'
+)
+
+# listener(statement, parameters, seconds) run after every statement
+_query_listeners = []
+
+def on_query(listener):
+    """Register a listener on the shared statement timer (so each statement is timed once)"""
+    if listener not in _query_listeners:
+        _query_listeners.append(listener)
+    return listener
+
+def _endpoint():
+    # Unmatched URLs share one label so scanners cannot blow up cardinality
+    return request.endpoint or 'unmatched'
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    if has_request_context() and 'request_start' in g:
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_duration = g.get('db_duration', 0.0) + elapsed
+    for listener in _query_listeners:
+        listener(statement, parameters, elapsed)
+
+@event.listens_for(Engine, 'handle_error')
+def _query_failed(context):
+    starts = context.connection.info.get('query_start') if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+def init_app(app):
+    """Time every request and its database work (register before other request hooks)"""
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        g.db_queries = 0
+        g.db_duration = 0.0
+
+    @app.after_request
+    def record_request(response):
+        start = g.get('request_start')
+        if start is None:
+            return response
+
+        endpoint = _endpoint()
+        REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+        REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        REQUEST_DB_QUERIES.observe(g.db_queries, endpoint=endpoint)
+        REQUEST_DB_DURATION.observe(g.db_duration, endpoint=endpoint)
+        return response
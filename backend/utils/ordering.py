@@ -0,0 +1,27 @@
+from sqlalchemy import case, update
+from database import db
+
+class ReorderError(ValueError):
+    """The requested ordering does not match the rows in the table"""
+
+def reorder(model, ids, start=0):
+    """
+    Give the rows in ids consecutive `order` values (start, start + 1, ...)
+    in one UPDATE ... SET order = CASE id WHEN ... END statement.
+
+    Runs in the session's transaction; raises ReorderError if any id does
+    not exist, leaving the caller to roll back. updated_at is left alone (a
+    new position is not an edit); the commit still bumps the table's content
+    version, which is what ETags and the in-process indexes follow.
+    """
+    positions = {row_id: start + i for i, row_id in enumerate(ids)}
+    result = db.session.execute(
+        update(model)
+        .where(model.id.in_(ids))
+        # Keep updated_at, which its onupdate default would otherwise stamp on every row
+        .values(order=case(positions, value=model.id), updated_at=model.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(ids):
+        raise ReorderError(f"{len(ids) - result.rowcount} of the ids do not exist")
+    return result.rowcount
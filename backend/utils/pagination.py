@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+def encode_cursor(values):
+    """Encode the sort-key values of the last row into an opaque cursor"""
+    payload = [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor back into sort-key values; raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(payload, list):
+        raise ValueError('Invalid cursor')
+
+    return [datetime.fromisoformat(v['dt']) if isinstance(v, dict) and 'dt' in v else v
+            for v in payload]
+
+def keyset_filter(keys, values):
+    """
+    Build the "rows after this one" predicate for a keyset.
+
+    keys is a list of (column_expression, descending) in ORDER BY order, values
+    the matching values of the last row already returned.
+    """
+    if len(keys) != len(values):
+        raise ValueError('Invalid cursor')
+
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+def order_by_keys(keys):
+    return [column.desc() if descending else column.asc() for column, descending in keys]
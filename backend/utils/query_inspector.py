@@ -0,0 +1,101 @@
+import threading
+from collections import Counter
+from flask import g, request
+from utils.metrics import on_query
+
+_local = threading.local()
+
+def _active():
+    if not hasattr(_local, 'recorders'):
+        _local.recorders = []
+    return _local.recorders
+
+class QueryRecorder:
+    """Collects the SQL statements executed on this thread while it is active"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        _active().append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def stop(self):
+        recorders = _active()
+        if self in recorders:
+            recorders.remove(self)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for _, _, duration in self.queries)
+
+    def duplicates(self):
+        """Statements executed more than once (the shape of an N+1 loop)"""
+        counts = Counter(statement for statement, _, _ in self.queries)
+        return {statement: n for statement, n in counts.items() if n > 1}
+
+    def slow(self, threshold_ms):
+        return [(statement, duration) for statement, _, duration in self.queries
+                if duration * 1000 >= threshold_ms]
+
+    def report(self):
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f}ms"]
+        duplicates = self.duplicates()
+        for i, (statement, _, duration) in enumerate(self.queries, 1):
+            repeated = f" (x{duplicates[statement]})" if statement in duplicates else ''
+            lines.append(f"  {i}. [{duration * 1000:.1f}ms]{repeated} {' '.join(statement.split())}")
+        return '\n'.join(lines)
+
+@on_query
+def _record(statement, parameters, duration):
+    # Timed by the metrics listeners; recorders only collect
+    for recorder in _active():
+        recorder.queries.append((statement, parameters, duration))
+
+def init_app(app):
+    """Log duplicate and slow queries per request (enable with QUERY_INSPECTOR)"""
+    if not app.config.get('QUERY_INSPECTOR'):
+        return
+
+    slow_ms = app.config.get('QUERY_SLOW_MS', 100)
+
+    @app.before_request
+    def start_recording():
+        g.query_recorder = QueryRecorder().__enter__()
+
+    @app.after_request
+    def report_queries(response):
+        recorder = g.pop('query_recorder', None)
+        if recorder is None:
+            return response
+        recorder.stop()
+
+        response.headers['X-Query-Count'] = str(recorder.count)
+        response.headers['X-Query-Time'] = f'{recorder.duration * 1000:.1f}ms'
+
+        duplicates = recorder.duplicates()
+        if duplicates:
+            app.logger.warning(
+                f"{request.method} {request.path}: {len(duplicates)} statements repeated "
+                f"(possible N+1)\n{recorder.report()}"
+            )
+        for statement, duration in recorder.slow(slow_ms):
+            app.logger.warning(
+                f"{request.method} {request.path}: slow query {duration * 1000:.1f}ms: {' '.join(statement.split())}"
+            )
+        return response
+
+    @app.teardown_request
+    def stop_recording(error=None):
+        # after_request is skipped when a view raises
+        recorder = g.pop('query_recorder', None)
+        if recorder is not None:
+            recorder.stop()
@@ -0,0 +1,238 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify, current_app
+from utils.metrics import metrics
+
+RATE_LIMITED = metrics.counter('rate_limited_requests_total', 'Requests rejected by the rate limiter by endpoint')
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+def parse_limit(value):
+    """'5/minute' -> (refill rate per second, bucket capacity); None or 'none' disables the limit"""
+    if not value or str(value).lower() == 'none':
+        return None
+    try:
+        count, period = str(value).split('/')
+        count = int(count)
+        seconds = PERIODS[period.strip().lower().rstrip('s')]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit {value!r}; expected e.g. '5/minute'")
+    return count / seconds, count
+
+class MemoryBackend:
+    """
+    Token buckets held in this process (each worker limits on its own).
+
+    Least recently used buckets beyond max_keys are dropped; an evicted
+    bucket simply starts full again.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._seen = OrderedDict()  # key -> expires_at
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity, cost=1):
+        """Spend cost tokens; returns (allowed, seconds until enough tokens refill)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0 if allowed else (cost - tokens) / rate
+
+    def add_once(self, key, ttl):
+        """Remember key for ttl seconds; False if it was already remembered"""
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._seen.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._seen.pop(key, None)
+            self._seen[key] = now + ttl
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        return True
+
+    def discard(self, key):
+        """Forget a key remembered by add_once"""
+        with self._lock:
+            self._seen.pop(key, None)
+
+class RedisBackend:
+    """Token buckets in Redis, shared by every worker (one atomic script call per request)"""
+
+    TAKE_SCRIPT = """
+    local rate, capacity, now, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed, retry = 0, 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    else
+        retry = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(retry)}
+    """
+
+    def __init__(self, client, prefix='portfolio:ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(self.TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """Connect to url; raises if Redis is not reachable (from_url alone never connects)"""
+        import redis
+        client = redis.Redis.from_url(url)
+        client.ping()
+        return cls(client, **kwargs)
+
+    def take(self, key, rate, capacity, cost=1):
+        allowed, retry = self._take(keys=[self.prefix + key], args=[rate, capacity, time.time(), cost])
+        return bool(allowed), float(retry)
+
+    def add_once(self, key, ttl):
+        return bool(self.client.set(self.prefix + 'seen:' + key, 1, nx=True, ex=max(int(ttl), 1)))
+
+    def discard(self, key):
+        self.client.delete(self.prefix + 'seen:' + key)
+
+class NullBackend:
+    """Never limits anything (RATE_LIMIT_BACKEND=none)"""
+
+    def take(self, key, rate, capacity, cost=1):
+        return True, 0
+
+    def add_once(self, key, ttl):
+        return True
+
+    def discard(self, key):
+        pass
+
+class RateLimiter:
+    """
+    Per-client, per-route token bucket limits for write endpoints.
+
+    When the backend fails (e.g. Redis goes away), each process keeps
+    limiting on its own until it is back, rather than dropping the limits.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self.fallback = MemoryBackend()
+        self._config_keys = set()
+
+    def init_app(self, app):
+        """Pick the backend from config and check the configured limits (after blueprints are registered)"""
+        for key in self._config_keys:
+            parse_limit(app.config.get(key))
+
+        kind = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+
+        if kind == 'none':
+            self.backend = NullBackend()
+        elif kind == 'redis':
+            try:
+                self.backend = RedisBackend.from_url(app.config['RATE_LIMIT_REDIS_URL'])
+            except Exception as e:
+                app.logger.warning(f"Redis rate limiter unavailable, limiting per process: {str(e)}")
+                self.backend = MemoryBackend()
+        else:
+            self.backend = MemoryBackend()
+
+        app.extensions['rate_limiter'] = self
+
+    @staticmethod
+    def client_ip():
+        """
+        The client address, read from X-Forwarded-For when the app runs
+        behind RATE_LIMIT_TRUSTED_PROXIES proxies (the header is otherwise
+        client-controlled and ignored).
+        """
+        hops = current_app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+        forwarded = request.headers.get('X-Forwarded-For')
+        if hops and forwarded:
+            addresses = [address.strip() for address in forwarded.split(',')]
+            return addresses[-min(hops, len(addresses))]
+        return request.remote_addr or 'unknown'
+
+    def limit(self, config_key):
+        """Decorator applying the limit configured under config_key (e.g. '5/minute') per client IP"""
+        self._config_keys.add(config_key)
+
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                limit = parse_limit(current_app.config.get(config_key))
+                if limit is None:
+                    return f(*args, **kwargs)
+                rate, capacity = limit
+
+                key = f"{request.endpoint}:{self.client_ip()}"
+                try:
+                    allowed, retry_after = self.backend.take(key, rate, capacity)
+                except Exception as e:
+                    current_app.logger.error(f"Error checking rate limit, limiting per process: {str(e)}")
+                    allowed, retry_after = self.fallback.take(key, rate, capacity)
+
+                if not allowed:
+                    RATE_LIMITED.inc(endpoint=request.endpoint)
+                    response = jsonify({'error': 'Too many requests, please try again later'})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(max(math.ceil(retry_after), 1))
+                    return response
+
+                return f(*args, **kwargs)
+
+            return decorated_function
+        return decorator
+
+    @staticmethod
+    def _duplicate_key(parts):
+        # Normalized (case and whitespace) and hashed, so the backend never stores the text
+        normalized = '\0'.join(' '.join(str(part).lower().split()) for part in parts)
+        return 'dup:' + hashlib.sha1(normalized.encode()).hexdigest()
+
+    def is_duplicate(self, *parts, window):
+        """
+        True if the same parts were submitted within the last window seconds.
+
+        The submission is remembered right away, so concurrent resubmits see
+        it; call forget_submission() if it is not stored after all.
+        """
+        if not window:
+            return False
+        key = self._duplicate_key(parts)
+        try:
+            return not self.backend.add_once(key, window)
+        except Exception as e:
+            current_app.logger.error(f"Error checking duplicate submission: {str(e)}")
+            return not self.fallback.add_once(key, window)
+
+    def forget_submission(self, *parts):
+        """Undo is_duplicate() for a submission that failed, so a retry goes through"""
+        key = self._duplicate_key(parts)
+        for backend in (self.backend, self.fallback):
+            try:
+                backend.discard(key)
+            except Exception as e:
+                current_app.logger.error(f"Error forgetting submission: {str(e)}")
+
+rate_limiter = RateLimiter()
+rate_limit = rate_limiter.limit
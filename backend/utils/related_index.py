@@ -0,0 +1,130 @@
+import heapq
+import threading
+from collections import defaultdict
+from models import Project
+from utils.http_cache import advance_version, content_version
+
+TAG_WEIGHT = 2
+TECHNOLOGY_WEIGHT = 1
+
+class RelatedIndex:
+    """
+    Inverted index of tag/technology -> project ids for related-project lookups.
+
+    Like the favorites snapshot it tracks the projects content version, so
+    edits served by another worker trigger a rebuild here.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(set)  # (kind, term) -> {project_id}
+        self._docs = {}  # project_id -> {(kind, term)}
+        self._slugs = {}  # slug -> project_id
+        self._slug_of = {}  # project_id -> slug
+        self._source_version = None
+        self._built = False
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _terms(tags, technologies):
+        terms = set()
+        for tag in tags or []:
+            terms.add(('tag', tag))
+        for tech in technologies or []:
+            terms.add(('tech', tech))
+        return terms
+
+    def build(self, source_version=None):
+        """Load terms for every project (one narrow query, plus one for the version if not given)"""
+        if source_version is None:
+            source_version = content_version('projects')
+        rows = Project.query.with_entities(
+            Project.id, Project.slug, Project.tags, Project.technologies
+        ).all()
+
+        with self._lock:
+            self._postings = defaultdict(set)
+            self._docs = {}
+            self._slugs = {}
+            self._slug_of = {}
+            for project_id, slug, tags, technologies in rows:
+                self._add(project_id, slug, self._terms(tags, technologies))
+            self._source_version = source_version
+            self._built = True
+
+    def ensure_built(self):
+        if not self._built:
+            self.build()
+
+    def ensure_current(self, source_version=None):
+        """Build if needed, or rebuild when the database moved past the index"""
+        with self._lock:
+            current = self._built and (source_version is None or source_version == self._source_version)
+        if not current:
+            self.build(source_version)
+
+    def invalidate(self):
+        """Force a full rebuild on next use"""
+        with self._lock:
+            self._built = False
+
+    def _add(self, project_id, slug, terms):
+        self._docs[project_id] = terms
+        self._slugs[slug] = project_id
+        self._slug_of[project_id] = slug
+        for term in terms:
+            self._postings[term].add(project_id)
+
+    def _remove(self, project_id):
+        terms = self._docs.pop(project_id, set())
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(project_id)
+                if not postings:
+                    del self._postings[term]
+        slug = self._slug_of.pop(project_id, None)
+        if slug is not None and self._slugs.get(slug) == project_id:
+            del self._slugs[slug]
+
+    def update(self, project):
+        """Index a created or updated project"""
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(project.id)
+            self._add(project.id, project.slug, self._terms(project.tags, project.technologies))
+            self._advance()
+
+    def remove(self, project_id):
+        """Drop a deleted project from the index"""
+        with self._lock:
+            if self._built:
+                self._remove(project_id)
+                self._advance()
+
+    def _advance(self):
+        self._source_version = advance_version('projects', self._source_version)
+        if self._source_version is None:
+            self._built = False
+
+    def related(self, slug, limit=3):
+        """Get [(project_id, score)] for the top related projects, or None if slug is unknown"""
+        self.ensure_built()
+
+        with self._lock:
+            project_id = self._slugs.get(slug)
+            if project_id is None:
+                return None
+
+            # Only projects sharing at least one term are ever scored
+            scores = defaultdict(int)
+            for term in self._docs.get(project_id, ()):
+                weight = TAG_WEIGHT if term[0] == 'tag' else TECHNOLOGY_WEIGHT
+                for candidate in self._postings.get(term, ()):
+                    if candidate != project_id:
+                        scores[candidate] += weight
+
+        # Highest score first, lower id wins ties
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+related_index = RelatedIndex()
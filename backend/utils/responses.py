@@ -0,0 +1,109 @@
+import gzip
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib json via DefaultJSONProvider
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider using orjson when installed, falling back to the stdlib encoder"""
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('indent'):
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+def negotiate_encoding():
+    """Pick the best content coding the client accepts ('br', 'gzip' or None)"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def compress(data, encoding, level=6):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def is_compressible(response, min_size):
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and 'Content-Encoding' not in response.headers
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and (response.content_length or 0) >= min_size
+    )
+
+def mark_encoded(response, encoding):
+    """Set Content-Encoding/Vary and give the compressed representation its own ETag"""
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    if etag and not etag.endswith('-' + encoding):
+        response.set_etag(f'{etag}-{encoding}', weak=weak)
+
+def init_app(app):
+    """Install the fast JSON provider and response compression"""
+    app.json = FastJSONProvider(app)
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+    level = app.config.get('COMPRESS_LEVEL', 6)
+
+    @app.after_request
+    def compress_response(response):
+        encoding = negotiate_encoding()
+
+        if response.status_code == 304:
+            # Echo the ETag of the representation the client holds: only a body
+            # that was big enough to compress got the encoding suffix on its 200
+            etag, weak = response.get_etag()
+            if encoding and etag and not etag.endswith('-' + encoding):
+                if f'{etag}-{encoding}' in request.if_none_match:
+                    response.set_etag(f'{etag}-{encoding}', weak=weak)
+            return response
+
+        if 'Content-Encoding' in response.headers:
+            # Already compressed (e.g. served from the response cache)
+            mark_encoded(response, response.headers['Content-Encoding'])
+            return response
+
+        if response.mimetype in COMPRESSIBLE_MIMETYPES:
+            response.vary.add('Accept-Encoding')
+
+        if encoding and is_compressible(response, min_size):
+            response.set_data(compress(response.get_data(), encoding, level))
+            mark_encoded(response, encoding)
+
+        return response
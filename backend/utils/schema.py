@@ -0,0 +1,142 @@
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.schema import CreateIndex
+from database import db
+
+MIGRATIONS_PACKAGE = 'migrations'
+
+# Arbitrary key for pg_advisory_lock so concurrent deploys migrate one at a time
+MIGRATION_LOCK_ID = 7240311
+
+# Kept out of db.metadata so the baseline create_all never touches it
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
+
+_migrations = None
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is behind the migrations shipped with this code"""
+
+def load_migrations():
+    """Migration modules in migrations/ as (version, name, module), ordered by NNNN_ prefix"""
+    global _migrations
+    if _migrations is None:
+        package = importlib.import_module(MIGRATIONS_PACKAGE)
+        found = []
+        for info in pkgutil.iter_modules(package.__path__):
+            match = re.match(r'(\d+)_\w+$', info.name)
+            if match:
+                module = importlib.import_module(f'{MIGRATIONS_PACKAGE}.{info.name}')
+                found.append((int(match.group(1)), info.name, module))
+        found.sort(key=lambda m: m[0])
+
+        versions = [version for version, _, _ in found]
+        if len(set(versions)) != len(versions):
+            raise RuntimeError(f"Duplicate migration versions in {MIGRATIONS_PACKAGE}/")
+        _migrations = found
+    return _migrations
+
+def head_version():
+    """Version of the newest migration shipped with this code"""
+    migrations = load_migrations()
+    return migrations[-1][0] if migrations else 0
+
+def current_version(connection):
+    """Version recorded in the database (0 if it was never migrated)"""
+    if not inspect(connection).has_table('schema_migrations'):
+        return 0
+    return connection.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+
+def check_schema(engine=None):
+    """Fail fast if the database schema is behind this code (reads one row, runs no DDL)"""
+    engine = engine or db.engine
+    with engine.connect() as connection:
+        current = current_version(connection)
+
+    head = head_version()
+    if current < head:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {current} but this code needs {head}; "
+            f"run `python migrate.py` first"
+        )
+    # current > head is fine: migrations stay backwards compatible for rolling deploys
+    return current
+
+def status(engine=None):
+    """Get [(version, name, applied)] for every migration"""
+    engine = engine or db.engine
+    with engine.connect() as connection:
+        current = current_version(connection)
+    return [(version, name, version <= current) for version, name, _ in load_migrations()]
+
+def upgrade(engine=None, target=None, log=None):
+    """Apply pending migrations up to target (default: all); returns the names applied"""
+    engine = engine or db.engine
+    applied = []
+
+    with engine.connect() as lock:
+        if lock.dialect.name == 'postgresql':
+            lock.execute(text('SELECT pg_advisory_lock(:id)'), {'id': MIGRATION_LOCK_ID})
+        try:
+            schema_migrations.create(lock, checkfirst=True)
+            lock.commit()
+
+            for version, name, module in load_migrations():
+                if target is not None and version > target:
+                    break
+                with engine.connect() as connection:
+                    if version <= current_version(connection):
+                        continue
+
+                if log:
+                    log(f"Applying {name}")
+                if getattr(module, 'transactional', True):
+                    with engine.begin() as connection:
+                        module.upgrade(connection)
+                        _record(connection, version, name)
+                else:
+                    # e.g. CREATE INDEX CONCURRENTLY, which cannot run inside a transaction
+                    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                        module.upgrade(connection)
+                        _record(connection, version, name)
+                applied.append(name)
+        finally:
+            if lock.dialect.name == 'postgresql':
+                lock.execute(text('SELECT pg_advisory_unlock(:id)'), {'id': MIGRATION_LOCK_ID})
+                lock.commit()
+
+    return applied
+
+def _record(connection, version, name):
+    connection.execute(schema_migrations.insert().values(
+        version=version, name=name, applied_at=datetime.utcnow()
+    ))
+
+# Helpers for migration modules. Steps check before changing anything so a
+# migration interrupted on a database without transactional DDL can be rerun.
+
+def has_column(connection, table_name, column_name):
+    return any(c['name'] == column_name for c in inspect(connection).get_columns(table_name))
+
+def add_column(connection, column):
+    """ALTER TABLE ... ADD COLUMN for a model column if the table lacks it"""
+    table_name = column.table.name
+    if has_column(connection, table_name, column.name):
+        return False
+    column_type = column.type.compile(dialect=connection.dialect)
+    connection.exec_driver_sql(f'ALTER TABLE {table_name} ADD COLUMN "{column.name}" {column_type}')
+    return True
+
+def create_index(connection, index):
+    """Create a model index if missing; built CONCURRENTLY on Postgres so writes are not blocked"""
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect))
+    if connection.dialect.name == 'postgresql':
+        ddl = ddl.replace('INDEX', 'INDEX CONCURRENTLY', 1)
+    connection.exec_driver_sql(ddl)
@@ -0,0 +1,171 @@
+import re
+from sqlalchemy import column, event, func, select, table, text
+from database import db
+from models import Project
+
+# Backend chosen at startup: 'fts5', 'postgres' or None (LIKE fallback)
+_backend = None
+
+# Column weights for bm25(): title, short_description, full_description, tags, technologies
+FTS5_WEIGHTS = '10.0, 4.0, 1.0, 6.0, 6.0'
+
+# Must match the indexed expression exactly for Postgres to use the GIN index
+PG_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(short_description, '') || ' ' || "
+    "coalesce(tags::text, '') || ' ' || coalesce(technologies::text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(full_description, '')), 'C')"
+)
+
+# For reads: Select statements follow the session's replica routing like the ORM
+# queries that load the matched projects, so both see the same database
+projects_fts = table('projects_fts', column('rowid'))
+
+def _join_terms(value):
+    if not value:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(v) for v in value)
+    return str(value)
+
+def _document(title, short_description, full_description, tags, technologies):
+    return {
+        'title': title or '',
+        'short_description': short_description or '',
+        'full_description': full_description or '',
+        'tags': _join_terms(tags),
+        'technologies': _join_terms(technologies)
+    }
+
+def _tokens(query):
+    """Split user input into safe word tokens (no FTS operators get through)"""
+    return re.findall(r'\w+', query.lower())
+
+def create_search_index(connection):
+    """Create the full-text index for the connection's database; returns the backend or None"""
+    dialect = connection.dialect.name
+
+    if dialect == 'sqlite':
+        try:
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+                "title, short_description, full_description, tags, technologies, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+        except Exception:
+            # SQLite built without FTS5: search falls back to LIKE
+            return None
+        return 'fts5'
+
+    if dialect == 'postgresql':
+        # Runs in autocommit (see migrations/0004_search_index.py)
+        connection.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_projects_search ON projects USING GIN (({PG_DOCUMENT}))"
+        ))
+        return 'postgres'
+
+    return None
+
+def init_search_index(app):
+    """Pick the search backend; the index itself is created by a migration, not at startup"""
+    global _backend
+
+    with app.app_context():
+        dialect = db.engine.dialect.name
+
+        if dialect == 'sqlite':
+            exists = db.session.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_fts'"
+            )).first()
+            db.session.remove()
+            _backend = 'fts5' if exists else None
+            if not exists:
+                app.logger.warning("projects_fts is missing, search falls back to LIKE")
+
+        elif dialect == 'postgresql':
+            _backend = 'postgres'
+
+def rebuild_search_index(connection):
+    """Repopulate the SQLite FTS table from the projects table"""
+    connection.execute(text("DELETE FROM projects_fts"))
+    rows = connection.execute(select(
+        Project.id, Project.title, Project.short_description, Project.full_description,
+        Project.tags, Project.technologies
+    )).all()
+    for row in rows:
+        _insert_row(connection, row[0], _document(*row[1:]))
+
+def index_projects(connection, rows):
+    """Index (id, title, short_description, full_description, tags, technologies) rows
+    written without the ORM, e.g. bulk inserts, which skip the mapper events below"""
+    if _backend == 'fts5' and rows:
+        connection.execute(text(
+            "INSERT INTO projects_fts (rowid, title, short_description, full_description, tags, technologies) "
+            "VALUES (:rowid, :title, :short_description, :full_description, :tags, :technologies)"
+        ), [dict(_document(*row[1:]), rowid=row[0]) for row in rows])
+
+def _insert_row(connection, project_id, document):
+    connection.execute(text(
+        "INSERT INTO projects_fts (rowid, title, short_description, full_description, tags, technologies) "
+        "VALUES (:rowid, :title, :short_description, :full_description, :tags, :technologies)"
+    ), dict(document, rowid=project_id))
+
+def _delete_row(connection, project_id):
+    connection.execute(text("DELETE FROM projects_fts WHERE rowid = :rowid"), {'rowid': project_id})
+
+# Keep the FTS table in the same transaction as the project write
+@event.listens_for(Project, 'after_insert')
+def _index_inserted(mapper, connection, project):
+    if _backend == 'fts5':
+        _insert_row(connection, project.id, _document(
+            project.title, project.short_description, project.full_description,
+            project.tags, project.technologies
+        ))
+
+@event.listens_for(Project, 'after_update')
+def _index_updated(mapper, connection, project):
+    if _backend == 'fts5':
+        _delete_row(connection, project.id)
+        _index_inserted(mapper, connection, project)
+
+@event.listens_for(Project, 'after_delete')
+def _index_deleted(mapper, connection, project):
+    if _backend == 'fts5':
+        _delete_row(connection, project.id)
+
+def search_projects(query, limit=20, offset=0):
+    """Get (ranked project ids, total matches), or None when no full-text backend is available"""
+    tokens = _tokens(query)
+    if not tokens:
+        return [], 0
+
+    if _backend == 'fts5':
+        # Every token must match, each as a prefix
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        matches = text('projects_fts MATCH :match')
+        total = db.session.execute(
+            select(func.count()).select_from(projects_fts).where(matches), {'match': match}
+        ).scalar()
+        ids = db.session.execute(
+            select(projects_fts.c.rowid).where(matches)
+            .order_by(text(f'bm25(projects_fts, {FTS5_WEIGHTS})')).limit(limit).offset(offset),
+            {'match': match}
+        ).scalars().all()
+        return ids, total
+
+    if _backend == 'postgres':
+        # Postgres has no BM25; ts_rank_cd over the weighted document is the closest ranking
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        matches = text(f"({PG_DOCUMENT}) @@ to_tsquery('english', :q)")
+        total = db.session.execute(
+            select(func.count()).select_from(Project).where(matches), {'q': tsquery}
+        ).scalar()
+        ids = db.session.execute(
+            select(Project.id).where(matches)
+            .order_by(text(f"ts_rank_cd({PG_DOCUMENT}, to_tsquery('english', :q)) DESC"), Project.id)
+            .limit(limit).offset(offset),
+            {'q': tsquery}
+        ).scalars().all()
+        return ids, total
+
+    return None
@@ -0,0 +1,89 @@
+import re
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models import Project
+
+def slugify(title):
+    """Generate URL-friendly slug from title"""
+    slug = title.lower()
+    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
+    slug = re.sub(r'[\s-]+', '-', slug)
+    return slug.strip('-')
+
+def escape_like(value):
+    """Escape LIKE wildcards so value matches literally (use with escape='\\\\')"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def has_slug_base(slug, base):
+    """Whether slug is base or one of its numbered variants (base-1, base-2, ...)"""
+    return bool(slug) and re.fullmatch(re.escape(base or 'project') + r'(-\d+)?', slug) is not None
+
+class SlugAllocator:
+    """
+    Hands out free project slugs: base, then base-1, base-2, ...
+
+    The slugs taken for a base are loaded with one query the first time the
+    base is seen and reserved in memory afterwards, so allocating many slugs
+    (e.g. a bulk import) costs one query per distinct base, not per candidate.
+    """
+
+    def __init__(self):
+        self._taken = {}
+
+    def _load(self, base):
+        suffixed = re.compile(re.escape(base) + r'-(\d+)$')
+        taken = set()
+        rows = db.session.query(Project.slug).filter(or_(
+            Project.slug == base,
+            Project.slug.like(escape_like(base) + '-%', escape='\\')
+        ))
+        for (slug,) in rows:
+            if slug == base:
+                taken.add(0)
+            else:
+                match = suffixed.match(slug)
+                if match:
+                    taken.add(int(match.group(1)))
+        return taken
+
+    def allocate(self, base):
+        base = base or 'project'
+        if base not in self._taken:
+            self._taken[base] = self._load(base)
+        taken = self._taken[base]
+
+        n = 0
+        while n in taken:
+            n += 1
+        taken.add(n)
+        return base if n == 0 else f'{base}-{n}'
+
+    def forget(self, base):
+        """Reload a base on next use (after a concurrent writer took one of its slugs)"""
+        self._taken.pop(base, None)
+
+def next_free_slug(base):
+    """The first free slug for base, found with a single query"""
+    return SlugAllocator().allocate(base)
+
+def save_with_unique_slug(project, base, attempts=5):
+    """
+    Give a new or renamed project the next free slug for base and commit it.
+
+    Another request may commit the same slug between the lookup and our
+    insert; the unique constraint rejects ours and we retry with a fresh one.
+    """
+    allocator = SlugAllocator()
+    for attempt in range(attempts):
+        project.slug = allocator.allocate(base)
+        db.session.add(project)
+        try:
+            db.session.commit()
+            return project
+        except IntegrityError:
+            db.session.rollback()
+            # Only a slug collision is worth retrying
+            if attempt == attempts - 1 or not db.session.query(Project.id).filter_by(slug=project.slug).first():
+                raise
+            allocator.forget(base)
@@ -0,0 +1,39 @@
+# Favorite fields by type; required text must be non-empty, the rest may also be null
+FAVORITE_REQUIRED = ('title', 'category', 'tier')
+FAVORITE_TEXT = ('genre_or_sport', 'achievement', 'poster_or_photo')
+FAVORITE_INTEGERS = ('year', 'order')
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def parse_ids(data):
+    """The id list of a request body ({"ids": [...]}), or raise ValueError"""
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not ids:
+        raise ValueError('ids must be a non-empty list')
+    if not all(_is_int(i) for i in ids):
+        raise ValueError('ids must be integers')
+    if len(set(ids)) != len(ids):
+        raise ValueError('ids must not repeat')
+    return ids
+
+def check_favorite(data, partial=False):
+    """
+    Raise ValueError unless the favorite fields of a request body have the right types.
+
+    With partial=True (updates), required fields are only checked when present.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    for field in FAVORITE_REQUIRED:
+        if field in data or not partial:
+            value = data.get(field)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f'{field} must be a non-empty string')
+    for field in FAVORITE_TEXT:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise ValueError(f'{field} must be a string')
+    for field in FAVORITE_INTEGERS:
+        if data.get(field) is not None and not _is_int(data[field]):
+            raise ValueError(f'{field} must be an integer')
+    return data
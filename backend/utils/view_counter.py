@@ -0,0 +1,113 @@
+import atexit
+import threading
+from sqlalchemy import update
+from database import db
+from models import Project
+
+class ViewCounter:
+    """Accumulate project view increments in memory and flush them in batches"""
+
+    def __init__(self, flush_interval=5.0, flush_threshold=100):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.app = None
+        self._pending = {}
+        self._pending_total = 0
+        self._last_reported = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """Bind the counter to an app and start the background flusher"""
+        self.app = app
+        self.flush_interval = app.config.get('VIEW_FLUSH_INTERVAL', self.flush_interval)
+        self.flush_threshold = app.config.get('VIEW_FLUSH_THRESHOLD', self.flush_threshold)
+        app.extensions['view_counter'] = self
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def increment(self, project_id, stored_views=0):
+        """Record one view and return the view count to report to the client"""
+        with self._lock:
+            self._pending[project_id] = self._pending.get(project_id, 0) + 1
+            self._pending_total += 1
+
+            # Stored views plus unflushed views; never report less than before,
+            # even if a flush lands between loading the row and this call
+            views = max((stored_views or 0) + self._pending[project_id],
+                        self._last_reported.get(project_id, 0) + 1)
+            self._last_reported[project_id] = views
+
+            if self._pending_total >= self.flush_threshold:
+                self._wakeup.set()
+
+        return views
+
+    def pending(self, project_id=None):
+        """Get unflushed view counts for one project or all of them"""
+        with self._lock:
+            if project_id is not None:
+                return self._pending.get(project_id, 0)
+            return dict(self._pending)
+
+    def forget(self, project_id):
+        """Drop pending views for a project that no longer exists"""
+        with self._lock:
+            self._pending_total -= self._pending.pop(project_id, 0)
+            self._last_reported.pop(project_id, None)
+
+    def flush(self):
+        """Write pending counts with one UPDATE ... SET views = views + n per project"""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+                self._pending_total = 0
+
+            if not batch or self.app is None:
+                return 0
+
+            try:
+                with self.app.app_context():
+                    for project_id, count in batch.items():
+                        db.session.execute(
+                            update(Project)
+                            .where(Project.id == project_id)
+                            .values(views=db.func.coalesce(Project.views, 0) + count,
+                                    updated_at=Project.updated_at)
+                            # A view is not a content change (keeps ETags stable)
+                            .execution_options(synchronize_session=False, content_change=False)
+                        )
+                    db.session.commit()
+            except Exception as e:
+                # Put the counts back so the next flush retries them
+                with self._lock:
+                    for project_id, count in batch.items():
+                        self._pending[project_id] = self._pending.get(project_id, 0) + count
+                        self._pending_total += count
+                self.app.logger.error(f"Error flushing view counts: {str(e)}")
+                return 0
+
+            return sum(batch.values())
+
+    def shutdown(self):
+        """Stop the background flusher and write out whatever is pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            self.flush()
+
+view_counter = ViewCounter()